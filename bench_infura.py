@@ -0,0 +1,441 @@
+#!/usr/bin/python3
+"""
+@Description : Offline benchmarks of infura.py against the local stub node in stub_infura.py.
+               Usage : python bench_infura.py [ bench name ... ] [ --json results.json ]
+               --json also writes every reported line as machine readable JSON, to compare
+               runs and catch regressions.
+@Author      : k.z
+"""
+import sys, time
+import argparse
+import itertools
+import platform
+import json
+import contextlib
+import multiprocessing
+import requests
+import tracemalloc
+import threading
+import asyncio
+import concurrent.futures
+import infura as inf
+import stub_infura as stub
+
+
+_RESULTS = []
+_BENCH    = [ None ]
+
+#@Description: Times _n calls of _fn split over _workers threads.
+#@Return     :
+# _report      [ dict] calls/sec, p50, p90, p99 and max latency in milliseconds.
+def _measure( _fn, _n, _workers=1 ):
+    _samples = []
+    _lock    = threading.Lock()
+
+    def _work( _count ):
+        _local = []
+        for _ in range(_count):
+            _t0 = time.perf_counter()
+            _fn()
+            _local.append(time.perf_counter() - _t0)
+        with _lock:
+            _samples.extend(_local)
+
+    _threads = [ threading.Thread(target=_work,args=(_n // _workers,)) for _ in range(_workers) ]
+    _t0 = time.perf_counter()
+    for _t in _threads:
+        _t.start()
+    for _t in _threads:
+        _t.join()
+    _elapsed = time.perf_counter() - _t0
+    return {
+        "calls"   : len(_samples),
+        "calls_s" : round(len(_samples) / _elapsed, 1),
+        "p50_ms"  : round(inf._percentile(_samples,50) * 1000, 3),
+        "p90_ms"  : round(inf._percentile(_samples,90) * 1000, 3),
+        "p99_ms"  : round(inf._percentile(_samples,99) * 1000, 3),
+        "max_ms"  : round(max(_samples) * 1000, 3),
+        }
+
+#@Description: Peak bytes allocated while _fn runs.
+def _peak( _fn ):
+    tracemalloc.start()
+    _fn()
+    _, _bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return _bytes
+
+#@Description: Prints one result line and keeps it for the --json output.
+def _print( _name, _report ):
+    _RESULTS.append(dict(bench=_BENCH[0],case=_name,**_report))
+    print("{:<28} {}".format(_name, "  ".join("{}={}".format(_k,_v) for _k,_v in _report.items())))
+
+
+# Description : Pooled keep-alive transport against a fresh connection per call.
+def bench_pooling( _n=2000, _workers=4 ):
+    with stub.StubServer() as _stub:
+        for _pooled in (False, True):
+            _node = inf.INFURA("","",_url=_stub.url,_pooled=_pooled)
+            _before = _stub.stats["connections"]
+            _report = _measure(_node.get_gas_price,_n,_workers)
+            _report["connections"] = _stub.stats["connections"] - _before
+            _print("pooled" if _pooled else "per-call", _report)
+            _node.close()
+
+
+# Description : One POST per call against JSON RPC batch POSTs.
+def bench_batch( _n=2000, _latency=0.002 ):
+    with stub.StubServer(_latency=_latency) as _stub:
+        _node = inf.INFURA("","",_url=_stub.url)
+        _calls = [ ("eth_getBalance",[hex(_i),"latest"]) for _i in range(_n) ]
+        _t0 = time.perf_counter()
+        for _method, _params in _calls:
+            _node.api_call(_method,_params)
+        _single = time.perf_counter() - _t0
+        _t0 = time.perf_counter()
+        _node.api_batch(_calls)
+        _batched = time.perf_counter() - _t0
+        _print("single", {"calls_s":round(_n / _single,1)})
+        _print("batched", {"calls_s":round(_n / _batched,1)})
+
+
+# Description : Receipts through the sync node ( sequential and thread pool ) against the
+#               asyncio node, on a stub with injected latency.
+def bench_async( _n=1000, _latency=0.02, _workers=32 ):
+    with stub.StubServer(_latency=_latency) as _stub:
+        _hashes = [ _stub._chain.tx_hash(1000 - _i % 10, 0) for _i in range(_n) ]
+        _node = inf.INFURA("","",_url=_stub.url,_pool_maxsize=_workers)
+        _t0 = time.perf_counter()
+        for _h in _hashes[:_n // 10]:
+            _node.get_transaction_receipt(_h)
+        _print("sync sequential", {"calls_s":round(_n / 10 / (time.perf_counter() - _t0),1)})
+        _t0 = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(_workers) as _pool:
+            list(_pool.map(_node.get_transaction_receipt,_hashes))
+        _print("sync threads x{}".format(_workers), {"calls_s":round(_n / (time.perf_counter() - _t0),1)})
+
+        async def _run():
+            async with inf.AsyncINFURA("","",_url=_stub.url,_concurrency=_workers) as _anode:
+                await asyncio.gather(*[ _anode.get_transaction_receipt(_h) for _h in _hashes ])
+        _t0 = time.perf_counter()
+        asyncio.run(_run())
+        _print("async x{}".format(_workers), {"calls_s":round(_n / (time.perf_counter() - _t0),1)})
+
+
+# Description : Sustained throughput of an adaptive limiter against a throttling stub.
+def bench_ratelimit( _seconds=5.0, _quota=200, _workers=8 ):
+    with stub.StubServer(_quota=_quota,_retry_after=0.1) as _stub:
+        _limiter = inf.RateLimiter(_rate=_quota * 3)
+        _node = inf.INFURA("","",_url=_stub.url,_limiter=_limiter,_pool_maxsize=_workers)
+        _stop = time.perf_counter() + _seconds
+        _done = [ 0 ] * _workers
+
+        def _work( _i ):
+            while time.perf_counter() < _stop:
+                _node.get_gas_price()
+                _done[_i] += 1
+
+        _threads = [ threading.Thread(target=_work,args=(_i,)) for _i in range(_workers) ]
+        for _t in _threads:
+            _t.start()
+        for _t in _threads:
+            _t.join()
+        _print("limited", {"quota":_quota,"calls_s":round(sum(_done) / _seconds,1),
+                           "throttled":_stub.stats["throttled"],"final_rate":round(_limiter.rate,1)})
+
+
+# Description : Tail latency of balance lookups with and without hedging, on a stub where
+#               every 20th request is slow.
+def bench_hedge( _n=400 ):
+    with stub.StubServer(_latency=0.002,_slow_every=20,_slow_latency=0.2) as _stub:
+        for _hedge in (False, True):
+            _retry = inf.RetryPolicy(_hedge=_hedge,_min_delay=0.005)
+            _node = inf.INFURA("","",_url=_stub.url,_retry=_retry)
+            _report = _measure(lambda: _node.get_balance("0x1","latest"),_n)
+            _report.update(hedges=_retry.hedges)
+            _print("hedged" if _hedge else "plain", _report)
+
+
+# Description : Block range throughput through one endpoint against a pool of three
+#               endpoints of different speeds.
+def bench_endpoints( _n=600, _workers=16 ):
+    _stubs = [ stub.StubServer(_latency=_l).start() for _l in (0.02,0.04,0.08) ]
+    try:
+        _single = inf.INFURA("","",_url=_stubs[1].url,_pool_maxsize=_workers)
+        _pool   = inf.EndpointPool([ _s.url for _s in _stubs ])
+        _pooled = inf.INFURA("","",_endpoints=_pool,_pool_maxsize=_workers)
+        for _name, _node in (("single",_single),("pool x3",_pooled)):
+            _before = [ _s.stats["requests"] for _s in _stubs ]
+            _t0 = time.perf_counter()
+            for _ in _node.iter_blocks(0,_n - 1,False,_workers=_workers):
+                pass
+            _report = {"blocks_s":round(_n / (time.perf_counter() - _t0),1)}
+            _report.update(("{}ms".format(int(_s._latency * 1000)),_s.stats["requests"] - _b) for _s, _b in zip(_stubs,_before))
+            _print(_name, _report)
+    finally:
+        for _s in _stubs:
+            _s.stop()
+
+
+class _MainnetChain(stub.StubChain):
+    #@Description: Stub chain whose blocks are mainnet sized: typed txs with signatures and
+    #              calldata.
+    def block( self, _num, _tx_flag=True ):
+        _block = stub.StubChain.block(self,_num,_tx_flag)
+        if _block is None:
+            return None
+        _block.update(baseFeePerGas=hex(12 * 10**9),mixHash=stub._hash32("mix",_num))
+        for _tx in _block["transactions"] if _tx_flag else ():
+            _tx.update(type="0x2",chainId="0x1",input="0xa9059cbb" + "00" * 64,v="0x1",
+                       r=stub._hash32("r",_tx["hash"]),s=stub._hash32("s",_tx["hash"]),
+                       maxFeePerGas=hex(30 * 10**9),maxPriorityFeePerGas=hex(10**9))
+        return _block
+
+#@Description: Mainnet sized synthetic blocks as JSON text, _txs per block.
+def _mainnet_blocks( _n=40, _txs=200 ):
+    _chain = _MainnetChain(_txs=_txs)
+    return [ json.dumps(_chain.block(_num)) for _num in range(_n) ]
+
+#@Description: Runs a stub node in a child process, so tracemalloc only sees the client.
+#@Return     :
+# _url         [ str ] Url of the stub, served until the with block exits.
+@contextlib.contextmanager
+def _stub_process( **_kwargs ):
+    _ctx  = multiprocessing.get_context("fork")
+    _urls = _ctx.Queue()
+    _stop = _ctx.Event()
+
+    def _serve():
+        with stub.StubServer(**_kwargs) as _stub:
+            _urls.put(_stub.url)
+            _stop.wait()
+
+    _proc = _ctx.Process(target=_serve,daemon=True)
+    _proc.start()
+    try:
+        yield _urls.get()
+    finally:
+        _stop.set()
+        _proc.join()
+
+#@Description: Bytes held by the objects _build returns, and the seconds it took.
+def _footprint( _build ):
+    tracemalloc.start()
+    _t0 = time.perf_counter()
+    _held = _build()
+    _elapsed = time.perf_counter() - _t0
+    _size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return _held, _size, _elapsed
+
+
+# Description : Memory and CPU of typed models against the raw response dicts.
+def bench_models( _n=40, _txs=200 ):
+    _texts = _mainnet_blocks(_n,_txs)
+    _dicts, _dict_bytes, _dict_s = _footprint(lambda: [ json.loads(_t) for _t in _texts ])
+    _models, _model_bytes, _model_s = _footprint(lambda: [ inf.Block.from_json(json.loads(_t)) for _t in _texts ])
+    _print("dicts", {"MB":round(_dict_bytes / 2**20,2),"load_s":round(_dict_s,3)})
+    _print("models", {"MB":round(_model_bytes / 2**20,2),"load_s":round(_model_s,3)})
+    for _name, _blocks, _sum in (
+            ("dicts 3 passes",_dicts,lambda _b: sum(int(_t["value"],16) + int(_t["gas"],16) for _t in _b["transactions"])),
+            ("models 3 passes",_models,lambda _b: sum(_t.value + _t.gas for _t in _b.transactions))):
+        _t0 = time.perf_counter()
+        for _ in range(3):
+            for _block in _blocks:
+                _sum(_block)
+        _print(_name, {"sum_s":round(time.perf_counter() - _t0,3)})
+
+    def _decoded():
+        _held = [ inf.Block.from_json(json.loads(_t)) for _t in _texts ]
+        for _block in _held:
+            for _model in [ _block ] + _block.transactions:
+                for _key, _attr, _raw in _model._fields:
+                    getattr(_model,_attr)
+        return _held
+    _, _bytes, _seconds = _footprint(_decoded)
+    _print("models decoded", {"MB":round(_bytes / 2**20,2),"load_s":round(_seconds,3)})
+
+
+# Description : Response decoding of a large full block: requests' .json() against parsing
+#               the body bytes with each JSON backend, and the peak memory of a full
+#               get_block_by_number against streaming its transactions.
+def bench_decode( _txs=5000, _n=20 ):
+    with stub.StubServer(_chain=_MainnetChain(_txs=_txs)) as _stub:
+        _body = json.dumps({"jsonrpc":"2.0","id":1,"method":"eth_getBlockByNumber","params":["0x7",True]})
+        _rtn  = requests.post(_stub.url,data=_body,headers=inf._HEADERS)
+        _print("block", {"MB":round(len(_rtn.content) / 2**20,2),"txs":_txs})
+        _t0 = time.perf_counter()
+        for _ in range(_n):
+            _rtn.json()
+        _print("requests .json()", {"ms":round((time.perf_counter() - _t0) / _n * 1000,1)})
+        for _backend in ("json","orjson"):
+            try:
+                inf.set_json_backend(_backend)
+            except ImportError:
+                continue
+            _t0 = time.perf_counter()
+            for _ in range(_n):
+                inf._loads(_rtn.content)
+            _print("bytes " + _backend, {"ms":round((time.perf_counter() - _t0) / _n * 1000,1)})
+        inf.set_json_backend()
+    with _stub_process(_chain=_MainnetChain(_txs=_txs)) as _url:
+        _node = inf.INFURA("","",_url=_url)
+        for _name, _fetch in (("full block",lambda: len(_node.get_block_by_number(7)["result"]["transactions"])),
+                              ("streamed",lambda: sum(1 for _ in _node.iter_block_transactions(7)))):
+            _t0 = time.perf_counter()
+            _fetch()
+            _elapsed = time.perf_counter() - _t0
+            tracemalloc.start()
+            _fetch()
+            _, _peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            _print(_name, {"peak_MB":round(_peak / 2**20,2),"s":round(_elapsed,3)})
+
+
+# Description : Transaction columns of a block range: the per field int( x, 16 ) dict loop
+#               against tx_columns, on already fetched blocks and from the raw response
+#               bodies ( decode included ), then end to end over the stub.
+def bench_columns( _n=200, _txs=500 ):
+    import numpy
+    _chain  = _MainnetChain(_txs=_txs)
+    _bodies = [ inf._dumps({"jsonrpc":"2.0","id":_num,"result":_chain.block(_num)}) for _num in range(_n) ]
+    _t0 = time.perf_counter()
+    _blocks = [ inf._loads(_body)["result"] for _body in _bodies ]
+    _decode = time.perf_counter() - _t0
+    _keys   = [ _k for _k, _kind in inf._TX_COLUMNS.items() if _kind == "u64" or _kind == "u256" ]
+    _t0 = time.perf_counter()
+    _out = { _k:[] for _k in inf._TX_COLUMNS }
+    for _block in _blocks:
+        for _tx in _block["transactions"]:
+            for _k in _keys:
+                _out[_k].append(int(_tx[_k],16))
+            for _k in ("hash","from","to","blockHash"):
+                _out[_k].append(bytes.fromhex(_tx[_k][2:]))
+    _out = { _k:numpy.array(_v,object if _k == "value" else None) for _k, _v in _out.items() }
+    _loop = time.perf_counter() - _t0
+    _t0 = time.perf_counter()
+    inf.tx_columns(_blocks)
+    _columns = time.perf_counter() - _t0
+    _print("dict loop", {"txs":_n * _txs,"s":round(_loop,3)})
+    _print("tx_columns", {"txs":_n * _txs,"s":round(_columns,3),"speedup":round(_loop / _columns,1)})
+    _print("from raw bodies", {"MB":round(sum(map(len,_bodies)) / 2**20,1),"decode_s":round(_decode,3),
+                               "speedup":round((_decode + _loop) / (_decode + _columns),1)})
+    with stub.StubServer(_chain=_chain) as _stub:
+        _node = inf.INFURA("","",_url=_stub.url,_pool_maxsize=8)
+        _t0 = time.perf_counter()
+        _node.get_tx_columns(0,_n - 1)
+        _print("get_tx_columns", {"txs_s":round(_n * _txs / (time.perf_counter() - _t0),1)})
+
+
+# Description : Throughput, latency percentiles and peak client memory of the main client
+#               paths, against a jittered stub running in its own process.
+def bench_paths( _n=400, _workers=4 ):
+    _chain = stub.StubChain(_txs=100,_input=68)
+    # builds the stubs tx hash index before it forks
+    _chain.tx_position_of(_chain.tx_hash(0,0))
+    with _stub_process(_chain=_chain,_latency=0.001,_jitter=0.002) as _url:
+        _node   = inf.INFURA("","",_url=_url,_pool_maxsize=_workers)
+        _cached = inf.INFURA("","",_url=_url,_cache=inf.ResponseCache())
+        _cached.get_block_by_number(500)
+        _numbers = itertools.cycle(range(1000))
+        _hashes  = itertools.cycle([ _chain.tx_hash(_num,0) for _num in range(100) ])
+        _calls   = [ ("eth_getBalance",[hex(_i),"latest"]) for _i in range(100) ]
+        _paths = (
+            ("gas price",lambda: _node.get_gas_price()),
+            ("block full txs",lambda: _node.get_block_by_number(next(_numbers))),
+            ("receipt",lambda: _node.get_transaction_receipt(next(_hashes))),
+            ("batch x100",lambda: _node.api_batch(_calls)),
+            ("cached block",lambda: _cached.get_block_by_number(500)),
+            )
+        for _name, _fn in _paths:
+            _report = _measure(_fn,_n,_workers)
+            _report["peak_KB"] = round(_peak(_fn) / 1024,1)
+            _print(_name,_report)
+        _t0 = time.perf_counter()
+        _peak_bytes = _peak(lambda: sum(1 for _ in _node.iter_blocks(0,199,_workers=_workers)))
+        _print("iter_blocks x200", {"blocks_s":round(200 / (time.perf_counter() - _t0),1),"peak_KB":round(_peak_bytes / 1024,1)})
+
+
+# Description : Per call client overhead of the metrics, on cache hits so no network time
+#               hides it: the bare call path, no metrics object, metrics enabled, and
+#               metrics with a post hook. Best of _rounds interleaved runs.
+def bench_metrics( _n=20000, _rounds=7 ):
+    with stub.StubServer() as _stub:
+        _hooked = inf.Metrics()
+        _hooked.add_hook(_post=lambda _m, _p, _r, _s: None)
+        _nodes = [ (_name,inf.INFURA("","",_url=_stub.url,_cache=inf.ResponseCache(),_metrics=_metrics))
+                   for _name, _metrics in (("disabled",None),("enabled",inf.Metrics()),("enabled + hook",_hooked)) ]
+        _params = [ hex(500),True ]
+        _cases = [ ("bare _api_call",lambda: _nodes[0][1]._api_call("eth_getBlockByNumber",_params)) ]
+        _cases += [ (_name,lambda _node=_node: _node.api_call("eth_getBlockByNumber",_params)) for _name, _node in _nodes ]
+        _best = {}
+        for _ in range(_rounds):
+            for _name, _fn in _cases:
+                _fn()
+                _t0 = time.perf_counter()
+                for _ in range(_n):
+                    _fn()
+                _best[_name] = min(_best.get(_name,1e9),(time.perf_counter() - _t0) / _n * 1e9)
+        for _name, _fn in _cases:
+            _print(_name, {"ns_call":round(_best[_name],1),"overhead_ns":round(_best[_name] - _best["bare _api_call"],1)})
+
+
+# Description : Network calls and bytes of a sparse contract scan, every receipt against a bloom scan.
+def bench_bloom( _blocks=5000, _txs=50, _rare=1000, _latency=0.002 ):
+    _chain = stub.StubChain(_head=_blocks - 1,_txs=_txs,_rare=_rare)
+    for _num in range(_blocks):
+        _chain.block_bloom(_num)
+    _rare  = stub._addr20("rare")
+    with _stub_process(_latency=_latency,_chain=_chain) as _url:
+        for _name, _scan in (
+                ("all receipts",lambda _node: [ _l for _n, _receipts in _node.iter_block_receipts(0,_blocks - 1)
+                                                for _r in _receipts for _l in _r["logs"] if _l["address"] == _rare ]),
+                ("bloom scan",lambda _node: list(_node.bloom_scan({"address":_rare,"fromBlock":"0x0","toBlock":hex(_blocks - 1)})))):
+            _metrics = inf.Metrics()
+            _node = inf.INFURA("","",_url=_url,_metrics=_metrics)
+            _t0 = time.perf_counter()
+            _logs = _scan(_node)
+            _elapsed = time.perf_counter() - _t0
+            _stats = _metrics.methods.values()
+            _print(_name, {"seconds":round(_elapsed,3),"logs":len(_logs),"calls":sum(_s["calls"] for _s in _stats),
+                           "mb_received":round(sum(_s["response_bytes"] for _s in _stats) / 1e6,2)})
+
+
+_BENCHES = {
+    "pooling" : bench_pooling,
+    "batch"   : bench_batch,
+    "async"   : bench_async,
+    "ratelimit": bench_ratelimit,
+    "hedge"   : bench_hedge,
+    "endpoints": bench_endpoints,
+    "models"  : bench_models,
+    "decode"  : bench_decode,
+    "columns" : bench_columns,
+    "paths"   : bench_paths,
+    "metrics" : bench_metrics,
+    "bloom"   : bench_bloom,
+    }
+
+def main():
+    _parser = argparse.ArgumentParser(description="Offline benchmarks of infura.py.")
+    _parser.add_argument("names",nargs="*",help="benchmarks to run, all by default : " + " ".join(_BENCHES))
+    _parser.add_argument("--json",help="also write the results as JSON to this file, - for stdout")
+    _args = _parser.parse_args()
+    for _name in _args.names:
+        if _name not in _BENCHES:
+            _parser.error("unknown benchmark [ {} ]".format(_name))
+    for _name in _args.names or list(_BENCHES):
+        print("== {} ==".format(_name))
+        _BENCH[0] = _name
+        _BENCHES[_name]()
+    if _args.json:
+        _out = json.dumps({"python":platform.python_version(),"json_backend":inf.JSON_BACKEND,
+                           "time":time.strftime("%Y-%m-%dT%H:%M:%S"),"results":_RESULTS},indent=1)
+        if _args.json == "-":
+            print(_out)
+        else:
+            with open(_args.json,"w") as _file:
+                _file.write(_out)
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,27 @@
 @Description : Client side python api implementation for infura server. The class defines infura  
                typed objects allowing access to Ethereums network via infura. Infura types will 
                require public and private keys during instantiation. Currently no exceptions 
-               class exists, this will change shortly.
+               class exists, this will change shortly. AsyncINFURA mirrors INFURA on asyncio
+               and needs the optional aiohttp package.
 @Author      : k.z
 """
 import requests 
+import requests.adapters
+import sys
 import time
 import json
+import itertools
+import collections
+import concurrent.futures
+import os
+import threading
+import zlib
+import random
+import re
+import bisect
+import functools
+import mmap
+import array
 
 _PROTOCOL     = "https"
 _ENDPOINT     = "infura.io"
@@ -21,44 +36,1024 @@ _POST_METHOD  = [
     "eth_getBalance","eth_gasPrice","eth_estimateGas","eth_call","eth_blockNumber","eth_getBlockByHash","eth_getBlockByNumber",
     "eth_getTransactionByHash","eth_getTransactionReceipt","eth_accounts", "eth_getTransactionCount","eth_getUncleCountByBlockHash",
     "eth_getUncleCountByBlockNumber","eth_getUncleByBlockHashAndIndex","eth_getUncleByBlockNumberAndIndex","eth_hashrate","eth_mining",
-    "eth_protocolVersion","eth_syncing","net_listening","net_peerCount","net_version","web3_clientVersion","eth_getWork"
+    "eth_protocolVersion","eth_syncing","net_listening","net_peerCount","net_version","web3_clientVersion","eth_getWork",
+    "eth_getBlockReceipts","eth_sendRawTransaction"
     ]
+_HEADERS      = {"Content-Type":"application/json"}
+_POOL_SIZE    = 10
+_POOL_MAXSIZE = 10
+_TIMEOUT      = (3.05, 30)
+_BATCH_SIZE   = 100
+_CONCURRENCY  = 64
+_WORKERS      = 8
+_PREFETCH     = 32
+_CHECKPOINT_EVERY = 100
+_LOG_CHUNK    = 2000
+_LOG_MAX_CHUNK= 100000
+_LOG_GROW_BELOW = 1000
+_LOG_WORKERS  = 4
+_STREAM_CHUNK = 1 << 16
+_COLUMN_CHUNK = 1 << 16
+_BLOCK_TIME   = 12.0
+_MIN_POLL     = 0.5
+# Polls at _MIN_POLL once a block is overdue, before backing off.
+_FAST_POLLS   = 4
+_REORG_WINDOW = 64
+_BLOOM_CHUNK  = 500
+_CACHE_BYTES  = 64 * 1024 * 1024
+# Seconds each volatile method's response is served fresh by TTLCache.
+_TTL          = {"eth_blockNumber":1.0,"eth_gasPrice":3.0,"net_version":3600.0,"web3_clientVersion":3600.0}
+_MAX_STALE    = 30.0
+_CALL_BLOCKS  = 16
+_HEAD_REFRESH = 1.0
+_STORE_COMMIT_EVERY = 256
+_SEGMENT_BLOCKS = 10000
+_ARCHIVE_FLUSH_EVERY = 64
+_THROTTLE_RETRIES = 8
+# Seconds past a rate cut during which further 429s, from sends already in flight, do not
+# cut the rate again.
+_CALM         = 0.25
+_HEDGE_WORKERS= 32
+_EJECT_AFTER  = 3
+_EJECT_FOR    = 30.0
+# Upper bounds, in seconds, of the latency histogram buckets of Metrics.
+_LATENCY_BUCKETS = (0.005,0.01,0.025,0.05,0.1,0.25,0.5,1.0,2.5,5.0,10.0)
+_BLOCK_TAGS   = ("latest","pending","earliest","safe","finalized")
+# Methods whose result is a block or tx object that never changes once deep enough. The
+# by number methods are only cacheable for explicit block numbers, never tags.
+_BLOCK_RESULT = ["eth_getBlockByHash","eth_getBlockByNumber"]
+_FINAL_METHOD = _BLOCK_RESULT + [
+    "eth_getTransactionByHash","eth_getTransactionReceipt","eth_getTransactionByBlockHashAndIndex",
+    "eth_getTransactionByBlockNumberAndIndex"
+    ]
+_BY_NUMBER    = ["eth_getBlockByNumber","eth_getTransactionByBlockNumberAndIndex"]
+# Methods changing node state. Never shared between callers, retried or hedged.
+_WRITE_METHOD = ["eth_sendRawTransaction","eth_submitWork"]
+# Seconds before a node that refused an optional method is asked again, it may be upgraded.
+_SUPPORT_TTL  = 600.0
+_NO_METHOD    = -32601
 
 
-class INFURA(object):
-    def __init__( self, _project_id, _project_scrt, _network='mainnet' ):        
-        self._PROJECT_ID   = _project_id
-        self._PROJECT_SCRT = _project_scrt
-        self._URL  = "{}://{}.{}/{}/{}".format(_PROTOCOL,_network,_ENDPOINT,_VERSION,self._PROJECT_ID)
-    
-    #@Description: Forward facing caller. This function sanitizes outgoing and
-    #              handles errors in returns (tbd).  
+class InfuraError(Exception):
+    #@Description: Raised by the bulk helpers when a call returns an error or no result.
     #@Parameters :
-    # _method      [ str ] The name of the JSON RPC method. 
-    # _params      [ dict] The methods parameter counterparties. 
+    # _message     [ str ] What failed.
+    # _response    [ dict] The offending JSON RPC response, if any.
+    def __init__( self, _message, _response=None ):
+        Exception.__init__(self,_message)
+        self.response = _response
+
+
+#@Description: Builds a keep-alive session whose adapter pools connections per host.
+#@Parameters :
+# _pool_size   [ int ] Number of per-host connection pools to cache.
+# _pool_maxsize[ int ] Max connections kept alive per host.
+# _pool_block  [ bool] True blocks callers once _pool_maxsize connections are busy.
+#@Return     :
+# _session     requests.Session object.
+def _new_session( _pool_size=_POOL_SIZE, _pool_maxsize=_POOL_MAXSIZE, _pool_block=False ):
+    _session = requests.Session()
+    _adapter = requests.adapters.HTTPAdapter(pool_connections=_pool_size,pool_maxsize=_pool_maxsize,pool_block=_pool_block)
+    _session.mount("https://",_adapter)
+    _session.mount("http://",_adapter)
+    _session.headers.update(_HEADERS)
+    return _session
+
+
+#@Description: Compact stdlib json serialization, to bytes like orjson.
+def _json_dumps( _obj ):
+    return json.dumps(_obj,separators=(",",":")).encode()
+
+#@Description: loads/dumps pair over orjson. dumps falls back to the stdlib json on what
+#              orjson refuses ( ints above 64 bits ).
+def _orjson_codec( _orjson ):
+    def _dumps( _obj ):
+        try:
+            return _orjson.dumps(_obj)
+        except TypeError:
+            return _json_dumps(_obj)
+    return _orjson.loads, _dumps
+
+#@Description: Selects the JSON backend every request body is serialized with and every
+#              response body is parsed with, straight from the received bytes.
+#              i.e  inf.set_json_backend("json")
+#@Parameters :
+# _backend     [ str ] "orjson", "json", None for the fastest one installed, or any object
+#                      with loads( bytes ) and dumps( obj ) -> bytes.
+#@Return     :
+# _name        [ str ] Name of the backend in use.
+def set_json_backend( _backend=None ):
+    global _loads, _dumps, JSON_BACKEND
+    if _backend is None:
+        try:
+            return set_json_backend("orjson")
+        except ImportError:
+            return set_json_backend("json")
+    if _backend == "orjson":
+        import orjson
+        _loads, _dumps = _orjson_codec(orjson)
+    elif _backend == "json":
+        _loads, _dumps = json.loads, _json_dumps
+    else:
+        _loads, _dumps = _backend.loads, _backend.dumps
+    JSON_BACKEND = _backend if isinstance(_backend,str) else type(_backend).__name__
+    return JSON_BACKEND
+
+set_json_backend()
+
+
+#@Description: Cache key of a call, None when the call may never be cached.
+#@Parameters :
+# _method      [ str ] The name of the JSON RPC method.
+# _params      [ list] The methods parameters.
+#@Return     :
+# _key         [tuple] ( method, canonical params ).
+def _final_key( _method, _params ):
+    if _method not in _FINAL_METHOD:
+        return None
+    if _method in _BY_NUMBER and (not _params or str(_params[0]) in _BLOCK_TAGS):
+        return None
+    return _method, json.dumps(_params,sort_keys=True,separators=(",",":"))
+
+
+class ResponseCache(object):
+    #@Description: In memory LRU cache of immutable responses, bounded by the total byte size
+    #              of the cached responses rather than their count. Only block/tx/receipt
+    #              results at least _confirmations blocks deep are admitted, see INFURA. One
+    #              cache may be shared by several INFURA objects.
+    #              i.e  remote_node = inf.INFURA( _project_id, _project_secret, _cache=inf.ResponseCache(256 << 20) )
+    #@Parameters :
+    # _max_bytes   [ int ] Byte budget of the cached responses.
+    # _confirmations[int ] Blocks a result must be buried under before it is cached.
+    def __init__( self, _max_bytes=_CACHE_BYTES, _confirmations=12 ):
+        self.max_bytes     = _max_bytes
+        self.confirmations = _confirmations
+        self.bytes     = 0
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+        self._entries  = collections.OrderedDict()
+        self._lock     = threading.Lock()
+
+    def __len__( self ):
+        return len(self._entries)
+
+    #@Description: Returns the cached response of a key, None on a miss.
+    def get( self, _key ):
+        with self._lock:
+            _entry = self._entries.get(_key)
+            if _entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(_key)
+            self.hits += 1
+            return _entry[0]
+
+    #@Description: Stores a response, evicting the least recently used ones past the budget.
+    #@Parameters :
+    # _key         [tuple] See _final_key.
+    # _response    [ dict] The decoded response. Shared by every later hit, do not mutate.
+    # _size        [ int ] Byte size of the response.
+    def put( self, _key, _response, _size ):
+        if _size > self.max_bytes:
+            return
+        with self._lock:
+            _old = self._entries.pop(_key,None)
+            if _old is not None:
+                self.bytes -= _old[1]
+            self._entries[_key] = (_response,_size)
+            self.bytes += _size
+            while self.bytes > self.max_bytes:
+                _, (_, _evicted) = self._entries.popitem(last=False)
+                self.bytes -= _evicted
+                self.evictions += 1
+
+    def clear( self ):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    #@Description: Counters snapshot.
+    def stats( self ):
+        return {"entries":len(self._entries),"bytes":self.bytes,"max_bytes":self.max_bytes,
+                "hits":self.hits,"misses":self.misses,"evictions":self.evictions}
+
+
+class TTLCache(object):
+    #@Description: Short lived cache of volatile, cheap to be slightly stale responses such as
+    #              the gas price or the block number, with a TTL per method. Past its TTL an
+    #              entry is still served while one background call refreshes it; past
+    #              _max_stale more seconds callers wait for a fresh response instead, and
+    #              concurrent callers of the same missing entry wait for the one call in
+    #              flight. Only successful responses are kept. One cache may be shared by
+    #              several INFURA objects on the same node.
+    #              i.e  remote_node = inf.INFURA( _project_id, _project_secret, _ttl_cache=inf.TTLCache({"eth_gasPrice":6}) )
+    #@Parameters :
+    # _ttls        [ dict] method -> seconds, merged over _TTL. Methods not in it are not cached.
+    # _max_stale   [float] Seconds past the TTL a stale response may still be served.
+    def __init__( self, _ttls=None, _max_stale=_MAX_STALE ):
+        self.ttls       = dict(_TTL,**(_ttls or {}))
+        self.max_stale  = _max_stale
+        self.hits       = 0
+        self.stale      = 0
+        self.misses     = 0
+        self.refreshes  = 0
+        self.shared     = 0
+        self._entries   = {}
+        self._refreshing = set()
+        self._flights   = {}
+        self._lock      = threading.Lock()
+
+    #@Description: The response of a call, from the cache when fresh enough.
+    #@Parameters :
+    # _method      [ str ] The name of the JSON RPC method, one of ttls.
+    # _params      [ list] The methods parameters.
+    # _fetch       [ fn  ] ( method, params ) -> response, makes the actual call.
     #@Return     :
-    # _request     Requests object. 
-    def api_call( self, _method, _params=[] ):
-        _headers = {}
-        _headers['Content-Type'] = "application/json"        
-        _data = {"id":1,"method":_method,"params":_params} 
+    # _response    [ dict] Shared by every later hit, do not mutate.
+    def get( self, _method, _params, _fetch ):
+        _key = (_method,json.dumps(_params))
+        _ttl = self.ttls[_method]
+        with self._lock:
+            _entry = self._entries.get(_key)
+            _age   = time.monotonic() - _entry[1] if _entry is not None else None
+            if _age is not None and _age <= _ttl:
+                self.hits += 1
+                return _entry[0]
+            if _age is not None and _age <= _ttl + self.max_stale:
+                self.stale += 1
+                if _key not in self._refreshing:
+                    self._refreshing.add(_key)
+                    threading.Thread(target=self._refresh,args=(_key,_params,_fetch),daemon=True).start()
+                return _entry[0]
+            _flight = self._flights.get(_key)
+            if _flight is not None:
+                self.shared += 1
+            else:
+                self.misses += 1
+                self._flights[_key] = _Flight()
+        if _flight is not None:
+            return _flight.wait()
+        _response = {}
+        try:
+            _response = self._put(_key,_fetch(_method,_params))
+            return _response
+        finally:
+            with self._lock:
+                _flight = self._flights.pop(_key)
+            _flight.set(_response)
 
-        # Catch/handle here. soon to be moved and expection class to be added 
-        try: 
-            if _method in _POST_METHOD:
-                _type = "POST" 
-                _rtn  = requests.post(self._URL,headers=_headers,data=json.dumps(_data))
-            elif _method in _GET_METHOD:
-                _type = "GET"
-                _rtn  = requests.get(self._URL,headers=_headers,data=json.dumps(_data))                
+    def _refresh( self, _key, _params, _fetch ):
+        try:
+            self._put(_key,_fetch(_key[0],_params))
+        finally:
+            with self._lock:
+                self.refreshes += 1
+                self._refreshing.discard(_key)
+
+    def _put( self, _key, _response ):
+        if _response and "error" not in _response and _response.get("result") is not None:
+            with self._lock:
+                self._entries[_key] = (_response,time.monotonic())
+        return _response
+
+    def clear( self ):
+        with self._lock:
+            self._entries.clear()
+
+    #@Description: Counters snapshot.
+    def stats( self ):
+        return {"entries":len(self._entries),"hits":self.hits,"stale":self.stale,"misses":self.misses,
+                "shared":self.shared,"refreshes":self.refreshes}
+
+
+class CallCache(object):
+    #@Description: eth_call results keyed by ( block number, call object ), for the latest
+    #              _blocks block numbers used, see INFURA.eth_calls. Only results are kept,
+    #              errors are sent again. Keyed by number, so results of blocks reorged
+    #              away stay until their number ages out.
+    #              i.e  remote_node = inf.INFURA( _project_id, _project_secret, _call_cache=inf.CallCache() )
+    #@Parameters :
+    # _blocks      [ int ] Block numbers kept, the least recently used one is dropped first.
+    def __init__( self, _blocks=_CALL_BLOCKS ):
+        self.blocks   = max(1,_blocks)
+        self.hits     = 0
+        self.misses   = 0
+        self._entries = collections.OrderedDict()
+        self._lock    = threading.Lock()
+
+    #@Description: Cached responses of a block.
+    #@Parameters :
+    # _block       [ int ] Block number.
+    # _keys        [ list] Call keys, see _call_key.
+    #@Return     :
+    # _hits        [ dict] key -> response, for the keys cached.
+    def get_many( self, _block, _keys ):
+        with self._lock:
+            _cached = self._entries.get(_block)
+            if _cached is None:
+                self.misses += len(_keys)
+                return {}
+            self._entries.move_to_end(_block)
+            _hits = { _key:_cached[_key] for _key in _keys if _key in _cached }
+            self.hits   += len(_hits)
+            self.misses += len(_keys) - len(_hits)
+            return _hits
+
+    #@Description: Stores the successful responses among key -> response.
+    def put_many( self, _block, _responses ):
+        with self._lock:
+            _cached = self._entries.setdefault(_block,{})
+            self._entries.move_to_end(_block)
+            for _key, _rtn in _responses.items():
+                if _rtn and "error" not in _rtn and "result" in _rtn:
+                    _cached[_key] = _rtn
+            while len(self._entries) > self.blocks:
+                self._entries.popitem(last=False)
+
+    def clear( self ):
+        with self._lock:
+            self._entries.clear()
+
+    #@Description: Counters snapshot.
+    def stats( self ):
+        with self._lock:
+            return {"blocks":len(self._entries),"entries":sum(len(_c) for _c in self._entries.values()),
+                    "hits":self.hits,"misses":self.misses}
+
+
+class ChainStore(object):
+    #@Description: Persistent SQLite store of finalized block/tx/receipt responses, zlib
+    #              compressed and keyed like ResponseCache. INFURA checks it before going to
+    #              the network, so a second run over stored data makes no network calls.
+    #              i.e  store = inf.ChainStore("chain.db")
+    #                   remote_node = inf.INFURA( _project_id, _project_secret, _store=store )
+    #                   remote_node.warm_store( 15000000, 15001000 )
+    #@Parameters :
+    # _path        [ str ] SQLite database file.
+    # _confirmations[int ] Blocks a result must be buried under before it is stored.
+    # _level       [ int ] zlib compression level.
+    def __init__( self, _path, _confirmations=12, _level=6 ):
+        self.path          = _path
+        self.confirmations = _confirmations
+        self.hits    = 0
+        self.misses  = 0
+        self.writes  = 0
+        self._level  = _level
+        self._dirty  = 0
+        self._lock   = threading.Lock()
+        import sqlite3
+        self._db     = sqlite3.connect(_path,check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS responses ( method TEXT, params TEXT, body BLOB, PRIMARY KEY ( method, params ) ) WITHOUT ROWID")
+        self._db.commit()
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc ):
+        self.close()
+
+    def __len__( self ):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    #@Description: Returns the uncompressed JSON bytes stored for a key, None on a miss.
+    def get_bytes( self, _key ):
+        with self._lock:
+            _row = self._db.execute("SELECT body FROM responses WHERE method=? AND params=?",_key).fetchone()
+            if _row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return zlib.decompress(_row[0])
+
+    #@Description: Returns the response stored for a key, None on a miss.
+    def get( self, _key ):
+        _body = self.get_bytes(_key)
+        return None if _body is None else _loads(_body)
+
+    #@Description: Stores a response. Writes are committed in groups, see flush.
+    #@Parameters :
+    # _key         [tuple] See _final_key.
+    # _response    [ dict] The decoded response.
+    def put( self, _key, _response ):
+        _body = zlib.compress(_dumps(_response),self._level)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES ( ?, ?, ? )",(_key[0],_key[1],_body))
+            self.writes += 1
+            self._dirty  += 1
+            if self._dirty >= _STORE_COMMIT_EVERY:
+                self._db.commit()
+                self._dirty = 0
+
+    #@Description: Commits pending writes.
+    def flush( self ):
+        with self._lock:
+            self._db.commit()
+            self._dirty = 0
+
+    def close( self ):
+        self.flush()
+        with self._lock:
+            self._db.close()
+
+    #@Description: Counters snapshot.
+    def stats( self ):
+        return {"path":self.path,"hits":self.hits,"misses":self.misses,"writes":self.writes}
+
+
+class ChainArchive(object):
+    #@Description: Append-only directory of exported blocks, with their receipts, filled by
+    #              INFURA.export_chain. Blocks go to segment files of up to _segment_blocks
+    #              consecutive blocks, one zlib compressed JSON record per block, next to an
+    #              index file holding the end offset of each record as little endian uint64.
+    #              The index is only written after its record, so it is also the checkpoint:
+    #              on open, bytes past the last indexed record are cut off and an export
+    #              resumes at the first block missing. Reads mmap the segment files.
+    #              i.e  with inf.ChainArchive("mainnet") as archive:
+    #                       remote_node.export_chain(archive,17000000,17099999)
+    #                       receipts = archive.get(17000042)["receipts"]
+    #@Parameters :
+    # _path        [ str ] Directory, created when missing.
+    # _segment_blocks[int] Max blocks per segment file.
+    # _level       [ int ] zlib compression level.
+    def __init__( self, _path, _segment_blocks=_SEGMENT_BLOCKS, _level=6 ):
+        self.path            = _path
+        self.segment_blocks  = max(1,_segment_blocks)
+        self._level    = _level
+        self._lock     = threading.Lock()
+        self._firsts   = []
+        self._ends     = {}
+        self._maps     = {}
+        self._writer   = None
+        os.makedirs(_path,exist_ok=True)
+        for _name in sorted(os.listdir(_path)):
+            if _name.endswith(".seg"):
+                self._open_segment(int(_name[:-4]))
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc ):
+        self.close()
+
+    def __len__( self ):
+        return sum(len(_ends) for _ends in self._ends.values())
+
+    def __contains__( self, _num ):
+        return self._segment_of(_num) is not None
+
+    def _file( self, _first, _ext ):
+        return os.path.join(self.path,"{:012d}.{}".format(_first,_ext))
+
+    #@Description: Loads a segments index, dropping a record or index entry cut short.
+    def _open_segment( self, _first ):
+        _ends = array.array("Q")
+        _idx  = self._file(_first,"idx")
+        if os.path.exists(_idx):
+            with open(_idx,"rb") as _f:
+                _data = _f.read()
+            _ends.frombytes(_data[:len(_data) - len(_data) % 8])
+            if sys.byteorder == "big":
+                _ends.byteswap()
+        _size = os.path.getsize(self._file(_first,"seg"))
+        while _ends and _ends[-1] > _size:
+            _ends.pop()
+        for _ext, _keep in (("seg",_ends[-1] if _ends else 0),("idx",8 * len(_ends))):
+            with open(self._file(_first,_ext),"ab") as _f:
+                _f.truncate(_keep)
+        if not _ends:
+            for _ext in ("seg","idx"):
+                os.remove(self._file(_first,_ext))
+            return
+        bisect.insort(self._firsts,_first)
+        self._ends[_first] = _ends
+
+    #@Description: First block number of the segment holding _num, None when not archived.
+    def _segment_of( self, _num ):
+        _at = bisect.bisect_right(self._firsts,_num) - 1
+        if _at < 0:
+            return None
+        _first = self._firsts[_at]
+        return _first if _num - _first < len(self._ends[_first]) else None
+
+    #@Description: Raw uncompressed JSON record of a block, None when not archived.
+    def get_bytes( self, _num ):
+        with self._lock:
+            _first = self._segment_of(_num)
+            if _first is None:
+                return None
+            _ends = self._ends[_first]
+            _i    = _num - _first
+            _map  = self._maps.get(_first)
+            if _map is None or len(_map) < _ends[_i]:
+                if self._writer is not None and self._writer[0] == _first:
+                    self._flush()
+                if _map is not None:
+                    _map.close()
+                with open(self._file(_first,"seg"),"rb") as _f:
+                    _map = self._maps[_first] = mmap.mmap(_f.fileno(),0,access=mmap.ACCESS_READ)
+            return zlib.decompress(_map[_ends[_i - 1] if _i else 0:_ends[_i]])
+
+    #@Description: The record of a block, {"block":..., "receipts":[...]}, None when not archived.
+    def get( self, _num ):
+        _body = self.get_bytes(_num)
+        return None if _body is None else _loads(_body)
+
+    #@Description: Records of the archived blocks in [ _start, _end ], in block order.
+    def iter_range( self, _start, _end ):
+        for _num in range(_start,_end + 1):
+            _record = self.get(_num)
+            if _record is not None:
+                yield _record
+
+    #@Description: Appends the record of block _num. Blocks must be appended in order, a
+    #              block not following the last one written starts a new segment.
+    def append( self, _num, _record ):
+        _body = zlib.compress(_dumps(_record),self._level)
+        with self._lock:
+            if self._segment_of(_num) is not None:
+                raise InfuraError("Block [ {} ] is already archived".format(_num))
+            _first = self._writer[0] if self._writer is not None else None
+            if _first is None or _first + len(self._ends[_first]) != _num or len(self._ends[_first]) >= self.segment_blocks:
+                self._close_writer()
+                # continues the segment ending right before _num, when it has room left
+                _first = self._segment_of(_num - 1)
+                if _first is None or len(self._ends[_first]) >= self.segment_blocks:
+                    _first = _num
+                    bisect.insort(self._firsts,_num)
+                    self._ends[_num] = array.array("Q")
+                self._writer = (_first,open(self._file(_first,"seg"),"ab"),open(self._file(_first,"idx"),"ab"),[])
+            _first, _seg, _idx, _pending = self._writer
+            _ends = self._ends[_first]
+            _seg.write(_body)
+            _ends.append((_ends[-1] if _ends else 0) + len(_body))
+            _pending.append(_ends[-1])
+            if len(_pending) >= _ARCHIVE_FLUSH_EVERY:
+                self._flush()
+
+    #@Description: Writes the pending index entries, after the records they point at.
+    def _flush( self ):
+        _first, _seg, _idx, _pending = self._writer
+        _seg.flush()
+        _out = array.array("Q",_pending)
+        if sys.byteorder == "big":
+            _out.byteswap()
+        _idx.write(_out.tobytes())
+        _idx.flush()
+        del _pending[:]
+
+    def _close_writer( self ):
+        if self._writer is not None:
+            self._flush()
+            self._writer[1].close()
+            self._writer[2].close()
+            self._writer = None
+
+    def flush( self ):
+        with self._lock:
+            if self._writer is not None:
+                self._flush()
+
+    def close( self ):
+        with self._lock:
+            self._close_writer()
+            for _map in self._maps.values():
+                _map.close()
+            self._maps.clear()
+
+    #@Description: Counters snapshot.
+    def stats( self ):
+        return {"path":self.path,"blocks":len(self),"segments":len(self._firsts),
+                "bytes":sum(_ends[-1] for _ends in self._ends.values() if _ends)}
+
+
+#@Description: Seconds asked for by a Retry-After header, None when absent or a date.
+def _retry_after( _rtn ):
+    try:
+        return max(0.0,float(_rtn.headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter(object):
+    #@Description: Client side token bucket. Every call takes one token, a batch one per
+    #              call in it. The rate adapts to the providers quota: an HTTP 429 cuts it
+    #              multiplicatively and pauses for Retry-After, clean traffic raises it again.
+    #              Below the rate of the last 429 it climbs by _increase calls/sec per second,
+    #              past it only by a tenth of that, so throughput settles just under the quota.
+    #              One limiter may be shared by several INFURA objects on the same quota.
+    #              i.e  remote_node = inf.INFURA( _project_id, _project_secret, _limiter=inf.RateLimiter(50) )
+    #@Parameters :
+    # _rate        [float] Starting rate in calls/sec.
+    # _burst       [float] Bucket size in seconds of the current rate.
+    # _min_rate    [float] Floor of the adaptive rate.
+    # _max_rate    [float] Ceiling of the adaptive rate, defaults to _rate.
+    # _decrease    [float] Factor applied to the rate on a 429.
+    # _increase    [float] Calls/sec gained per second of unthrottled traffic, defaults to a
+    #                      twentieth of _max_rate.
+    def __init__( self, _rate=10.0, _burst=1.0, _min_rate=1.0, _max_rate=None, _decrease=0.8, _increase=None ):
+        self.rate      = float(_rate)
+        self.burst     = float(_burst)
+        self.min_rate  = float(_min_rate)
+        self.max_rate  = float(_max_rate or _rate)
+        self.throttles = 0
+        self._decrease = _decrease
+        self._increase = float(_increase or self.max_rate / 20.0)
+        self._ceiling  = float("inf")
+        self._calm     = 0.0
+        self._tokens   = max(1.0,self.burst * self.rate)
+        self._stamp    = time.monotonic()
+        self._lock     = threading.Lock()
+
+    def _refill( self, _now ):
+        self._tokens = min(max(1.0,self.burst * self.rate),self._tokens + (_now - self._stamp) * self.rate)
+        self._stamp  = _now
+
+    #@Description: Takes _n tokens, sleeping until the bucket can pay for them. Callers are
+    #              served in arrival order, a debt is paid off before later callers run.
+    def acquire( self, _n=1 ):
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= _n
+            _wait = -self._tokens / self.rate
+        if _wait > 0:
+            time.sleep(_wait)
+
+    #@Description: Reports an HTTP 429. Drains the bucket for the Retry-After delay, or one
+    #              token interval when none was given, and cuts the rate. The 429s of sends
+    #              already in flight when the first one arrived only cut it once.
+    def throttled( self, _retry_after=None ):
+        with self._lock:
+            _now = time.monotonic()
+            self._refill(_now)
+            self.throttles += 1
+            _pause = _retry_after if _retry_after is not None else 1.0 / self.rate
+            if _now >= self._calm:
+                self._ceiling = self.rate
+                self.rate  = max(self.min_rate,self.rate * self._decrease)
+                self._calm = _now + _pause + _CALM
+            self._tokens = min(self._tokens,0.0) - _pause * self.rate
+
+    #@Description: Reports _n calls that went through unthrottled.
+    def succeeded( self, _n=1 ):
+        with self._lock:
+            _step = self._increase if self.rate < self._ceiling else self._increase / 10.0
+            self.rate = min(self.max_rate,self.rate + _step * _n / self.rate)
+
+    #@Description: Counters snapshot.
+    def stats( self ):
+        return {"rate":round(self.rate,3),"burst":self.burst,"throttles":self.throttles}
+
+
+#@Description: Returns the p-th percentile ( 0 - 100 ) of a list of samples.
+def _percentile( _samples, _p ):
+    _ordered = sorted(_samples)
+    if not _ordered:
+        return 0.0
+    return _ordered[min(len(_ordered) - 1,int(round(_p / 100.0 * (len(_ordered) - 1))))]
+
+
+class RetryPolicy(object):
+    #@Description: Retries and hedging of idempotent reads. A send failing on the transport
+    #              or with an HTTP 5xx is retried after an exponential, fully jittered backoff.
+    #              With hedging, a read still unanswered after the _quantile latency of recent
+    #              sends is sent a second time and the first answer wins. Writes, i.e
+    #              eth_sendRawTransaction, are never retried nor hedged.
+    #              i.e  remote_node = inf.INFURA( _project_id, _project_secret, _retry=inf.RetryPolicy(_hedge=True) )
+    #@Parameters :
+    # _retries     [ int ] Retries after the first attempt.
+    # _base        [float] Backoff of the first retry in seconds, doubling on each retry.
+    # _cap         [float] Max backoff in seconds.
+    # _hedge       [ bool] Send a duplicate read once the hedge delay has passed.
+    # _quantile    [float] Latency percentile used as hedge delay.
+    # _min_delay   [float] Floor of the hedge delay in seconds.
+    # _window      [ int ] Number of recent latencies the percentile is taken over.
+    def __init__( self, _retries=3, _base=0.1, _cap=5.0, _hedge=False, _quantile=95, _min_delay=0.05, _window=256 ):
+        self.max_retries = _retries
+        self.retries     = 0
+        self.hedges      = 0
+        self.hedge_wins  = 0
+        self._base       = _base
+        self._cap        = _cap
+        self._hedge      = _hedge
+        self._quantile   = _quantile
+        self._min_delay  = _min_delay
+        self._latencies  = collections.deque(maxlen=_window)
+        self._pool       = None
+        self._lock       = threading.Lock()
+
+    #@Description: Jittered backoff before retry number _attempt ( 0 based ).
+    def backoff( self, _attempt ):
+        return random.uniform(0,min(self._cap,self._base * 2 ** _attempt))
+
+    #@Description: Current hedge delay, the _quantile latency of recent sends.
+    def hedge_delay( self ):
+        with self._lock:
+            _samples = list(self._latencies)
+        if len(_samples) < 20:
+            return max(self._min_delay,max(_samples or [ 0.0 ]) * 2)
+        return max(self._min_delay,_percentile(_samples,self._quantile))
+
+    #@Description: Runs a send under the policy.
+    #@Parameters :
+    # _fn          [ func] Sends once and returns the requests object, may raise.
+    #@Return     :
+    # _rtn         Requests object of the first good answer, or of the last attempt.
+    def run( self, _fn ):
+        _error = None
+        for _attempt in range(self.max_retries + 1):
+            try:
+                _rtn = self._hedged(_fn) if self._hedge else self._timed(_fn)
+                if _rtn.status_code < 500:
+                    return _rtn
+                _error = None
+            except InfuraError:
+                # the node answered, i.e still throttled, a retry would not change that
+                raise
+            except Exception as e:
+                _error = e
+            if _attempt < self.max_retries:
+                with self._lock:
+                    self.retries += 1
+                time.sleep(self.backoff(_attempt))
+        if _error is not None:
+            raise _error
+        return _rtn
+
+    def _timed( self, _fn ):
+        _t0  = time.perf_counter()
+        _rtn = _fn()
+        if _rtn.status_code < 500:
+            with self._lock:
+                self._latencies.append(time.perf_counter() - _t0)
+        return _rtn
+
+    #@Description: Sends once, and a second time if the first is not back within the hedge
+    #              delay. Returns the first good answer of either.
+    def _hedged( self, _fn ):
+        with self._lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(_HEDGE_WORKERS)
+        _first = self._pool.submit(self._timed,_fn)
+        try:
+            return _first.result(timeout=self.hedge_delay())
+        except concurrent.futures.TimeoutError:
+            pass
+        with self._lock:
+            self.hedges += 1
+        _second = self._pool.submit(self._timed,_fn)
+        _error, _rtn = None, None
+        for _future in concurrent.futures.as_completed([ _first, _second ]):
+            try:
+                _rtn = _future.result()
+            except Exception as e:
+                _error = e
+                continue
+            if _rtn.status_code < 500:
+                if _future is _second:
+                    with self._lock:
+                        self.hedge_wins += 1
+                return _rtn
+        if _rtn is None:
+            raise _error
+        return _rtn
+
+    #@Description: Counters snapshot.
+    def stats( self ):
+        return {"retries":self.retries,"hedges":self.hedges,"hedge_wins":self.hedge_wins,
+                "hedge_delay":round(self.hedge_delay(),4)}
+
+
+class Endpoint(object):
+    #@Description: One url of an EndpointPool and its moving health scores.
+    __slots__ = ("url","latency","error_rate","inflight","calls","errors","failures","ejected_until")
+
+    def __init__( self, _url ):
+        self.url        = _url
+        self.latency    = 0.0
+        self.error_rate = 0.0
+        self.inflight   = 0
+        self.calls      = 0
+        self.errors     = 0
+        self.failures   = 0
+        self.ejected_until = 0.0
+
+    #@Description: Routing cost, lower is better. Latency weighted by the sends already in
+    #              flight, so concurrent load spills over to the next best endpoint.
+    def score( self ):
+        return max(self.latency,1e-4) * (self.inflight + 1) * (1.0 + 4.0 * self.error_rate)
+
+
+class EndpointPool(object):
+    #@Description: Several endpoints, or project ids, behind one INFURA object. Every send is
+    #              routed to the healthy endpoint with the lowest moving latency and error rate
+    #              score, concurrent sends spread over the pool. An endpoint failing
+    #              _eject_after times in a row is ejected for _eject_for seconds. Batches of
+    #              several POSTs are sent over the pool concurrently.
+    #              i.e  pool = inf.EndpointPool.from_projects([ _id_a, _id_b ])
+    #                   remote_node = inf.INFURA( _id_a, _secret_a, _endpoints=pool )
+    #@Parameters :
+    # _urls        [ list] Endpoint urls.
+    # _alpha       [float] Weight of the newest sample in the moving scores.
+    # _eject_after [ int ] Consecutive failures ejecting an endpoint.
+    # _eject_for   [float] Seconds an ejected endpoint is left out.
+    def __init__( self, _urls, _alpha=0.2, _eject_after=_EJECT_AFTER, _eject_for=_EJECT_FOR ):
+        if not _urls:
+            raise ValueError("EndpointPool needs at least one url")
+        self.endpoints   = [ Endpoint(_url) for _url in _urls ]
+        self._alpha      = _alpha
+        self._eject_after= _eject_after
+        self._eject_for  = _eject_for
+        self._pool       = None
+        self._lock       = threading.Lock()
+
+    #@Description: Pool of the infura urls of several project ids.
+    @classmethod
+    def from_projects( cls, _project_ids, _network='mainnet', **kwargs ):
+        return cls([ "{}://{}.{}/{}/{}".format(_PROTOCOL,_network,_ENDPOINT,_VERSION,_id) for _id in _project_ids ],**kwargs)
+
+    def __len__( self ):
+        return len(self.endpoints)
+
+    #@Description: Takes the best healthy endpoint for one send, see report. When every
+    #              endpoint is ejected the one coming back first is used.
+    def pick( self ):
+        with self._lock:
+            _now = time.monotonic()
+            _healthy = [ _e for _e in self.endpoints if _e.ejected_until <= _now ]
+            if _healthy:
+                _best = min(_healthy,key=Endpoint.score)
             else:
-                print(" Method [ {} ] cannot be found. Returning None ".format(_method))
-                return None            
-        except Exception as e:
-            print("API Exception : {} ".format( str()) )
-            return {} 
-            
-        return _rtn.json()
+                _best = min(self.endpoints,key=lambda _e: _e.ejected_until)
+            _best.inflight += 1
+            return _best
+
+    #@Description: Reports the outcome of a send taken with pick.
+    #@Parameters :
+    # _endpoint    [Endpoint] The endpoint picked.
+    # _latency     [float] Seconds the send took.
+    # _ok          [ bool] False on a transport error, a 5xx or a 429.
+    def report( self, _endpoint, _latency, _ok ):
+        with self._lock:
+            _endpoint.inflight -= 1
+            _endpoint.calls    += 1
+            _a = self._alpha
+            _endpoint.error_rate = (1 - _a) * _endpoint.error_rate + _a * (0.0 if _ok else 1.0)
+            if _ok:
+                _endpoint.latency  = _latency if _endpoint.calls == 1 else (1 - _a) * _endpoint.latency + _a * _latency
+                _endpoint.failures = 0
+                return
+            _endpoint.errors   += 1
+            _endpoint.failures += 1
+            if _endpoint.failures >= self._eject_after:
+                _endpoint.ejected_until = time.monotonic() + self._eject_for
+                _endpoint.failures = 0
+
+    #@Description: Runs _fn over _items concurrently, one worker per endpoint.
+    def map( self, _fn, _items ):
+        with self._lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(2 * len(self.endpoints))
+        return list(self._pool.map(_fn,_items))
+
+    #@Description: Per endpoint scores snapshot.
+    def stats( self ):
+        _now = time.monotonic()
+        with self._lock:
+            return [ {"url":_e.url,"latency_ms":round(_e.latency * 1000,3),"error_rate":round(_e.error_rate,3),
+                      "calls":_e.calls,"errors":_e.errors,"inflight":_e.inflight,"ejected":_e.ejected_until > _now}
+                     for _e in self.endpoints ]
+
+
+class Metrics(object):
+    #@Description: Per method instrumentation of INFURA calls: call and error counts, a
+    #              latency histogram and request/response bytes, plus the counters of the
+    #              cache, store, limiter, retry policy and endpoint pool of the nodes using
+    #              it. Exports a JSON snapshot or Prometheus text. Pre/post hooks see every
+    #              call. A node without metrics pays a single None check per call.
+    #              i.e  metrics = inf.Metrics()
+    #                   remote_node = inf.INFURA( _project_id, _project_secret, _metrics=metrics )
+    #                   print(metrics.prometheus())
+    #@Parameters :
+    # _buckets     [tuple] Latency histogram bucket upper bounds, in seconds.
+    # _prefix      [ str ] Prefix of the exported metric names.
+    def __init__( self, _buckets=_LATENCY_BUCKETS, _prefix="infura" ):
+        self.buckets  = tuple(sorted(_buckets))
+        self.prefix   = _prefix
+        self.methods  = {}
+        self._pre     = []
+        self._post    = []
+        self._sources = collections.OrderedDict()
+        self._lock    = threading.Lock()
+
+    #@Description: Adds call hooks. _pre( method, params ) runs before every call, _post(
+    #              method, params, response, seconds ) after it, with the response the
+    #              caller gets ( {} on a transport error ).
+    def add_hook( self, _pre=None, _post=None ):
+        if _pre is not None:
+            self._pre.append(_pre)
+        if _post is not None:
+            self._post.append(_post)
+
+    #@Description: Exports the stats() of a component ( cache, limiter ... ) under _name.
+    # _source      Object with a stats() method, or a function returning the stats.
+    def watch( self, _name, _source ):
+        self._sources[_name] = getattr(_source,"stats",_source)
+
+    #@Description: Runs the pre hooks of a call about to be made.
+    #@Return     :
+    # _t0          [float] Start time, to hand back to finish.
+    def start( self, _method, _params ):
+        for _hook in self._pre:
+            _hook(_method,_params)
+        return time.perf_counter()
+
+    #@Description: Records a finished call and runs the post hooks.
+    #@Parameters :
+    # _response    [ dict] What the caller gets, None or {} when the call failed.
+    # _t0          [float] The start time returned by start.
+    def finish( self, _method, _params, _response, _t0 ):
+        _seconds = time.perf_counter() - _t0
+        self.observe(_method,_seconds,not _response or "error" in _response)
+        for _hook in self._post:
+            _hook(_method,_params,_response,_seconds)
+
+    def _stats_of( self, _method ):
+        _stats = self.methods.get(_method)
+        if _stats is None:
+            _stats = self.methods[_method] = {"calls":0,"errors":0,"seconds":0.0,"request_bytes":0,
+                                              "response_bytes":0,"buckets":[ 0 ] * (len(self.buckets) + 1)}
+        return _stats
+
+    #@Description: Records one call.
+    #@Parameters :
+    # _method      [ str ] The name of the JSON RPC method.
+    # _seconds     [float] Latency seen by the caller.
+    # _error       [ bool] The call failed or returned an error object.
+    def observe( self, _method, _seconds, _error=False ):
+        with self._lock:
+            _stats = self._stats_of(_method)
+            _stats["calls"]   += 1
+            _stats["errors"]  += bool(_error)
+            _stats["seconds"] += _seconds
+            _stats["buckets"][bisect.bisect_left(self.buckets,_seconds)] += 1
+
+    #@Description: Adds the bytes sent and received for calls of _method.
+    def observe_bytes( self, _method, _sent, _received ):
+        with self._lock:
+            _stats = self._stats_of(_method)
+            _stats["request_bytes"]  += _sent
+            _stats["response_bytes"] += _received
+
+    #@Description: JSON serializable snapshot. Histogram buckets are cumulative, keyed by
+    #              their upper bound, like Prometheus.
+    def snapshot( self ):
+        _methods = {}
+        with self._lock:
+            for _method, _stats in self.methods.items():
+                _out = dict(_stats,seconds=round(_stats["seconds"],6))
+                _out["buckets"] = dict(zip([ str(_b) for _b in self.buckets ] + [ "+Inf" ],itertools.accumulate(_stats["buckets"])))
+                _methods[_method] = _out
+        return {"methods":_methods,"sources":{ _name:_stats() for _name, _stats in self._sources.items() }}
+
+    #@Description: Prometheus text exposition of the snapshot.
+    def prometheus( self ):
+        _snap = self.snapshot()
+        _p    = self.prefix
+        _out  = []
+        for _name, _key, _type, _help in (
+                ("requests_total","calls","counter","JSON RPC calls by method."),
+                ("errors_total","errors","counter","JSON RPC calls that failed or returned an error."),
+                ("request_bytes_total","request_bytes","counter","Request body bytes by method."),
+                ("response_bytes_total","response_bytes","counter","Response body bytes by method.")):
+            _out.append("# HELP {}_{} {}".format(_p,_name,_help))
+            _out.append("# TYPE {}_{} {}".format(_p,_name,_type))
+            for _method, _stats in sorted(_snap["methods"].items()):
+                _out.append('{}_{}{{method="{}"}} {}'.format(_p,_name,_method,_stats[_key]))
+        _out.append("# HELP {}_latency_seconds JSON RPC call latency by method.".format(_p))
+        _out.append("# TYPE {}_latency_seconds histogram".format(_p))
+        for _method, _stats in sorted(_snap["methods"].items()):
+            for _le, _count in _stats["buckets"].items():
+                _out.append('{}_latency_seconds_bucket{{method="{}",le="{}"}} {}'.format(_p,_method,_le,_count))
+            _out.append('{}_latency_seconds_sum{{method="{}"}} {}'.format(_p,_method,_stats["seconds"]))
+            _out.append('{}_latency_seconds_count{{method="{}"}} {}'.format(_p,_method,_stats["calls"]))
+        for _source, _stats in _snap["sources"].items():
+            for _labels, _values in ([ ('{{url="{}"}}'.format(_s.get("url")),_s) for _s in _stats ]
+                                     if isinstance(_stats,list) else [ ("",_stats) ]):
+                for _key, _value in _values.items():
+                    if isinstance(_value,(bool,int,float)):
+                        _out.append("{}_{}_{}{} {}".format(_p,_source,_key,_labels,float(_value)))
+        return "\n".join(_out) + "\n"
+
+
+class _Methods(object):
+    #@Description: JSON RPC wrapper methods shared by INFURA, AsyncINFURA and their batch
+    #              proxies. Each wrapper only goes through api_call and _then, so the same
+    #              method returns a result, a _Pending placeholder or a coroutine depending
+    #              on the client it is called on. Bulk helpers stay on INFURA.
 
     #@Description: Return the base url 
     #@Parameters : None 
@@ -77,7 +1072,7 @@ class INFURA(object):
     # Addresses    [ list] Hex codes as strings representing the addresses
     #                      owned by the client. 
     def get_accounts( self ):
-        return self.api_call("eth_accounts",[])["result"] 
+        return self._then(self.api_call("eth_accounts",[]),lambda _rtn: _rtn["result"])
 
     #@Description: Returns the current "latest" block number. 
     #@Method     : eth_blockNumber   
@@ -87,8 +1082,7 @@ class INFURA(object):
     # id	   [ int ] ...
     # result       [ hex ] hex code of an integer rep. current block.
     def get_block_number( self ):
-        _rtn = self.api_call("eth_blockNumber",[])
-        return int(_rtn["result"],16)    
+        return self._then(self.api_call("eth_blockNumber",[]),lambda _rtn: int(_rtn["result"],16))
 
     #@Description: Returns information about a block by hash.
     #@Method     : eth_getBlockByHash
@@ -396,6 +1390,17 @@ class INFURA(object):
     def get_tx_count( self,_address, _blk_param ):
         return self.api_call("eth_getTransactionCount",[str(_address),_blk_param])
     
+    #@Description: Submits a pre-signed transaction for broadcast to the Ethereum network.
+    #              Never retried nor hedged, see NonceManager for sending many.
+    #@Method     : eth_sendRawTransaction
+    #@Parameters :
+    # required: 
+    # _tx_data    [ str ] The signed transaction data.
+    #@Return     :
+    # tx_hash     [ str ] 32 Bytes, the tx hash/ 0 hash if the tx is not yet available.  
+    def send_raw_transaction( self, _tx_data ):
+        return self.api_call("eth_sendRawTransaction",[str(_tx_data)])
+
     #@Description: Returns the number of uncles in a block from a block matching given block hash.
     #@Method     : eth_getUncleCountByBlockHash
     #@Parameters :
@@ -579,16 +1584,2152 @@ class INFURA(object):
     def submit_work( self ):
         pass 
 
-    #@Description: Submits a pre-signed transaction for broadcast to the Ethereum network.
-    #@Method     : eth_sendRawTransaction
+
+class INFURA(_Methods):
+    #@Description: Infura typed object. Every instance owns a pooled keep-alive transport
+    #              so consecutive calls reuse the same TCP+TLS connection to the node.
     #@Parameters :
-    # required: 
-    # _tx_data    [ str ] The signed transaction data.
+    # _project_id  [ str ] Infura project id.
+    # _project_scrt[ str ] Infura project secret.
+    # _network     [ str ] Network name, i.e "mainnet", "ropsten", "kovan" ...
+    # _url         [ str ] Explicit endpoint url, overrides the network derived infura url.
+    # _pool_size   [ int ] Number of per-host connection pools kept by the transport.
+    # _pool_maxsize[ int ] Max connections kept alive per host.
+    # _pool_block  [ bool] True blocks callers once _pool_maxsize connections are busy.
+    # _timeout     [tuple] ( connect, read ) timeouts in seconds, None waits forever.
+    # _pooled      [ bool] False falls back to a fresh connection per call.
+    # _batch_size  [ int ] Max calls sent per JSON RPC batch POST.
+    # _cache       [ResponseCache] Opt-in cache of immutable block/tx/receipt responses.
+    # _store       [ChainStore] Opt-in persistent store of finalized block/tx/receipt responses.
+    # _coalesce    [ bool] Concurrent identical calls share one in-flight request.
+    # _limiter     [RateLimiter] Client side rate limit, may be shared between instances.
+    # _retry       [RetryPolicy] Retries and hedging of idempotent reads.
+    # _endpoints   [EndpointPool] Several urls sends are routed over, replaces _url.
+    # _typed       [ bool] Block, tx, receipt and log results come back as compact models.
+    # _metrics     [Metrics] Per method counts, latencies and bytes, and hooks on every call.
+    # _ttl_cache   [TTLCache] Opt-in short lived cache of volatile head data, gas price etc.
+    # _call_cache  [CallCache] Opt-in per block cache of eth_calls results.
+    def __init__( self, _project_id, _project_scrt, _network='mainnet', _url=None, _pool_size=_POOL_SIZE,
+                  _pool_maxsize=_POOL_MAXSIZE, _pool_block=False, _timeout=_TIMEOUT, _pooled=True,
+                  _batch_size=_BATCH_SIZE, _cache=None, _store=None, _coalesce=False, _limiter=None,
+                  _retry=None, _endpoints=None, _typed=False, _metrics=None, _ttl_cache=None,
+                  _call_cache=None ):
+        self._PROJECT_ID   = _project_id
+        self._PROJECT_SCRT = _project_scrt
+        self._URL  = _url or "{}://{}.{}/{}/{}".format(_PROTOCOL,_network,_ENDPOINT,_VERSION,self._PROJECT_ID)
+        self._endpoints = _endpoints
+        if _endpoints is not None:
+            self._URL = _endpoints.endpoints[0].url
+        self._timeout = _timeout
+        self._batch_size = _batch_size
+        self._ids     = itertools.count(1)
+        self._cache   = _cache
+        self._store   = _store
+        self._flights = {} if _coalesce else None
+        self._limiter = _limiter
+        self._retry   = _retry
+        self._typed   = _typed
+        self._metrics = _metrics
+        self._ttl_cache   = _ttl_cache
+        self._call_cache  = _call_cache
+        self._flight_lock = threading.Lock()
+        self._answered    = threading.local()
+        self._supports    = {}
+        self.coalesced = 0
+        self._head    = (-1, 0.0)
+        self._session = None
+        if _pooled:
+            self._session = _new_session( _pool_size, _pool_maxsize, _pool_block )
+        if _metrics is not None:
+            for _name, _source in (("cache",_cache),("store",_store),("limiter",_limiter),("retry",_retry),("endpoint",_endpoints),
+                                   ("ttl_cache",_ttl_cache),("call_cache",_call_cache)):
+                if _source is not None:
+                    _metrics.watch(_name,_source)
+            if _coalesce:
+                _metrics.watch("coalesce",lambda: {"coalesced":self.coalesced})
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc ):
+        self.close()
+
+    #@Description: Releases the pooled connections held by this instance.
+    #@Parameters : None
+    #@Return     : None
+    def close( self ):
+        if self._session is not None:
+            self._session.close()
+
+    #@Description: Sends one POST/GET to the node, through the pool when one exists. With a
+    #              rate limiter the send waits for its tokens, and a throttled ( HTTP 429 )
+    #              send is paused and sent again. A 429 means the node did not process it.
+    #              Still throttled after _THROTTLE_RETRIES tries, it raises InfuraError whose
+    #              response is a -32005 error, the calls return that error.
+    #@Parameters :
+    # _type        [ str ] "POST" or "GET".
+    # _body        [ str ] The serialized JSON RPC payload.
+    # _cost        [ int ] Number of calls in the payload.
+    # _write       [ bool] The payload changes node state, it is never retried nor hedged.
+    # _stream      [ bool] Leaves the body unread, to be consumed with iter_content.
     #@Return     :
-    # tx_hash     [ str ] 32 Bytes, the tx hash/ 0 hash if the tx is not yet available.  
-    # * NOTE *    Infura will always return false in response to eth_mining.                      
-    def send_raw_transaction( self, _tx_data={}):
-        pass 
+    # _request     Requests object.
+    def _send( self, _type, _body, _cost=1, _write=False, _stream=False ):
+        if self._retry is None or _write:
+            return self._send_once(_type,_body,_cost,_stream)
+        return self._retry.run(lambda: self._send_once(_type,_body,_cost,_stream))
 
+    #@Description: One attempt of _send.
+    def _send_once( self, _type, _body, _cost, _stream=False ):
+        _caller = self._session if self._session is not None else requests
+        _sender = _caller.post if _type == "POST" else _caller.get
+        if self._limiter is None:
+            return self._route(_sender,_body,_stream)
+        for _try in range(_THROTTLE_RETRIES):
+            self._limiter.acquire(_cost)
+            _rtn = self._route(_sender,_body,_stream)
+            if _rtn.status_code != 429:
+                self._limiter.succeeded(_cost)
+                return _rtn
+            self._limiter.throttled(_retry_after(_rtn))
+        raise InfuraError("Still throttled after {} tries".format(_THROTTLE_RETRIES),
+                          _error_response(None,"HTTP 429, still throttled after {} tries".format(_THROTTLE_RETRIES),-32005))
 
-    
+    #@Description: Sends to the instance url, or to the best endpoint of the endpoint pool.
+    #              The url picked is kept on the returned object as answered_by, it outlives
+    #              retries and hedges run on other threads.
+    def _route( self, _sender, _body, _stream=False ):
+        if self._endpoints is None:
+            _rtn = _sender(self._URL,headers=_HEADERS,data=_body,timeout=self._timeout,stream=_stream)
+            _rtn.answered_by = self._URL
+            return _rtn
+        _endpoint = self._endpoints.pick()
+        _ok = False
+        _t0 = time.perf_counter()
+        try:
+            _rtn = _sender(_endpoint.url,headers=_HEADERS,data=_body,timeout=self._timeout,stream=_stream)
+            _ok  = _rtn.status_code < 500 and _rtn.status_code != 429
+            _rtn.answered_by = _endpoint.url
+            return _rtn
+        finally:
+            self._endpoints.report(_endpoint,time.perf_counter() - _t0,_ok)
+
+    #@Description: Forward facing caller. This function sanitizes outgoing and
+    #              handles errors in returns (tbd).  
+    #@Parameters :
+    # _method      [ str ] The name of the JSON RPC method. 
+    # _params      [ dict] The methods parameter counterparties. 
+    #@Return     :
+    # _request     Requests object. 
+    def api_call( self, _method, _params=[] ):
+        if self._metrics is None:
+            return self._api_call(_method,_params)
+        _t0  = self._metrics.start(_method,_params)
+        _rtn = None
+        try:
+            _rtn = self._api_call(_method,_params)
+            return _rtn
+        finally:
+            self._metrics.finish(_method,_params,_rtn,_t0)
+
+    def _api_call( self, _method, _params ):
+        if self._ttl_cache is not None and _method in self._ttl_cache.ttls:
+            return self._ttl_cache.get(_method,_params,lambda _m, _p: self._fetch(_m,_p)[0])
+        _key = None
+        if self._cache is not None or self._store is not None:
+            _key = _final_key(_method,_params)
+            _hit = self._lookup(_key) if _key is not None else None
+            if _hit is not None:
+                return _typed_response(_method,_hit) if self._typed else _hit
+        _response, _size = self._fetch(_method,_params)
+        if _key is not None and _size:
+            self._remember(_key,_method,_response,_size)
+        return _typed_response(_method,_response) if self._typed else _response
+
+    #@Description: Sends one call, shared with identical calls in flight when coalescing.
+    def _fetch( self, _method, _params ):
+        if self._flights is not None and _method not in _WRITE_METHOD:
+            return self._call_shared(_method,_params)
+        return self._call(_method,_params)
+
+    #@Description: Sends one call to the node.
+    #@Return     :
+    # _response    [ dict] The decoded response, {} on a transport error.
+    # _size        [ int ] Byte size of the response body, 0 when nothing was received.
+    def _call( self, _method, _params ):
+        _data = {"id":next(self._ids),"method":_method,"params":_params} 
+
+        # Catch/handle here. soon to be moved and expection class to be added 
+        try: 
+            if _method in _POST_METHOD:
+                _type = "POST" 
+                _body = _dumps(_data)
+                _rtn  = self._send(_type,_body,1,_method in _WRITE_METHOD)
+            elif _method in _GET_METHOD:
+                _type = "GET"
+                _body = _dumps(_data)
+                _rtn  = self._send(_type,_body,1,_method in _WRITE_METHOD)
+            else:
+                print(" Method [ {} ] cannot be found. Returning None ".format(_method))
+                return None, 0
+        except InfuraError as e:
+            return dict(e.response,id=_data["id"]), 0
+        except Exception as e:
+            print("API Exception : {} ".format( str()) )
+            return {}, 0
+        if self._metrics is not None:
+            self._metrics.observe_bytes(_method,len(_body),len(_rtn.content))
+        self._answered.url = getattr(_rtn,"answered_by",None)
+        return _decoded(_rtn,_data["id"]), len(_rtn.content)
+
+    #@Description: Single flight _call. The first caller of a ( method, params ) pair sends
+    #              it, identical calls arriving while it is in flight wait for its response.
+    def _call_shared( self, _method, _params ):
+        _fkey = (_method,json.dumps(_params,sort_keys=True))
+        with self._flight_lock:
+            _flight = self._flights.get(_fkey)
+            if _flight is not None:
+                self.coalesced += 1
+            else:
+                self._flights[_fkey] = _Flight()
+        if _flight is not None:
+            return _flight.wait(), 0
+        _response, _size = {}, 0
+        try:
+            _response, _size = self._call(_method,_params)
+        finally:
+            with self._flight_lock:
+                _flight = self._flights.pop(_fkey)
+            _flight.set(_response)
+        return _response, _size
+
+    #@Description: Looks a call up in the response cache, then in the chain store.
+    #@Return     :
+    # _response    [ dict] The known response, None when the call has to go out.
+    def _lookup( self, _key ):
+        if self._cache is not None:
+            _hit = self._cache.get(_key)
+            if _hit is not None:
+                return _hit
+        if self._store is not None:
+            _body = self._store.get_bytes(_key)
+            if _body is not None:
+                _hit = _loads(_body)
+                if self._cache is not None:
+                    self._cache.put(_key,_hit,len(_body))
+                return _hit
+        return None
+
+    #@Description: Keeps a fresh response in the cache and store it is final enough for.
+    def _remember( self, _key, _method, _response, _size ):
+        if self._cache is not None and self._is_final(_method,_response,self._cache.confirmations):
+            self._cache.put(_key,_response,_size)
+        if self._store is not None and self._is_final(_method,_response,self._store.confirmations):
+            self._store.put(_key,_response)
+
+    #@Description: True when a response is a block/tx/receipt buried under at least
+    #              _confirmations blocks, see ResponseCache.
+    def _is_final( self, _method, _response, _confirmations ):
+        _result = _response.get("result") if isinstance(_response,dict) else None
+        if not isinstance(_result,dict):
+            return False
+        _num = _result.get("number" if _method in _BLOCK_RESULT else "blockNumber")
+        if _num is None:
+            return False
+        _num = int(_num,16)
+        return _confirmations <= 0 or _num <= self._head_at_least(_num + _confirmations) - _confirmations
+
+    #@Description: The latest block number known to this instance. Refreshed from the node,
+    #              at most once per _HEAD_REFRESH seconds, while it is below _min. A stale head
+    #              only errs on the side of not caching.
+    def _head_at_least( self, _min ):
+        _head, _when = self._head
+        if _head < _min and time.time() - _when > _HEAD_REFRESH:
+            try:
+                _head = max(_head,self.get_block_number())
+            except Exception:
+                pass
+            self._head = (_head,time.time())
+        return _head
+
+    #@Description: Sends many calls as size capped JSON RPC batch POSTs. Responses are
+    #              matched back to their call by id.
+    #@Parameters :
+    # _calls       [ list] ( method, params ) tuples.
+    # _batch_size  [ int ] Max calls per POST, defaults to the instance batch size.
+    #@Return     :
+    # _responses   [ list] One response dict per call, in call order. A failed call holds
+    #                      an error tag instead of the result tag.
+    def api_batch( self, _calls, _batch_size=None ):
+        if self._metrics is None:
+            return self._api_batch(_calls,_batch_size)
+        _calls = list(_calls)
+        _t0 = [ self._metrics.start(_method,_params) for _method, _params in _calls ]
+        _responses = [ None ] * len(_calls)
+        try:
+            _responses = self._api_batch(_calls,_batch_size)
+            return _responses
+        finally:
+            for (_method, _params), _rtn, _start in zip(_calls,_responses,_t0):
+                self._metrics.finish(_method,_params,_rtn,_start)
+
+    def _api_batch( self, _calls, _batch_size ):
+        _size = _batch_size or self._batch_size
+        _calls = list(_calls)
+        _keys = [ None ] * len(_calls)
+        _responses = [ None ] * len(_calls)
+        # Calls answered by the response cache or chain store never go out.
+        if self._cache is not None or self._store is not None:
+            _keys = [ _final_key(_method,_params) for _method, _params in _calls ]
+            _responses = [ self._lookup(_key) if _key is not None else None for _key in _keys ]
+        _miss = [ _i for _i, _rtn in enumerate(_responses) if _rtn is None ]
+        if self._flights is not None:
+            _fresh = self._send_shared(_calls,_miss,_responses,_size)
+        else:
+            _fresh = self._send_chunks(_calls,_miss,_responses,_size)
+        for _i in _fresh:
+            if _keys[_i] is not None:
+                self._remember(_keys[_i],_calls[_i][0],_responses[_i],len(_dumps(_responses[_i])))
+        if self._typed:
+            return [ _typed_response(_method,_rtn) for (_method, _params), _rtn in zip(_calls,_responses) ]
+        return _responses
+
+    #@Description: Sends the calls at the given indexes as size capped batch POSTs.
+    #@Parameters :
+    # _calls       [ list] ( method, params ) tuples.
+    # _indexes     [ list] Indexes of the calls to send.
+    # _responses   [ list] Filled in place at those indexes.
+    #@Return     :
+    # _indexes     [ list] The indexes sent.
+    def _send_chunks( self, _calls, _indexes, _responses, _size ):
+        _parts = [ _indexes[_j:_j + _size] for _j in range(0,len(_indexes),_size) ]
+        _post  = lambda _part: self._post_batch([ _calls[_i] for _i in _part ])
+        if self._endpoints is not None and len(_parts) > 1:
+            _replies = self._endpoints.map(_post,_parts)
+        else:
+            _replies = map(_post,_parts)
+        for _part, _reply in zip(_parts,_replies):
+            for _i, _rtn in zip(_part,_reply):
+                _responses[_i] = _rtn
+        return _indexes
+
+    #@Description: Single flight _send_chunks. Duplicates inside the batch are sent once and
+    #              calls already in flight, from any thread or batch, are waited for.
+    #@Return     :
+    # _lead        [ list] The indexes actually sent.
+    def _send_shared( self, _calls, _indexes, _responses, _size ):
+        _flights = collections.OrderedDict()
+        _solo    = []
+        _follow  = []
+        with self._flight_lock:
+            for _i in _indexes:
+                _method, _params = _calls[_i]
+                if _method in _WRITE_METHOD:
+                    _solo.append(_i)
+                    continue
+                _fkey = (_method,json.dumps(_params,sort_keys=True))
+                if _fkey in _flights:
+                    _flights[_fkey][1].append(_i)
+                    self.coalesced += 1
+                elif _fkey in self._flights:
+                    _follow.append((self._flights[_fkey],_i))
+                    self.coalesced += 1
+                else:
+                    self._flights[_fkey] = _Flight()
+                    _flights[_fkey] = (self._flights[_fkey],[ _i ])
+        _lead = _solo + [ _group[0] for _flight, _group in _flights.values() ]
+        try:
+            self._send_chunks(_calls,_lead,_responses,_size)
+        finally:
+            with self._flight_lock:
+                for _fkey in _flights:
+                    self._flights.pop(_fkey)
+            for _flight, _group in _flights.values():
+                _flight.set(_responses[_group[0]] or _error_response(None,"Batch not sent"))
+        for _flight, _group in _flights.values():
+            for _i in _group[1:]:
+                _responses[_i] = _responses[_group[0]]
+        for _flight, _i in _follow:
+            _responses[_i] = _flight.wait()
+        return _lead
+
+    #@Description: Sends one batch POST, see api_batch.
+    def _post_batch( self, _calls ):
+        _data, _responses, _send = _batch_payload(self._ids,_calls)
+        if not _send:
+            return _responses
+        try:
+            _write = any(_data[_i]["method"] in _WRITE_METHOD for _i in _send)
+            _body  = _dumps([ _data[_i] for _i in _send ])
+            _rtn   = self._send("POST",_body,len(_send),_write).content
+            if self._metrics is not None:
+                # the POST bytes are split evenly over its calls
+                for _i in _send:
+                    self._metrics.observe_bytes(_data[_i]["method"],len(_body) // len(_send),len(_rtn) // len(_send))
+            _rtn = _loads(_rtn)
+        except InfuraError as e:
+            _rtn = e.response
+        except Exception as e:
+            _rtn = {"error":{"code":-32603,"message":str(e)}}
+        return _match_batch(_data,_responses,_send,_rtn)
+
+    #@Description: Queues calls made through the wrapper methods and sends them as
+    #              batches when the with block exits.
+    #              i.e  with remote_node.batch() as batch:
+    #                       blk = batch.get_block_by_number(12)
+    #                   blk.result()
+    #@Parameters :
+    # _batch_size  [ int ] Max calls per POST, defaults to the instance batch size.
+    #@Return     :
+    # batch        [INFURABatch] Proxy exposing the same wrapper methods.
+    def batch( self, _batch_size=None ):
+        return INFURABatch(self,_batch_size)
+
+    #@Description: Applies a post-processing step to a call return. Lets wrappers such
+    #              as get_block_number work on direct, batched and async returns alike.
+    #@Parameters :
+    # _rtn         [ dict] The api_call return.
+    # _fn          [ func] The post-processing step.
+    def _then( self, _rtn, _fn ):
+        return _fn(_rtn)
+
+    """ - Bulk helpers - """
+
+    #@Description: Streams the blocks of a range strictly in block order. Blocks are fetched
+    #              concurrently with at most _prefetch blocks read ahead, so memory stays flat
+    #              over long ranges.
+    #@Parameters :
+    # _start       [ int ] First block number.
+    # _end         [ int ] Last block number ( inclusive ), None for the current latest block.
+    # _tx_flag     [ bool] true returns full tx objects, false only tx hashes.
+    # _workers     [ int ] Blocks fetched concurrently.
+    # _prefetch    [ int ] Max blocks fetched ahead of the consumer.
+    # _checkpoint  [ str ] File path. The last block handed to and released by the consumer
+    #                      is saved there, a later call with the same path resumes after it.
+    #@Return     :
+    # blocks       [ gen ] Block objects, the "result" tag of get_block_by_number.
+    def iter_blocks( self, _start, _end=None, _tx_flag=True, _workers=_WORKERS, _prefetch=_PREFETCH, _checkpoint=None ):
+        if _end is None:
+            _end = self.get_block_number()
+        if _checkpoint is not None:
+            _done = _read_checkpoint(_checkpoint)
+            if _done is not None:
+                _start = max(_start,_done + 1)
+        _fetch = lambda _num: self.get_block_by_number(_num,_tx_flag)
+        _done  = None
+        try:
+            for _num, _rtn in self._prefetched(_fetch,range(_start,_end + 1),_workers,_prefetch):
+                yield _result_of(_rtn,"eth_getBlockByNumber [ {} ]".format(_num))
+                _done = _num
+                if _checkpoint is not None and (_num - _start + 1) % _CHECKPOINT_EVERY == 0:
+                    _write_checkpoint(_checkpoint,_done)
+        finally:
+            if _checkpoint is not None and _done is not None:
+                _write_checkpoint(_checkpoint,_done)
+
+    #@Description: Runs _fn over _items on a thread pool and yields ( item, result ) strictly
+    #              in item order, with at most _prefetch results read ahead of the consumer.
+    def _prefetched( self, _fn, _items, _workers, _prefetch ):
+        _items  = iter(_items)
+        _window = collections.deque()
+        _pool   = concurrent.futures.ThreadPoolExecutor(max(1,_workers))
+        try:
+            for _item in itertools.islice(_items,max(1,_prefetch)):
+                _window.append((_item,_pool.submit(_fn,_item)))
+            while _window:
+                _item, _future = _window.popleft()
+                _result = _future.result()
+                for _next in itertools.islice(_items,1):
+                    _window.append((_next,_pool.submit(_fn,_next)))
+                yield _item, _result
+        finally:
+            for _item, _future in _window:
+                _future.cancel()
+            _pool.shutdown(wait=False)
+
+    #@Description: The transactions of a block range as columns, one NumPy array per field,
+    #              see tx_columns. Blocks are streamed through iter_blocks and converted
+    #              every _COLUMN_CHUNK txs, so only the columns are kept. Needs numpy.
+    #              i.e  cols = remote_node.get_tx_columns(17000000,17000999)
+    #                   fees = cols["gas"] * cols["gasPrice"]
+    #@Parameters :
+    # _start       [ int ] First block number.
+    # _end         [ int ] Last block number ( inclusive ).
+    # _fields      [ list] JSON keys of the columns, defaults to every key of _TX_COLUMNS.
+    # _workers     [ int ] Blocks fetched concurrently.
+    #@Return     :
+    # _columns     [ dict] JSON key -> array, see tx_columns.
+    def get_tx_columns( self, _start, _end, _fields=None, _workers=_WORKERS ):
+        _builder = _TxColumns(_fields)
+        for _block in self.iter_blocks(_start,_end,True,_workers):
+            _builder.add(_block["transactions"])
+        return _builder.columns()
+
+    #@Description: Every receipt of one block. Uses eth_getBlockReceipts where the node serves
+    #              it, otherwise reads the blocks tx hashes and fetches their receipts as
+    #              concurrent batch POSTs. Whether the node serves it is learned on the first
+    #              call and remembered per url by this instance, a refusal for _SUPPORT_TTL
+    #              seconds. Under an endpoint pool it is learned per endpoint, and
+    #              eth_getBlockReceipts is skipped only once every endpoint refused it.
+    #              i.e  receipts = remote_node.get_block_receipts(17000000)["result"]
+    #@Parameters :
+    # _blk         [ int ] Block number, or a block hash / tag string.
+    # _workers     [ int ] Batch POSTs in flight at once when falling back.
+    #@Return     :
+    # receipts     [ dict] Response whose result is the receipt list in tx order, null when
+    #                      no block was found. A failed receipt fails the whole response.
+    def get_block_receipts( self, _blk, _workers=_WORKERS ):
+        _blk  = hex(_blk) if isinstance(_blk,int) else str(_blk)
+        _urls = [ _e.url for _e in self._endpoints.endpoints ] if self._endpoints is not None else [ self._URL ]
+        if any(self._supported(_url,"eth_getBlockReceipts") for _url in _urls):
+            # cached and coalesced answers leave no url behind, they teach nothing
+            self._answered.url = None
+            _rtn   = self.api_call("eth_getBlockReceipts",[_blk])
+            _key   = (self._answered.url,"eth_getBlockReceipts")
+            _error = (_rtn or {}).get("error")
+            if not _error or _error.get("code") != _NO_METHOD:
+                if _rtn and not _error and _key[0] is not None:
+                    self._supports[_key] = (True,time.monotonic())
+                return _rtn
+            if _key[0] is not None:
+                self._supports[_key] = (False,time.monotonic())
+        _by  = "eth_getBlockByHash" if len(_blk) == 66 else "eth_getBlockByNumber"
+        _rtn = self.api_call(_by,[_blk,False])
+        if not _rtn or _rtn.get("result") is None:
+            return _rtn
+        _hashes    = _rtn["result"]["transactions"]
+        _responses = self._fan_out([ ("eth_getTransactionReceipt",[_h]) for _h in _hashes ],_workers)
+        for _receipt in _responses:
+            if not _receipt or _receipt.get("result") is None:
+                return _receipt or _error_response(_rtn.get("id"),"No receipt response")
+        return {"jsonrpc":"2.0","id":_rtn.get("id"),"result":[ _receipt["result"] for _receipt in _responses ]}
+
+    #@Description: False while _url is known to refuse _method, i.e for _SUPPORT_TTL seconds
+    #              after it last did. Urls not asked yet are taken to serve it.
+    def _supported( self, _url, _method ):
+        _flag, _at = self._supports.get((_url,_method),(True,0.0))
+        return _flag or time.monotonic() - _at > _SUPPORT_TTL
+
+    #@Description: Streams ( block number, receipts ) over a block range strictly in block
+    #              order, see get_block_receipts and iter_blocks.
+    #@Parameters :
+    # _start       [ int ] First block number.
+    # _end         [ int ] Last block number ( inclusive ), None for the current latest block.
+    # _workers     [ int ] Blocks fetched concurrently.
+    # _prefetch    [ int ] Max blocks fetched ahead of the consumer.
+    #@Return     :
+    # receipts     [ gen ] ( number, receipt list ) tuples.
+    def iter_block_receipts( self, _start, _end=None, _workers=_WORKERS, _prefetch=_PREFETCH ):
+        if _end is None:
+            _end = self.get_block_number()
+        _fetch = lambda _num: self.get_block_receipts(_num,1)
+        for _num, _rtn in self._prefetched(_fetch,range(_start,_end + 1),_workers,_prefetch):
+            yield _num, _result_of(_rtn,"eth_getBlockReceipts [ {} ]".format(_num))
+
+    #@Description: Many eth_call reads at one block. The block parameter is resolved to one
+    #              number first, identical calls are sent once, the rest go out as concurrent
+    #              batch POSTs, and with a _call_cache repeats at the same block are not sent
+    #              at all. pending has no block number, it is sent as the tag and never cached.
+    #              i.e  prices = remote_node.eth_calls([ {"to":pool,"data":GET_RESERVES} for pool in pools ])
+    #@Parameters :
+    # _calls       [ list] Call objects, see make_eth_call.
+    # _blk_param   [ int ] Block number or tag.
+    # _workers     [ int ] Batch POSTs in flight at once.
+    # _batch_size  [ int ] Max calls per POST, defaults to the instance batch size.
+    #@Return     :
+    # responses    [CallResults] One response per call, in call order, each holding its
+    #                      result or its own error.
+    def eth_calls( self, _calls, _blk_param="latest", _workers=_WORKERS, _batch_size=None ):
+        _block   = _blk_param if _blk_param == "pending" else self._block_number_of(_blk_param)
+        _cache   = self._call_cache if _block != "pending" else None
+        _tag     = _block if _block == "pending" else hex(_block)
+        _keys    = [ json.dumps(_call,sort_keys=True) for _call in _calls ]
+        _known   = _cache.get_many(_block,_keys) if _cache is not None else {}
+        _unique  = collections.OrderedDict( (_key,_call) for _key, _call in zip(_keys,_calls) if _key not in _known )
+        _replies = self._fan_out([ ("eth_call",[_call,_tag]) for _call in _unique.values() ],_workers,_batch_size)
+        _fresh   = dict(zip(_unique,_replies))
+        if _cache is not None:
+            _cache.put_many(_block,_fresh)
+        _out = CallResults(_block,len(_unique))
+        _out.extend( _known.get(_key) or _fresh[_key] for _key in _keys )
+        return _out
+
+    #@Description: Balances of many addresses at one block, see Snapshot.
+    #              i.e  snap = remote_node.get_balances(holders,17000000)
+    #                   print(snap.block, sum(snap.values()), snap.errors)
+    #@Parameters :
+    # _addresses   [ list] Addresses, duplicates are fetched once.
+    # _blk_param   [ int ] Block number or tag, pinned to one number before the fan out,
+    #                      except pending which is sent as is.
+    # _workers     [ int ] Batch POSTs in flight at once.
+    # _batch_size  [ int ] Max calls per POST, defaults to the instance batch size.
+    #@Return     :
+    # snapshot     [Snapshot] address -> balance in wei.
+    def get_balances( self, _addresses, _blk_param="latest", _workers=_WORKERS, _batch_size=None ):
+        return self._snapshot("eth_getBalance",_addresses,_blk_param,_workers,_batch_size)
+
+    #@Description: Transaction counts ( nonces ) of many addresses at one block, see get_balances.
+    def get_tx_counts( self, _addresses, _blk_param="latest", _workers=_WORKERS, _batch_size=None ):
+        return self._snapshot("eth_getTransactionCount",_addresses,_blk_param,_workers,_batch_size)
+
+    #@Description: Runs one ( address, block ) quantity method for every distinct address,
+    #              as concurrent batch POSTs, all pinned to the same block number. pending
+    #              has no block number, the txpool view is lost once pinned to the latest
+    #              mined block, so it is sent as the tag itself.
+    def _snapshot( self, _method, _addresses, _blk_param, _workers, _batch_size ):
+        _block     = _blk_param if _blk_param == "pending" else self._block_number_of(_blk_param)
+        _addresses = list(dict.fromkeys(str(_a).lower() for _a in _addresses))
+        _tag       = _block if _block == "pending" else hex(_block)
+        _calls     = [ (_method,[_a,_tag]) for _a in _addresses ]
+        _snapshot  = Snapshot(_block)
+        for _address, _rtn in zip(_addresses,self._fan_out(_calls,_workers,_batch_size)):
+            _result = _rtn.get("result") if _rtn else None
+            if _result is None:
+                _snapshot.errors[_address] = (_rtn or {}).get("error") or {"code":-32603,"message":"No result"}
+            else:
+                _snapshot[_address] = int(_result,16)
+        return _snapshot
+
+    #@Description: api_batch with its batch POSTs spread over _workers threads.
+    #@Return     :
+    # _responses   [ list] One response per call, in call order.
+    def _fan_out( self, _calls, _workers, _batch_size=None ):
+        _size   = _batch_size or self._batch_size
+        _chunks = [ _calls[_i:_i + _size] for _i in range(0,len(_calls),_size) ]
+        if len(_chunks) <= 1 or _workers <= 1:
+            return self.api_batch(_calls,_size)
+        with concurrent.futures.ThreadPoolExecutor(min(_workers,len(_chunks))) as _pool:
+            return [ _rtn for _part in _pool.map(lambda _chunk: self.api_batch(_chunk,_size),_chunks) for _rtn in _part ]
+
+    #@Description: Follows the chain head, see HeadFollower.
+    #              i.e  follower = remote_node.follow_head()
+    #                   follower.add_processor(index_block,unindex_block)
+    #                   follower.run()
+    #@Parameters :
+    # _start       [ int ] First block to emit, defaults to the current head.
+    # _tx_flag     [ bool] Emit blocks with full tx objects.
+    # _window      [ int ] Recent blocks kept to detect and roll back reorgs.
+    # _block_time  [float] Expected seconds between blocks, refined as blocks arrive.
+    # _min_poll    [float] Shortest seconds between two polls.
+    # _max_poll    [float] Longest seconds between two polls, defaults to _block_time.
+    #@Return     :
+    # follower     [HeadFollower]
+    def follow_head( self, _start=None, _tx_flag=False, _window=_REORG_WINDOW, _block_time=_BLOCK_TIME,
+                     _min_poll=_MIN_POLL, _max_poll=None ):
+        return HeadFollower(self,_start,_tx_flag,_window,_block_time,_min_poll,_max_poll)
+
+    #@Description: Adaptive, auto paginating get_logs. The filter block range is cut in chunks
+    #              fetched concurrently, a chunk hitting the nodes result cap ( or timing out )
+    #              is split in halves and the chunk size grows again while replies stay small.
+    #              Logs stream back in ( blockNumber, logIndex ) order.
+    #              i.e  scan = remote_node.scan_logs({"address":token,"fromBlock":0,"toBlock":"latest"})
+    #                   for log in scan: ...
+    #                   print(scan.chunk_size, scan.chunks)
+    #@Parameters :
+    # _filter_object[dict] See get_logs. fromBlock/toBlock may be ints, hex or tags.
+    # _chunk       [ int ] Initial chunk size in blocks.
+    # _workers     [ int ] Chunks fetched concurrently.
+    # _min_chunk   [ int ] Smallest chunk size the scan shrinks to.
+    # _max_chunk   [ int ] Largest chunk size the scan grows to.
+    # _grow_below  [ int ] A chunk returning fewer logs than this doubles the chunk size.
+    #@Return     :
+    # scan         [LogScan] Iterable of log objects, reporting the chunk sizes it settled on.
+    def scan_logs( self, _filter_object, _chunk=_LOG_CHUNK, _workers=_LOG_WORKERS, _min_chunk=1,
+                   _max_chunk=_LOG_MAX_CHUNK, _grow_below=_LOG_GROW_BELOW ):
+        return LogScan(self,_filter_object,_chunk,_workers,_min_chunk,_max_chunk,_grow_below)
+
+    #@Description: get_logs done locally for sparse filters: the logsBloom of every block in
+    #              range is tested against the filter, in bulk, and receipts are fetched only
+    #              for the blocks that may match. Costs one batched header per block instead
+    #              of every receipt, and is not subject to the node's log result cap.
+    #              i.e  scan = remote_node.bloom_scan({"address":contract,"fromBlock":17000000,"toBlock":17100000})
+    #                   for log in scan: ...
+    #                   print(scan.blocks, scan.candidates, scan.matched)
+    #@Parameters :
+    # _filter_object[dict] See get_logs, without blockHash.
+    # _chunk       [ int ] Blocks whose headers are fetched and tested at once.
+    # _workers     [ int ] Batch POSTs and receipt fetches in flight at once.
+    #@Return     :
+    # scan         [BloomScan] Iterable of the matching logs, in block and log order.
+    def bloom_scan( self, _filter_object, _chunk=_BLOOM_CHUNK, _workers=_WORKERS ):
+        return BloomScan(self,_filter_object,_chunk,_workers)
+
+    #@Description: Exports a block range, with its receipts, to a ChainArchive. Blocks are
+    #              fetched concurrently, at most _prefetch ahead, and appended strictly in
+    #              block order, so memory stays flat. Blocks already archived are skipped,
+    #              an interrupted export run again resumes at the first block missing.
+    #@Parameters :
+    # _archive     [ChainArchive] Where the blocks go.
+    # _start       [ int ] First block number.
+    # _end         [ int ] Last block number ( inclusive ), None for the current latest block.
+    # _receipts    [ bool] Also export every receipt, see get_block_receipts.
+    # _workers     [ int ] Blocks fetched concurrently.
+    # _prefetch    [ int ] Max blocks fetched ahead of the writer.
+    #@Return     :
+    # _count       [ int ] Blocks appended by this call.
+    def export_chain( self, _archive, _start, _end=None, _receipts=True, _workers=_WORKERS, _prefetch=_PREFETCH ):
+        if _end is None:
+            _end = self.get_block_number()
+        _plain = lambda _obj: _obj.to_json() if isinstance(_obj,Model) else _obj
+
+        def _fetch( _num ):
+            _record = {"block":_plain(_result_of(self.get_block_by_number(_num,True),"eth_getBlockByNumber [ {} ]".format(_num)))}
+            if _receipts:
+                _rtn = self.get_block_receipts(_num,1)
+                _record["receipts"] = [ _plain(_r) for _r in _result_of(_rtn,"eth_getBlockReceipts [ {} ]".format(_num)) ]
+            return _record
+
+        _count   = 0
+        _missing = ( _num for _num in range(_start,_end + 1) if _num not in _archive )
+        try:
+            for _num, _record in self._prefetched(_fetch,_missing,_workers,_prefetch):
+                _archive.append(_num,_record)
+                _count += 1
+        finally:
+            _archive.flush()
+        return _count
+
+    #@Description: Bulk loads a block range, and optionally every receipt in it, into the
+    #              chain store. Data already stored is not fetched again.
+    #@Parameters :
+    # _start       [ int ] First block number.
+    # _end         [ int ] Last block number ( inclusive ).
+    # _receipts    [ bool] Also store the receipt of every transaction.
+    # _workers     [ int ] Blocks fetched concurrently.
+    #@Return     :
+    # _count       [ int ] Number of blocks walked.
+    def warm_store( self, _start, _end, _receipts=True, _workers=_WORKERS ):
+        if self._store is None:
+            raise InfuraError("warm_store needs an INFURA object created with a _store")
+        _count  = 0
+        _hashes = []
+        for _block in self.iter_blocks(_start,_end,True,_workers):
+            _count += 1
+            if _receipts:
+                _hashes.extend(_tx["hash"] for _tx in _block["transactions"])
+            if len(_hashes) >= self._batch_size:
+                self.api_batch([ ("eth_getTransactionReceipt",[_h]) for _h in _hashes ])
+                _hashes = []
+        if _hashes:
+            self.api_batch([ ("eth_getTransactionReceipt",[_h]) for _h in _hashes ])
+        self._store.flush()
+        return _count
+
+    #@Description: Streams the transactions of one block as they arrive, parsing the body
+    #              incrementally so the whole block is never held at once. Meant for very
+    #              large blocks, bypasses the cache, store and single flight but shows in the
+#              metrics like any call.
+    #              i.e  for tx in remote_node.iter_block_transactions(17000000): ...
+    #@Parameters :
+    # _blk         [ int ] Block number, or a block hash / tag string.
+    # _tx_flag     [ bool] true yields full tx objects, false tx hashes.
+    # _chunk       [ int ] Bytes read from the socket at a time.
+    #@Return     :
+    # txs          [ gen ] Transaction objects ( or hashes ), in block order.
+    def iter_block_transactions( self, _blk, _tx_flag=True, _chunk=_STREAM_CHUNK ):
+        if isinstance(_blk,str) and len(_blk) == 66:
+            _data = {"id":next(self._ids),"method":"eth_getBlockByHash","params":[_blk,_tx_flag]}
+        else:
+            _blk  = hex(_blk) if isinstance(_blk,int) else _blk
+            _data = {"id":next(self._ids),"method":"eth_getBlockByNumber","params":[_blk,_tx_flag]}
+        _method = _data["method"]
+        _body   = _dumps(_data)
+        _t0     = self._metrics.start(_method,_data["params"]) if self._metrics is not None else None
+        _size   = [ 0 ]
+        _count  = 0
+        _rtn    = None
+        try:
+            _rtn = self._send("POST",_body,1,False,True)
+            for _tx in _stream_items(_counted_chunks(_rtn.iter_content(_chunk),_size),"transactions"):
+                if self._typed:
+                    _tx = Transaction.from_json(_tx) if isinstance(_tx,dict) else _hex_bytes(_tx)
+                _count += 1
+                yield _tx
+        except Exception:
+            _count = None
+            raise
+        finally:
+            if _rtn is not None:
+                _rtn.close()
+            if self._metrics is not None:
+                # the post hooks see how many txs were streamed, None when the stream failed
+                self._metrics.observe_bytes(_method,len(_body),_size[0])
+                _response = None if _count is None else {"id":_data["id"],"result":_count}
+                self._metrics.finish(_method,_data["params"],_response,_t0)
+
+    #@Description: Resolves a block parameter ( int, hex or tag ) to a block number. Tags
+    #              other than earliest ( latest, pending, safe, finalized ) are asked to the
+    #              node through the header of the block they name. A pending block the node
+    #              reports without a number raises InfuraError.
+    def _block_number_of( self, _blk_param ):
+        if isinstance(_blk_param,int):
+            return _blk_param
+        if _blk_param == "earliest":
+            return 0
+        if _blk_param in _BLOCK_TAGS:
+            _rtn = self.api_call("eth_getBlockByNumber",[_blk_param,False])
+            _num = _result_of(_rtn,"Block tag {}".format(_blk_param))["number"]
+            if _num is None:
+                raise InfuraError("Block tag {} has no block number".format(_blk_param),_rtn)
+            return int(_num,16)
+        try:
+            return int(_blk_param,16)
+        except (TypeError, ValueError):
+            raise InfuraError("Unknown block parameter : {}".format(_blk_param))
+
+
+#@Description: Unwraps the result tag of a response, raising InfuraError when there is none.
+#@Parameters :
+# _rtn         [ dict] The JSON RPC response.
+# _what        [ str ] Call description used in the error message.
+def _result_of( _rtn, _what ):
+    if not _rtn or "error" in _rtn or _rtn.get("result") is None:
+        raise InfuraError("{} returned no result : {}".format(_what,(_rtn or {}).get("error")),_rtn)
+    return _rtn["result"]
+
+_JSON_TOKEN  = re.compile(rb'["{}\[\]]')
+_JSON_STRING = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*"')
+# Everything up to the next bracket, whole strings included.
+_JSON_SKIP   = re.compile(rb'(?:[^"{}\[\]]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+
+#@Description: Passes body chunks through, adding their byte size to _size[0].
+def _counted_chunks( _chunks, _size ):
+    for _chunk in _chunks:
+        _size[0] += len(_chunk)
+        yield _chunk
+
+#@Description: Incremental parser yielding the items of one array of a JSON RPC result as
+#              their bytes arrive. Only brackets and strings are scanned, each item is then
+#              decoded on its own and the bytes read are dropped once per chunk.
+#@Parameters :
+# _chunks      [ iter] Response body chunks.
+# _key         [ str ] Key of the array in the result object.
+#@Return     :
+# items        [ gen ] The decoded array items.
+def _stream_items( _chunks, _key ):
+    _target = b'"' + _key.encode() + b'"'
+    _buf    = bytearray()
+    _pos    = 0
+    _depth  = 0
+    _array  = False
+    _start  = 0
+    for _chunk in _chunks:
+        if _array:
+            _drop = _start if _depth > 3 else _pos
+            del _buf[:_drop]
+            _pos   -= _drop
+            _start -= _drop
+        _buf += _chunk
+        while True:
+            if _depth > 3:
+                # inside an item only its closing bracket matters
+                _at = _JSON_SKIP.match(_buf,_pos).end()
+                if _at == len(_buf) or _buf[_at] == 0x22:
+                    _pos = _at
+                    break
+            else:
+                _m = _JSON_TOKEN.search(_buf,_pos)
+                if _m is None:
+                    _pos = len(_buf)
+                    break
+                _at = _m.start()
+                if _buf[_at] == 0x22:
+                    _end = _JSON_STRING.match(_buf,_at + 1)
+                    if _end is None:
+                        # the string goes on in the next chunk
+                        _pos = _at
+                        break
+                    _pos = _end.end()
+                    if _array and _depth == 3:
+                        yield _loads(_buf[_at:_pos])
+                    continue
+            _pos = _at + 1
+            if _buf[_at] in b"{[":
+                # the response object is depth 1, the result object depth 2
+                if _array and _depth == 3:
+                    _start = _at
+                elif not _array and _depth == 2 and _buf[_at] == 0x5b:
+                    _array = _buf[max(0,_at - 64):_at].rstrip().rstrip(b":").rstrip().endswith(_target)
+                _depth += 1
+            else:
+                _depth -= 1
+                if _array and _depth == 3:
+                    yield _loads(_buf[_start:_pos])
+                elif _array and _depth == 2:
+                    return
+    if _array:
+        raise InfuraError("Response ended inside the {} array".format(_key))
+    _result_of(_loads(_buf) if _buf.strip() else None,"Streamed {}".format(_key))
+
+#@Description: Reads the last completed block number from a checkpoint file.
+#@Return     :
+# _num         [ int ] The block number, None when no checkpoint exists yet.
+def _read_checkpoint( _path ):
+    try:
+        with open(_path) as _file:
+            return int(_file.read().strip())
+    except (OSError, ValueError):
+        return None
+
+#@Description: Atomically replaces the checkpoint file with a new block number.
+def _write_checkpoint( _path, _num ):
+    _tmp = "{}.tmp".format(_path)
+    with open(_tmp,"w") as _file:
+        _file.write(str(_num))
+    os.replace(_tmp,_path)
+
+#@Description: JSON RPC error response in the nodes own format.
+def _error_response( _id, _message, _code=-32603 ):
+    return {"id":_id,"error":{"code":_code,"message":_message}}
+
+#@Description: Decodes the body of a sent call. A body that is no JSON, i.e the HTML page of
+#              a gateway answering 502 once retries ran out, becomes an error response.
+#@Parameters :
+# _rtn         Requests object.
+# _id          [ int ] Id of the call.
+def _decoded( _rtn, _id ):
+    try:
+        return _loads(_rtn.content)
+    except ValueError:
+        return _error_response(_id,"HTTP {} with a body that is not JSON".format(_rtn.status_code))
+
+
+#@Description: Assigns ids to a batch and rejects unknown methods up front.
+#@Parameters :
+# _ids         [ iter] The id counter of the client.
+# _calls       [ list] ( method, params ) pairs.
+#@Return     :
+# _data        [ list] The JSON RPC payload items.
+# _responses   [ list] Per call responses, filled for rejected calls only.
+# _send        [ list] Indexes of the items to send.
+def _batch_payload( _ids, _calls ):
+    _data = [ {"id":next(_ids),"method":_method,"params":_params} for _method, _params in _calls ]
+    _responses = [ None ] * len(_data)
+    _send = []
+    for _i, _item in enumerate(_data):
+        if _item["method"] in _POST_METHOD:
+            _send.append(_i)
+        else:
+            _responses[_i] = _error_response(_item["id"],"Method [ {} ] cannot be found".format(_item["method"]))
+    return _data, _responses, _send
+
+#@Description: Matches a batch reply back to its calls by id, see _batch_payload.
+#@Parameters :
+# _rtn         [ list] The decoded batch reply.
+#@Return     :
+# _responses   [ list] One response per call, in call order.
+def _match_batch( _data, _responses, _send, _rtn ):
+    # A node refusing the whole batch answers with a single error object.
+    if isinstance(_rtn,dict):
+        _rtn = [ dict(_rtn,id=_data[_i]["id"]) for _i in _send ]
+    _by_id = { _item.get("id"):_item for _item in _rtn }
+    for _i in _send:
+        _id = _data[_i]["id"]
+        _responses[_i] = _by_id.get(_id) or _error_response(_id,"Missing response in batch")
+    return _responses
+
+
+class _Flight(object):
+    #@Description: One in-flight call shared by every identical caller, see INFURA._call_shared.
+    __slots__ = ("_event","response")
+
+    def __init__( self ):
+        self._event   = threading.Event()
+        self.response = None
+
+    def set( self, _response ):
+        self.response = _response
+        self._event.set()
+
+    def wait( self ):
+        self._event.wait()
+        return self.response
+
+
+class _Pending(object):
+    #@Description: Placeholder returned by batched wrapper calls, filled when the batch
+    #              is sent.
+    __slots__ = ("method","params","_steps","_value","_done")
+
+    def __init__( self, _method, _params ):
+        self.method = _method
+        self.params = _params
+        self._steps = []
+        self._value = None
+        self._done  = False
+
+    def then( self, _fn ):
+        self._steps.append(_fn)
+        return self
+
+    #@Description: Fills the placeholder. Error responses skip post-processing so the
+    #              caller still sees the error tag.
+    def _resolve( self, _rtn ):
+        if isinstance(_rtn,dict) and "error" in _rtn:
+            self._value = _rtn
+        else:
+            for _fn in self._steps:
+                _rtn = _fn(_rtn)
+            self._value = _rtn
+        self._done = True
+
+    def done( self ):
+        return self._done
+
+    def result( self ):
+        if not self._done:
+            raise RuntimeError("Batch not yet sent")
+        return self._value
+
+
+class INFURABatch(_Methods):
+    #@Description: Batch proxy of an INFURA object, see INFURA.batch. Shares the nodes
+    #              transport, wrapper calls return _Pending placeholders.
+    #@Parameters :
+    # _node        [INFURA] The node the batch is sent through.
+    # _batch_size  [ int ] Max calls per POST.
+    def __init__( self, _node, _batch_size=None ):
+        self.__dict__.update(_node.__dict__)
+        self._node    = _node
+        self._batch_size = _batch_size or _node._batch_size
+        self._queue   = []
+        self.results  = None
+
+    def __enter__( self ):
+        return self
+
+    def api_call( self, _method, _params=[] ):
+        if _method not in _POST_METHOD and _method not in _GET_METHOD:
+            print(" Method [ {} ] cannot be found. Returning None ".format(_method))
+            return None
+        _pending = _Pending(_method,_params)
+        self._queue.append(_pending)
+        return _pending
+
+    def _then( self, _rtn, _fn ):
+        return _rtn.then(_fn)
+
+    #@Description: Sends every queued call and fills their placeholders.
+    #@Return     :
+    # results      [ list] Post-processed results, in call order.
+    def flush( self ):
+        _queue, self._queue = self._queue, []
+        _responses = self._node.api_batch([ (_p.method,_p.params) for _p in _queue ],self._batch_size)
+        for _pending, _rtn in zip(_queue,_responses):
+            _pending._resolve(_rtn)
+        self.results = [ _p.result() for _p in _queue ]
+        return self.results
+
+    def close( self ):
+        pass
+
+    def __exit__( self, _exc_type, *exc ):
+        if _exc_type is None:
+            self.flush()
+
+
+#@Description: True when a get_logs reply asks for a smaller range, i.e the node result cap
+#              was hit or the query timed out.
+def _too_many_results( _rtn ):
+    if _rtn == {}:
+        return True
+    _error = (_rtn or {}).get("error") or {}
+    _message = str(_error.get("message","")).lower()
+    return _error.get("code") == -32005 or any(_k in _message for _k in ("more than","too many","limit exceeded","timeout","timed out"))
+
+def _log_order( _log ):
+    return int(_log["blockNumber"],16), int(_log["logIndex"],16)
+
+
+#@Description: Round constants and rotation offsets ( lane x + 5y ) of keccak-f[1600].
+_KECCAK_RC  = (
+    0x0000000000000001,0x0000000000008082,0x800000000000808A,0x8000000080008000,0x000000000000808B,0x0000000080000001,
+    0x8000000080008081,0x8000000000008009,0x000000000000008A,0x0000000000000088,0x0000000080008009,0x000000008000000A,
+    0x000000008000808B,0x800000000000008B,0x8000000000008089,0x8000000000008003,0x8000000000008002,0x8000000000000080,
+    0x000000000000800A,0x800000008000000A,0x8000000080008081,0x8000000000008080,0x0000000080000001,0x8000000080008008,
+    )
+_KECCAK_ROT = (0,1,62,28,27,36,44,6,55,20,3,10,43,25,39,41,45,15,21,8,18,2,61,56,14)
+# ( source lane, target lane, rotation ) of the rho and pi steps.
+_KECCAK_PI  = tuple( (_x + 5 * _y,_y + 5 * ((2 * _x + 3 * _y) % 5),_KECCAK_ROT[_x + 5 * _y]) for _x in range(5) for _y in range(5) )
+_LANE       = (1 << 64) - 1
+
+def _keccak_f( _a ):
+    _b = [ 0 ] * 25
+    for _rc in _KECCAK_RC:
+        _c = [ _a[_x] ^ _a[_x + 5] ^ _a[_x + 10] ^ _a[_x + 15] ^ _a[_x + 20] for _x in range(5) ]
+        _d = [ _c[_x - 1] ^ (((_c[(_x + 1) % 5] << 1) | (_c[(_x + 1) % 5] >> 63)) & _LANE) for _x in range(5) ]
+        for _src, _dst, _rot in _KECCAK_PI:
+            _v = _a[_src] ^ _d[_src % 5]
+            _b[_dst] = ((_v << _rot) | (_v >> (64 - _rot))) & _LANE
+        for _y in range(0,25,5):
+            _row = _b[_y:_y + 5]
+            for _x in range(5):
+                _a[_y + _x] = _row[_x] ^ (~_row[(_x + 1) % 5] & _row[(_x + 2) % 5])
+        _a[0] ^= _rc
+    return _a
+
+#@Description: Keccak-256, the Ethereum hash ( not NIST SHA3-256, which pads differently ).
+#              Pure Python, meant for the few addresses and topics of a filter.
+#@Parameters :
+# _data        [bytes] Message.
+#@Return     :
+# _digest      [bytes] 32 bytes digest.
+def keccak256( _data ):
+    _data  = bytearray(_data) + b"\x01" + b"\x00" * (135 - len(_data) % 136)
+    _data[-1] |= 0x80
+    _state = [ 0 ] * 25
+    for _at in range(0,len(_data),136):
+        for _i in range(17):
+            _state[_i] ^= int.from_bytes(_data[_at + 8 * _i:_at + 8 * _i + 8],"little")
+        _state = _keccak_f(_state)
+    return b"".join(_lane.to_bytes(8,"little") for _lane in _state[:4])
+
+#@Description: The three logsBloom bits of an address or topic, as bit numbers counted from
+#              the least significant end of the 2048 bit big endian bloom.
+@functools.lru_cache(maxsize=4096)
+def _bloom_bits( _item ):
+    _h = keccak256(bytes.fromhex(_item[2:]))
+    return tuple( ((_h[_i] << 8) | _h[_i + 1]) & 2047 for _i in (0,2,4) )
+
+def _bloom_mask( _item ):
+    return sum(set( 1 << _bit for _bit in _bloom_bits(_item.lower()) ))
+
+#@Description: logsBloom of a list of logs, as found in receipts ( and, over all the
+#              receipts, in blocks ).
+#@Return     :
+# _bloom       [ str ] 0x prefixed 256 bytes hex string.
+def logs_bloom( _logs ):
+    _bits = 0
+    for _log in _logs:
+        _bits |= _bloom_mask(_log["address"])
+        for _topic in _log["topics"]:
+            _bits |= _bloom_mask(_topic)
+    return "0x%0512x" % _bits
+
+#@Description: True when a log satisfies an eth_getLogs address / topics filter.
+def _log_matches( _log, _addresses, _topics ):
+    if _addresses and _log["address"].lower() not in _addresses:
+        return False
+    for _i, _want in enumerate(_topics):
+        if _want is None:
+            continue
+        if _i >= len(_log["topics"]) or _log["topics"][_i].lower() not in _want:
+            return False
+    return True
+
+
+class LogBloom(object):
+    #@Description: Tests logsBloom fields, of blocks or receipts, against an eth_getLogs
+    #              style address / topics filter. A miss is certain, a hit may be a false
+    #              positive. match_many tests many blooms at once with NumPy.
+    #              i.e  bloom = inf.LogBloom(token,[TRANSFER_TOPIC,None,holder_topic])
+    #                   maybe = bloom.match_many([ b["logsBloom"] for b in blocks ])
+    #@Parameters :
+    # _address     [ any ] An address, a list of addresses ( any of ), or None for any.
+    # _topics      [ list] Per position a topic, a list of topics ( any of ), or None for any.
+    def __init__( self, _address=None, _topics=None ):
+        _address = [ _address ] if isinstance(_address,str) else list(_address or [])
+        self.addresses = set( _a.lower() for _a in _address )
+        self.topics    = [ None if _t is None else set( _x.lower() for _x in ([ _t ] if isinstance(_t,str) else _t) )
+                           for _t in (_topics or []) ]
+        # Every group must hit, a group hits when any of its items has all its bits set.
+        self._groups = [ sorted(_g) for _g in [ self.addresses ] + self.topics if _g ]
+        self._masks  = [ [ _bloom_mask(_item) for _item in _group ] for _group in self._groups ]
+
+    #@Description: Builds the bloom of a filter object, see get_logs.
+    @classmethod
+    def from_filter( cls, _filter_object ):
+        return cls(_filter_object.get("address"),_filter_object.get("topics"))
+
+    #@Description: True when the bloom may hold a matching log.
+    def matches( self, _bloom ):
+        _bits = int(_bloom,16)
+        return all(any(_bits & _mask == _mask for _mask in _masks) for _masks in self._masks)
+
+    #@Description: matches over many blooms at once, the bit tests vectorized over the
+    #              blooms with NumPy. Falls back to matches per bloom without numpy.
+    #@Parameters :
+    # _blooms      [ list] 0x prefixed logsBloom hex strings.
+    #@Return     :
+    # _hits        [array] ( n, ) bool, or a list of bool without numpy.
+    def match_many( self, _blooms ):
+        try:
+            import numpy
+        except ImportError:
+            return [ self.matches(_bloom) for _bloom in _blooms ]
+        _bytes = numpy.frombuffer(bytes.fromhex("".join(_b[2:] for _b in _blooms)),numpy.uint8).reshape(len(_blooms),256)
+        _hits  = numpy.ones(len(_blooms),bool)
+        for _group in self._groups:
+            _bits  = numpy.array([ _bloom_bits(_item) for _item in _group ])
+            _found = _bytes[:,255 - _bits // 8] & (1 << (_bits % 8)).astype(numpy.uint8)
+            _hits &= (_found != 0).all(axis=2).any(axis=1)
+        return _hits
+
+
+class BloomScan(object):
+    #@Description: Iterable returned by INFURA.bloom_scan.
+    #@Attributes :
+    # blocks       [ int ] Blocks whose bloom was tested.
+    # candidates   [ int ] Blocks whose bloom hit, their receipts were fetched.
+    # matched      [ int ] Candidate blocks holding a matching log, the rest were false positives.
+    def __init__( self, _node, _filter_object, _chunk, _workers ):
+        self._node     = _node
+        self._filter   = dict(_filter_object)
+        self._chunk    = max(1,_chunk)
+        self._workers  = max(1,_workers)
+        self.bloom     = LogBloom.from_filter(self._filter)
+        self.blocks     = 0
+        self.candidates = 0
+        self.matched    = 0
+
+    def __iter__( self ):
+        _first = self._node._block_number_of(self._filter.get("fromBlock","latest"))
+        _last  = self._node._block_number_of(self._filter.get("toBlock","latest"))
+        _fetch = lambda _num: self._node.get_block_receipts(_num,1)
+        for _lo in range(_first,_last + 1,self._chunk):
+            _nums    = range(_lo,min(_last,_lo + self._chunk - 1) + 1)
+            _headers = self._node._fan_out([ ("eth_getBlockByNumber",[hex(_n),False]) for _n in _nums ],self._workers)
+            _blooms  = [ _result_of(_rtn,"eth_getBlockByNumber [ {} ]".format(_n))["logsBloom"] for _n, _rtn in zip(_nums,_headers) ]
+            _maybe   = [ _n for _n, _hit in zip(_nums,self.bloom.match_many(_blooms)) if _hit ]
+            self.blocks     += len(_nums)
+            self.candidates += len(_maybe)
+            for _num, _rtn in self._node._prefetched(_fetch,_maybe,self._workers,2 * self._workers):
+                _logs = [ _log for _receipt in _result_of(_rtn,"eth_getBlockReceipts [ {} ]".format(_num))
+                          for _log in _receipt["logs"] if _log_matches(_log,self.bloom.addresses,self.bloom.topics) ]
+                self.matched += bool(_logs)
+                for _log in _logs:
+                    yield _log
+
+
+class LogScan(object):
+    #@Description: Iterable returned by INFURA.scan_logs.
+    #@Attributes :
+    # chunk_size   [ int ] The chunk size currently in use.
+    # chunks       [ list] ( fromBlock, toBlock, log count ) of every completed chunk, in order.
+    # splits       [ int ] Chunks split after hitting the result cap.
+    # grows        [ int ] Times the chunk size was doubled.
+    def __init__( self, _node, _filter_object, _chunk, _workers, _min_chunk, _max_chunk, _grow_below ):
+        self._node       = _node
+        self._filter     = dict(_filter_object)
+        self._workers    = max(1,_workers)
+        self._min_chunk  = max(1,_min_chunk)
+        self._max_chunk  = max(self._min_chunk,_max_chunk)
+        self._grow_below = _grow_below
+        self.chunk_size  = min(self._max_chunk,max(self._min_chunk,_chunk))
+        self.chunks      = []
+        self.splits      = 0
+        self.grows       = 0
+
+    def __iter__( self ):
+        _base  = dict(self._filter)
+        _first = self._node._block_number_of(_base.pop("fromBlock","latest"))
+        _last  = self._node._block_number_of(_base.pop("toBlock","latest"))
+        _pool  = concurrent.futures.ThreadPoolExecutor(self._workers)
+        _window = collections.deque()
+        _cursor = _first
+
+        def _submit( _lo, _hi ):
+            _filter = dict(_base,fromBlock=hex(_lo),toBlock=hex(_hi))
+            return _lo, _hi, _pool.submit(self._node.get_logs,_filter)
+
+        try:
+            while True:
+                while len(_window) < self._workers and _cursor <= _last:
+                    _hi = min(_last,_cursor + self.chunk_size - 1)
+                    _window.append(_submit(_cursor,_hi))
+                    _cursor = _hi + 1
+                if not _window:
+                    return
+                _lo, _hi, _future = _window.popleft()
+                _rtn = _future.result()
+                if _too_many_results(_rtn) and _hi > _lo:
+                    _mid = (_lo + _hi) // 2
+                    self.chunk_size = max(self._min_chunk,(_hi - _lo + 1) // 2)
+                    self.splits += 1
+                    _window.appendleft(_submit(_mid + 1,_hi))
+                    _window.appendleft(_submit(_lo,_mid))
+                    continue
+                _logs = _result_of(_rtn,"eth_getLogs [ {} - {} ]".format(_lo,_hi))
+                _logs.sort(key=_log_order)
+                self.chunks.append((_lo,_hi,len(_logs)))
+                if len(_logs) < self._grow_below and _hi - _lo + 1 >= self.chunk_size and self.chunk_size < self._max_chunk:
+                    self.chunk_size = min(self._max_chunk,self.chunk_size * 2)
+                    self.grows += 1
+                for _log in _logs:
+                    yield _log
+        finally:
+            for _lo, _hi, _future in _window:
+                _future.cancel()
+            _pool.shutdown(wait=False)
+
+
+class Snapshot(dict):
+    #@Description: Per address results of get_balances / get_tx_counts, keyed by lower case
+    #              address. Addresses whose call failed are left out and listed in errors,
+    #              so one bad reply does not lose the rest of the snapshot.
+    #@Attributes :
+    # block        [ int ] The block number every value was read at, "pending" for
+    #                      unpinned reads of the pending state.
+    # errors       [ dict] address -> JSON RPC error object.
+    def __init__( self, _block ):
+        dict.__init__(self)
+        self.block  = _block
+        self.errors = {}
+
+
+class CallResults(list):
+    #@Description: Responses of INFURA.eth_calls, in call order.
+    #@Attributes :
+    # block        [ int ] The block number every call ran at, "pending" for unpinned
+    #                      reads of the pending state.
+    # sent         [ int ] Calls actually sent, after deduplication and the cache.
+    def __init__( self, _block, _sent ):
+        list.__init__(self)
+        self.block = _block
+        self.sent  = _sent
+
+
+class NonceManager(object):
+    #@Description: Hands out the nonces of local senders without a round trip per tx. The
+    #              pending tx count of an address is fetched once, later nonces are counted
+    #              locally and fetched again after a nonce error or a failed send. send
+    #              signs and submits many txs as batch POSTs. A send is never retried: when
+    #              its outcome is unknown, a transport error or a node internal error, it is
+    #              reported with its locally computed hash, to be looked up before sending
+    #              anything in its place.
+    #              i.e  nonces = inf.NonceManager(remote_node)
+    #                   sent = nonces.send(sender,txs,lambda tx: account.sign_transaction(tx).rawTransaction.hex())
+    #@Parameters :
+    # _node        [INFURA] Node the counts are read from and the txs sent to.
+    def __init__( self, _node ):
+        self._node    = _node
+        self._next    = {}
+        self._locks   = collections.defaultdict(threading.Lock)
+        self.fetches  = 0
+        self.resyncs  = 0
+
+    #@Description: Reserves the next nonce of an address.
+    def next( self, _address ):
+        return self.reserve(_address,1)[0]
+
+    #@Description: Reserves _n consecutive nonces of an address.
+    #@Return     :
+    # _nonces      [range] The nonces reserved.
+    def reserve( self, _address, _n ):
+        _address = str(_address).lower()
+        with self._locks[_address]:
+            if _address not in self._next:
+                self._next[_address] = self._pending_count(_address)
+                self.fetches += 1
+            _first = self._next[_address]
+            self._next[_address] = _first + _n
+            return range(_first,_first + _n)
+
+    #@Description: Drops the local count of an address, the next reservation fetches it again.
+    def resync( self, _address ):
+        with self._locks[str(_address).lower()]:
+            if self._next.pop(str(_address).lower(),None) is not None:
+                self.resyncs += 1
+
+    def _pending_count( self, _address ):
+        return int(_result_of(self._node.get_tx_count(_address,"pending"),"eth_getTransactionCount [ {} ]".format(_address)),16)
+
+    #@Description: Signs and sends txs from one address, with consecutive nonces, as batch
+    #              POSTs in nonce order. After the first failed tx the later ones are not
+    #              sent, they would only queue behind the gap, and the address is resynced.
+    #              An exception from _sign or the node resyncs the address and raises an
+    #              InfuraError whose sent attribute holds the results so far, the txs of
+    #              the batch that raised as "unknown" and the rest as "skipped".
+    #@Parameters :
+    # _address     [ str ] Sender address.
+    # _txs         [ list] Unsigned tx dicts, the nonce is set on a copy of each.
+    # _sign        [ fn  ] tx dict -> signed raw tx hex string.
+    # _batch_size  [ int ] Max txs per POST, defaults to the node batch size.
+    #@Return     :
+    # results      [ list] One dict per tx, in order: nonce, status and response, plus the
+    #                      locally computed hash when the status is "unknown". The status is
+    #                      "sent", "known" ( the node already had it ), "nonce", "rejected",
+    #                      "unknown" or "skipped".
+    def send( self, _address, _txs, _sign, _batch_size=None ):
+        _txs    = list(_txs)
+        _size   = _batch_size or self._node._batch_size
+        _nonces = self.reserve(_address,len(_txs))
+        _out    = []
+        _at     = 0
+        _raws   = []
+        try:
+            for _at in range(0,len(_txs),_size):
+                _raws = []
+                _raws = [ _sign(dict(_tx,nonce=_nonce)) for _tx, _nonce in zip(_txs[_at:_at + _size],_nonces[_at:_at + _size]) ]
+                for _raw, _nonce, _rtn in zip(_raws,_nonces[_at:],self._node.api_batch([ ("eth_sendRawTransaction",[_r]) for _r in _raws ],_size)):
+                    _out.append(_send_result(_raw,_nonce,_rtn))
+                if any(_r["status"] not in ("sent","known") for _r in _out[_at:]):
+                    break
+        except Exception as e:
+            # the reserved nonces past the last sent tx were never used
+            self.resync(_address)
+            # a batch that raised once signed may have reached the node, its txs are unknown
+            _out += [ _send_result(_raw,_nonce,None) for _raw, _nonce in zip(_raws[len(_out) - _at:],_nonces[len(_out):]) ]
+            _error = InfuraError("Send from {} stopped after {} txs : {}".format(_address,len(_out),e))
+            _error.sent = _out + [ {"nonce":_nonce,"status":"skipped","response":None} for _nonce in _nonces[len(_out):] ]
+            raise _error
+        except BaseException:
+            self.resync(_address)
+            raise
+        _out += [ {"nonce":_nonce,"status":"skipped","response":None} for _nonce in _nonces[len(_out):] ]
+        if any(_r["status"] not in ("sent","known") for _r in _out):
+            self.resync(_address)
+        return _out
+
+    #@Description: Counters snapshot.
+    def stats( self ):
+        return {"addresses":len(self._next),"fetches":self.fetches,"resyncs":self.resyncs}
+
+
+#@Description: Classifies the response of one eth_sendRawTransaction, see NonceManager.send.
+def _send_result( _raw, _nonce, _rtn ):
+    _error = (_rtn or {}).get("error")
+    if _rtn and not _error and _rtn.get("result") is not None:
+        return {"nonce":_nonce,"status":"sent","response":_rtn}
+    _message = str((_error or {}).get("message","")).lower()
+    if "already known" in _message:
+        _status = "known"
+    elif "nonce" in _message or "replacement transaction" in _message:
+        _status = "nonce"
+    elif not _error or _error.get("code") == -32603:
+        _status = "unknown"
+    else:
+        _status = "rejected"
+    _result = {"nonce":_nonce,"status":_status,"response":_rtn}
+    if _status == "unknown":
+        _result["hash"] = "0x" + keccak256(bytes.fromhex(_raw[2:] if _raw.startswith("0x") else _raw)).hex()
+    return _result
+
+
+class HeadFollower(object):
+    #@Description: Emits new blocks in order as the chain grows, returned by
+    #              INFURA.follow_head. Polls right when the next block is due, quickly for a
+    #              few polls once it is overdue, then backs off while the chain is idle. Each
+    #              block's parentHash is checked against the blocks emitted last: on a
+    #              mismatch the replaced blocks are rolled back, newest first, before the new
+    #              branch is emitted. Processors see the same block objects, nothing is
+    #              fetched twice.
+    #@Attributes :
+    # window       [deque] ( number, hash, block ) of the last emitted blocks.
+    # block_time   [float] Moving estimate of the seconds between blocks.
+    # polls        [ int ] Head polls made.
+    # rollbacks    [ int ] Blocks rolled back by reorgs.
+    # failures     [ int ] Head or block fetches that failed, each ends its poll as a miss.
+    def __init__( self, _node, _start, _tx_flag, _window, _block_time, _min_poll, _max_poll ):
+        self._node      = _node
+        self._next      = _start
+        self._tx_flag   = _tx_flag
+        self.window     = collections.deque(maxlen=max(1,_window))
+        self.block_time = _block_time
+        self.min_poll   = _min_poll
+        self.max_poll   = _max_poll or max(_min_poll,_block_time)
+        self.polls      = 0
+        self.rollbacks  = 0
+        self.failures   = 0
+        self._misses    = 0
+        self._seen_at   = None
+        self._processors = []
+
+    #@Description: Attaches a processor.
+    #@Parameters :
+    # _on_block    [ fn  ] Called with every new block, in chain order.
+    # _on_rollback [ fn  ] Called with every block a reorg removed, newest first.
+    def add_processor( self, _on_block, _on_rollback=None ):
+        self._processors.append((_on_block,_on_rollback))
+
+    #@Description: Polls the head once and emits whatever changed. A failed head or block
+    #              fetch, error reply or exception alike, ends the poll, the next one picks up
+    #              from the same block.
+    #@Return     :
+    # _events      [ list] ( "block" | "rollback", block ) tuples, in emission order.
+    def poll( self ):
+        self.polls += 1
+        _events = []
+        try:
+            _rtn = self._node.api_call("eth_blockNumber",[])
+        except Exception:
+            _rtn = None
+        if not _rtn or _rtn.get("result") is None:
+            self.failures += 1
+            return self._polled(_events)
+        _head   = int(_rtn["result"],16)
+        if self._next is None:
+            self._next = _head
+        if self.window and _head < self.window[-1][0]:
+            # a shorter chain, or a node lagging behind the one polled before
+            _block = self._fetch(_head)
+            if _block is None or _block["hash"] == self._hash_at(_head):
+                return self._polled(_events)
+            self._unwind(_head,_events)
+        while self._next <= _head:
+            _block = self._fetch(self._next)
+            if _block is None:
+                break
+            if self.window and _block["parentHash"] != self.window[-1][1]:
+                if len(self.window) == 1:
+                    raise InfuraError("Reorg deeper than the {} block window".format(self.window.maxlen))
+                self._unwind(self.window[-1][0],_events)
+                continue
+            if self.window:
+                _gap = int(_block["timestamp"],16) - int(self.window[-1][2]["timestamp"],16)
+                if _gap > 0:
+                    self.block_time += 0.2 * (_gap - self.block_time)
+            self.window.append((self._next,_block["hash"],_block))
+            self._emit(_events,"block",_block)
+            self._next += 1
+        return self._polled(_events)
+
+    #@Description: Seconds to wait before the next poll.
+    def delay( self ):
+        _due = self._seen_at + self.block_time - time.monotonic() if self._seen_at is not None else 0
+        if _due > self.min_poll:
+            return min(_due,self.max_poll)
+        return min(self.max_poll,self.min_poll * 2 ** max(0,self._misses - _FAST_POLLS))
+
+    #@Description: Polls until _stop is set, see poll.
+    # _stop        [threading.Event] Ends the loop, None runs forever.
+    def run( self, _stop=None ):
+        _stop = _stop or threading.Event()
+        while not _stop.is_set():
+            self.poll()
+            _stop.wait(self.delay())
+
+    #@Description: Events forever, polling as run does.
+    def __iter__( self ):
+        while True:
+            for _event in self.poll():
+                yield _event
+            time.sleep(self.delay())
+
+    #@Description: The block numbered _num, None when the node failed or does not have it yet.
+    def _fetch( self, _num ):
+        try:
+            _rtn = self._node.get_block_by_number(_num,self._tx_flag)
+        except Exception:
+            _rtn = None
+        if not _rtn or "error" in _rtn:
+            self.failures += 1
+            return None
+        return _rtn.get("result")
+
+    def _hash_at( self, _num ):
+        for _n, _hash, _block in self.window:
+            if _n == _num:
+                return _hash
+        return None
+
+    #@Description: Rolls back the emitted blocks numbered _num and above.
+    def _unwind( self, _num, _events ):
+        while self.window and self.window[-1][0] >= _num:
+            self.rollbacks += 1
+            self._emit(_events,"rollback",self.window.pop()[2])
+        self._next = _num
+
+    def _emit( self, _events, _kind, _block ):
+        _events.append((_kind,_block))
+        for _on_block, _on_rollback in self._processors:
+            if _kind == "block":
+                _on_block(_block)
+            elif _on_rollback is not None:
+                _on_rollback(_block)
+
+    def _polled( self, _events ):
+        if any(_kind == "block" for _kind, _block in _events):
+            self._seen_at = time.monotonic()
+            self._misses  = 0
+        else:
+            self._misses += 1
+        return _events
+
+
+class AsyncINFURA(_Methods):
+    #@Description: asyncio infura object. Same wrapper methods as INFURA, each returning a
+    #              coroutine. All calls share one aiohttp connection pool and at most
+    #              _concurrency POSTs are in flight at once. The bulk helpers of INFURA
+    #              are sync generators and helper objects, so they are not offered here.
+    #              i.e  async with AsyncINFURA( _project_id, _project_secret ) as node:
+    #                       receipts = await asyncio.gather(*[ node.get_transaction_receipt(h) for h in hashes ])
+    #@Parameters :
+    # _concurrency [ int ] Max POSTs in flight.
+    # _pool_maxsize[ int ] Max connections kept alive per host.
+    # see INFURA for the remaining parameters.
+    def __init__( self, _project_id, _project_scrt, _network='mainnet', _url=None, _concurrency=_CONCURRENCY,
+                  _pool_maxsize=_CONCURRENCY, _timeout=_TIMEOUT, _batch_size=_BATCH_SIZE, _metrics=None ):
+        self._PROJECT_ID   = _project_id
+        self._PROJECT_SCRT = _project_scrt
+        self._URL  = _url or "{}://{}.{}/{}/{}".format(_PROTOCOL,_network,_ENDPOINT,_VERSION,self._PROJECT_ID)
+        self._timeout      = _timeout
+        self._batch_size   = _batch_size
+        self._ids          = itertools.count(1)
+        self._metrics      = _metrics
+        self._concurrency  = _concurrency
+        self._pool_maxsize = _pool_maxsize
+        self._semaphore    = None
+        self._aiohttp      = None
+
+    async def __aenter__( self ):
+        return self
+
+    async def __aexit__( self, *exc ):
+        await self.close()
+
+    #@Description: Releases the pooled connections held by this instance.
+    async def close( self ):
+        if self._aiohttp is not None:
+            await self._aiohttp.close()
+            self._aiohttp = None
+
+    #@Description: The aiohttp session, created on first use inside the running loop.
+    def _get_session( self ):
+        if self._aiohttp is None:
+            import aiohttp
+            import asyncio
+            _connector = aiohttp.TCPConnector(limit=self._pool_maxsize,limit_per_host=self._pool_maxsize)
+            _connect, _read = self._timeout if isinstance(self._timeout,tuple) else (self._timeout,self._timeout)
+            self._aiohttp   = aiohttp.ClientSession(connector=_connector,headers=_HEADERS,
+                                                    timeout=aiohttp.ClientTimeout(sock_connect=_connect,sock_read=_read))
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+        return self._aiohttp
+
+    #@Description: Sends one POST/GET and decodes the reply, see INFURA._send.
+    async def _send( self, _type, _body ):
+        _session = self._get_session()
+        async with self._semaphore:
+            async with _session.request(_type,self._URL,data=_body) as _rtn:
+                return _loads(await _rtn.read())
+
+    #@Description: Forward facing caller, see INFURA.api_call.
+    async def api_call( self, _method, _params=[] ):
+        if self._metrics is None:
+            return await self._api_call(_method,_params)
+        _t0  = self._metrics.start(_method,_params)
+        _rtn = None
+        try:
+            _rtn = await self._api_call(_method,_params)
+            return _rtn
+        finally:
+            self._metrics.finish(_method,_params,_rtn,_t0)
+
+    async def _api_call( self, _method, _params ):
+        _data = {"id":next(self._ids),"method":_method,"params":_params}
+        if _method in _POST_METHOD:
+            _type = "POST"
+        elif _method in _GET_METHOD:
+            _type = "GET"
+        else:
+            print(" Method [ {} ] cannot be found. Returning None ".format(_method))
+            return None
+        try:
+            return await self._send(_type,_dumps(_data))
+        except Exception as e:
+            print("API Exception : {} ".format( str(e)) )
+            return {}
+
+    #@Description: Sends many calls as size capped batch POSTs, see INFURA.api_batch. The
+    #              batch POSTs themselves run concurrently.
+    async def api_batch( self, _calls, _batch_size=None ):
+        if self._metrics is None:
+            return await self._api_batch(_calls,_batch_size)
+        _calls = list(_calls)
+        _t0 = [ self._metrics.start(_method,_params) for _method, _params in _calls ]
+        _responses = [ None ] * len(_calls)
+        try:
+            _responses = await self._api_batch(_calls,_batch_size)
+            return _responses
+        finally:
+            for (_method, _params), _rtn, _start in zip(_calls,_responses,_t0):
+                self._metrics.finish(_method,_params,_rtn,_start)
+
+    async def _api_batch( self, _calls, _batch_size ):
+        import asyncio
+        _size = _batch_size or self._batch_size
+        _calls = list(_calls)
+        _parts = await asyncio.gather(*[ self._post_batch(_calls[_i:_i + _size]) for _i in range(0,len(_calls),_size) ])
+        return [ _rtn for _part in _parts for _rtn in _part ]
+
+    #@Description: Sends one batch POST, see INFURA._post_batch.
+    async def _post_batch( self, _calls ):
+        _data, _responses, _send = _batch_payload(self._ids,_calls)
+        if not _send:
+            return _responses
+        try:
+            _rtn = await self._send("POST",_dumps([ _data[_i] for _i in _send ]))
+        except Exception as e:
+            _rtn = {"error":{"code":-32603,"message":str(e)}}
+        return _match_batch(_data,_responses,_send,_rtn)
+
+    #@Description: Async batch block, see INFURA.batch.
+    #              i.e  async with node.batch() as batch: ...
+    def batch( self, _batch_size=None ):
+        return AsyncINFURABatch(self,_batch_size)
+
+    async def _then( self, _rtn, _fn ):
+        return _fn(await _rtn)
+
+
+class AsyncINFURABatch(INFURABatch):
+    #@Description: Batch proxy of an AsyncINFURA object, see INFURABatch.
+    async def flush( self ):
+        _queue, self._queue = self._queue, []
+        _responses = await self._node.api_batch([ (_p.method,_p.params) for _p in _queue ],self._batch_size)
+        for _pending, _rtn in zip(_queue,_responses):
+            _pending._resolve(_rtn)
+        self.results = [ _p.result() for _p in _queue ]
+        return self.results
+
+    async def close( self ):
+        pass
+
+    async def __aenter__( self ):
+        return self
+
+    async def __aexit__( self, _exc_type, *exc ):
+        if _exc_type is None:
+            await self.flush()
+
+
+def _hex_bytes( _hex ):
+    return bytes.fromhex(_hex[2:])
+
+def _hex_bytes_list( _hexes ):
+    return tuple(bytes.fromhex(_h[2:]) for _h in _hexes)
+
+#@Description: Encodes a decoded model value back to its JSON RPC form.
+def _to_json_value( _value ):
+    if isinstance(_value,bool) or _value is None or isinstance(_value,str):
+        return _value
+    if isinstance(_value,int):
+        return hex(_value)
+    if isinstance(_value,bytes):
+        return "0x" + _value.hex()
+    if isinstance(_value,(tuple,list)):
+        return [ _to_json_value(_v) for _v in _value ]
+    if isinstance(_value,Model):
+        return _value.to_json()
+    return _value
+
+#@Description: Field kinds of the models: the decoder of the hex JSON value, None for
+#              values kept as they are.
+_QUANTITY = lambda _hex: int(_hex,16)
+_DATA     = _hex_bytes
+_DATAS    = _hex_bytes_list
+_PLAIN    = None
+
+
+class Model(object):
+    #@Description: Compact __slots__ base of the typed block, transaction, receipt and log
+    #              objects. Numeric fields, the ones read most, decode to int on load so their
+    #              reads are plain slot reads. Byte fields keep their hex string in a private
+    #              slot until first read, then decode to bytes once into the public slot and
+    #              drop the string. Against the response dicts this roughly halves the memory
+    #              and makes repeated field reads faster, for a slower load ( see
+    #              bench_infura.py models ). Attributes are the
+    #              snake_case JSON keys ( "from" is from_ ), unknown keys land in extra.
+    #              Indexing with a JSON key returns the JSON RPC form, so models stand in for
+    #              the response dicts.
+    __slots__ = ("extra",)
+    _fields   = ()
+    _lazy     = {}
+
+    #@Description: Builds a model from a JSON RPC result object.
+    @classmethod
+    def from_json( cls, _json ):
+        _obj = cls.__new__(cls)
+        _extra = None
+        _slots = cls._slots
+        for _key, _value in _json.items():
+            _slot = _slots.get(_key)
+            if _slot is None:
+                if _extra is None:
+                    _extra = {}
+                _extra[_key] = _value
+            elif _value is None:
+                _slot[1].__set__(_obj,None)
+            elif _slot[2] is None:
+                _slot[0].__set__(_obj,_value)
+            else:
+                _slot[0].__set__(_obj,_slot[2](_value))
+        _obj.extra = _extra
+        if len(_json) - (len(_extra) if _extra else 0) < len(_slots):
+            for _key, _slot in _slots.items():
+                if _key not in _json:
+                    _slot[1].__set__(_obj,None)
+        cls._nest(_obj,_json)
+        return _obj
+
+    @classmethod
+    def _nest( cls, _obj, _json ):
+        pass
+
+    #@Description: Decodes a field on its first read.
+    def __getattr__( self, _attr ):
+        _lazy = self._lazy.get(_attr)
+        if _lazy is None:
+            raise AttributeError(_attr)
+        _raw, _public, _decode = _lazy
+        _value = _decode(_raw.__get__(self))
+        _public.__set__(self,_value)
+        _raw.__set__(self,None)
+        return _value
+
+    #@Description: JSON RPC form of one field, the raw string when not decoded yet.
+    def _json_of( self, _attr, _raw ):
+        if _raw is not None:
+            try:
+                _value = _raw.__get__(self)
+            except AttributeError:
+                _value = None
+            if _value is not None:
+                return _value
+        return _to_json_value(getattr(self,_attr))
+
+    #@Description: The JSON RPC form of the model.
+    def to_json( self ):
+        _out = {}
+        for _key, _attr, _raw in self._fields:
+            _value = self._json_of(_attr,_raw)
+            if _value is not None or _key in self._always:
+                _out[_key] = _value
+        if self.extra:
+            _out.update(self.extra)
+        return _out
+
+    def __getitem__( self, _key ):
+        _field = self._attrs.get(_key)
+        if _field is None:
+            if self.extra and _key in self.extra:
+                return self.extra[_key]
+            raise KeyError(_key)
+        return self._json_of(*_field)
+
+    def get( self, _key, _default=None ):
+        try:
+            return self[_key]
+        except KeyError:
+            return _default
+
+    def __repr__( self ):
+        return "{}({})".format(type(self).__name__,", ".join("{}={!r}".format(_a,getattr(self,_a)) for _k, _a, _r in self._fields[:3]))
+
+
+#@Description: Builds a Model subclass from its ( JSON key, kind ) field table.
+#@Parameters :
+# _name        [ str ] Class name.
+# _table       [ list] ( JSON key, kind ) pairs, kind being _QUANTITY, _DATA, _DATAS or _PLAIN.
+# _always      [ list] Keys kept in to_json even when null.
+def _model( _name, _table, _always=() ):
+    _attrs = {}
+    for _key, _kind in _table:
+        _snake = "".join("_" + _c.lower() if _c.isupper() else _c for _c in _key)
+        _attrs[_key] = _snake + "_" if _snake in ("from",) else _snake
+    _names = list(_attrs.values()) + [ "_" + _attrs[_key] for _key, _kind in _table if _kind not in (None,_QUANTITY) ]
+    _cls = type(_name,(Model,),{"__slots__":tuple(_names)})
+    _cls._fields = []
+    _cls._slots  = {}
+    _cls._lazy   = {}
+    for _key, _kind in _table:
+        _public = getattr(_cls,_attrs[_key])
+        _raw    = None if _kind in (None,_QUANTITY) else getattr(_cls,"_" + _attrs[_key])
+        _cls._fields.append((_key,_attrs[_key],_raw))
+        # null values and quantities, decoded right away, go straight to the public slot,
+        # other hex values to the raw one
+        _cls._slots[_key] = (_raw or _public, _public, _kind if _raw is None else None)
+        if _raw is not None:
+            _cls._lazy[_attrs[_key]] = (_raw,_public,_kind)
+    _cls._fields = tuple(_cls._fields)
+    _cls._attrs  = { _key:(_attr,_raw) for _key, _attr, _raw in _cls._fields }
+    _cls._always = frozenset(_always)
+    return _cls
+
+
+Log = _model("Log",[
+    ("removed",_PLAIN),("logIndex",_QUANTITY),("transactionIndex",_QUANTITY),("transactionHash",_DATA),
+    ("blockHash",_DATA),("blockNumber",_QUANTITY),("address",_DATA),("data",_DATA),("topics",_DATAS),
+    ])
+
+Transaction = _model("Transaction",[
+    ("hash",_DATA),("nonce",_QUANTITY),("blockHash",_DATA),("blockNumber",_QUANTITY),("transactionIndex",_QUANTITY),
+    ("from",_DATA),("to",_DATA),("value",_QUANTITY),("gasPrice",_QUANTITY),("gas",_QUANTITY),("input",_DATA),
+    ("type",_QUANTITY),("chainId",_QUANTITY),("maxFeePerGas",_QUANTITY),("maxPriorityFeePerGas",_QUANTITY),
+    ("v",_QUANTITY),("r",_QUANTITY),("s",_QUANTITY),
+    ],_always=("to","blockHash","blockNumber","transactionIndex"))
+
+Receipt = _model("Receipt",[
+    ("transactionHash",_DATA),("transactionIndex",_QUANTITY),("blockHash",_DATA),("blockNumber",_QUANTITY),
+    ("from",_DATA),("to",_DATA),("cumulativeGasUsed",_QUANTITY),("gasUsed",_QUANTITY),("effectiveGasPrice",_QUANTITY),
+    ("contractAddress",_DATA),("logs",_PLAIN),("logsBloom",_DATA),("status",_QUANTITY),("type",_QUANTITY),
+    ],_always=("to","contractAddress"))
+
+Block = _model("Block",[
+    ("number",_QUANTITY),("hash",_DATA),("parentHash",_DATA),("nonce",_DATA),("sha3Uncles",_DATA),("logsBloom",_DATA),
+    ("transactionsRoot",_DATA),("stateRoot",_DATA),("receiptsRoot",_DATA),("miner",_DATA),("difficulty",_QUANTITY),
+    ("totalDifficulty",_QUANTITY),("extraData",_DATA),("size",_QUANTITY),("gasLimit",_QUANTITY),("gasUsed",_QUANTITY),
+    ("timestamp",_QUANTITY),("baseFeePerGas",_QUANTITY),("mixHash",_DATA),("uncles",_DATAS),("transactions",_PLAIN),
+    ])
+
+#@Description: Points the fields a nested model repeats from its parent at the parent's
+#              own values, so a block holds one copy of its hash and number.
+def _share( _obj, _parent, _pairs ):
+    for _attr, _parent_attr in _pairs:
+        _value = getattr(_parent,_parent_attr,None)
+        if _value is not None and getattr(_obj,_attr,None) == _value:
+            setattr(_obj,_attr,_value)
+
+#@Description: Receipts hold their logs as Log models.
+def _nest_receipt( cls, _obj, _json ):
+    _obj.logs = [ Log.from_json(_l) for _l in _json.get("logs") or () ]
+    for _log in _obj.logs:
+        _share(_log,_obj,(("_transaction_hash","_transaction_hash"),("_block_hash","_block_hash"),
+                          ("block_number","block_number"),("transaction_index","transaction_index")))
+
+#@Description: Full blocks hold Transaction models, hash only blocks their tx hashes as bytes.
+def _nest_block( cls, _obj, _json ):
+    _txs = _json.get("transactions") or ()
+    _obj.transactions = [ Transaction.from_json(_t) if isinstance(_t,dict) else _hex_bytes(_t) for _t in _txs ]
+    for _tx in _obj.transactions:
+        if isinstance(_tx,Transaction):
+            _share(_tx,_obj,(("_block_hash","_hash"),("block_number","number")))
+
+Receipt._nest = classmethod(_nest_receipt)
+Block._nest   = classmethod(_nest_block)
+
+#@Description: Model class of the result of each typed method.
+_MODEL_OF = {
+    "eth_getBlockByHash":Block, "eth_getBlockByNumber":Block, "eth_getUncleByBlockHashAndIndex":Block,
+    "eth_getUncleByBlockNumberAndIndex":Block, "eth_getTransactionByHash":Transaction,
+    "eth_getTransactionByBlockHashAndIndex":Transaction, "eth_getTransactionByBlockNumberAndIndex":Transaction,
+    "eth_getTransactionReceipt":Receipt,
+    }
+
+#@Description: Response whose result object ( or log list ) is replaced by its model.
+#@Parameters :
+# _method      [ str ] The name of the JSON RPC method.
+# _response    [ dict] The decoded response, left untouched.
+#@Return     :
+# _response    [ dict] A new response holding the model, or the response as is.
+def _typed_response( _method, _response ):
+    if not isinstance(_response,dict):
+        return _response
+    _result = _response.get("result")
+    if _method == "eth_getLogs" and isinstance(_result,list):
+        return dict(_response,result=[ Log.from_json(_l) for _l in _result ])
+    if _method == "eth_getBlockReceipts" and isinstance(_result,list):
+        return dict(_response,result=[ Receipt.from_json(_r) for _r in _result ])
+    _cls = _MODEL_OF.get(_method)
+    if _cls is None or not isinstance(_result,dict):
+        return _response
+    return dict(_response,result=_cls.from_json(_result))
+
+
+#@Description: Column kind of each transaction field get_tx_columns knows: "u64" quantities
+#              become uint64, "u256" quantities ( n, 4 ) uint64 big endian limbs, most
+#              significant first, and "S20"/"S32" data fixed width byte strings.
+_TX_COLUMNS = collections.OrderedDict([
+    ("blockNumber","u64"), ("transactionIndex","u64"), ("hash","S32"), ("from","S20"), ("to","S20"),
+    ("nonce","u64"), ("value","u256"), ("gas","u64"), ("gasPrice","u64"), ("maxFeePerGas","u64"),
+    ("maxPriorityFeePerGas","u64"), ("type","u64"), ("blockHash","S32"),
+    ])
+_KIND_BYTES = {"u64":8, "u256":32, "S20":20, "S32":32}
+
+#@Description: Converts one list of hex strings into its column array, in whole list C
+#              calls rather than a Python loop: u64 through map( int ), wider kinds by left
+#              padding every string to one width and decoding them in a single
+#              bytes.fromhex.
+#@Parameters :
+# _np          numpy module.
+# _hexes       [ list] "0x" prefixed hex strings, None for nulls.
+# _kind        [ str ] Column kind, see _TX_COLUMNS.
+#@Return     :
+# _column      [array] The column.
+# _null        [array] ( n, ) bool, True where the string was None.
+def _hex_column( _np, _hexes, _kind ):
+    _n = len(_hexes)
+    _null = _np.zeros(_n,bool)
+    if _hexes.count(None):
+        _null  = _np.array([ _h is None for _h in _hexes ],bool)
+        _hexes = [ "0x0" if _h is None else _h for _h in _hexes ]
+    if _kind == "u64":
+        try:
+            return _np.fromiter(map(int,_hexes,itertools.repeat(16)),_np.uint64,_n), _null
+        except OverflowError:
+            raise InfuraError("Hex value wider than 8 bytes, use a u256 column")
+    _width = _KIND_BYTES[_kind]
+    if _n and max(map(len,_hexes)) > 2 * _width + 2:
+        raise InfuraError("Hex value wider than {} bytes".format(_width))
+    # "x" is no hex digit, so "0x" only ever matches the prefixes, padded in front with "0"s
+    _joined = "".join(map(str.rjust,_hexes,itertools.repeat(2 * _width + 2),itertools.repeat("0"))).replace("0x","00")
+    _bytes  = _np.frombuffer(bytes.fromhex(_joined),_np.uint8).reshape(_n,_width + 1)[:,1:]
+    _bytes  = _np.ascontiguousarray(_bytes)
+    if _kind == "u256":
+        return _bytes.view(">u8").astype(_np.uint64), _null
+    return _bytes.view(_kind).reshape(_n), _null
+
+#@Description: Transaction columns of a list of blocks, see get_tx_columns.
+#@Parameters :
+# _blocks      [ list] Full block objects ( _tx_flag=True ), dicts or Block models.
+# _fields      [ list] JSON keys of the columns, defaults to every key of _TX_COLUMNS.
+#@Return     :
+# _columns     [ dict] JSON key -> array, in _fields order. A field null in some txs ( "to"
+#                      of contract creations, fee caps of legacy txs ) holds zeros there and
+#                      gets a "<key>_null" bool array. NumPy drops trailing zero bytes when
+#                      reading one S20/S32 item back, the array itself keeps all of them.
+def tx_columns( _blocks, _fields=None ):
+    _builder = _TxColumns(_fields)
+    for _block in _blocks:
+        _builder.add(_block["transactions"])
+    return _builder.columns()
+
+#@Description: Python ints of a ( n, 4 ) u256 limb column.
+def u256_to_int( _limbs ):
+    return [ int.from_bytes(_row.astype(">u8").tobytes(),"big") for _row in _limbs ]
+
+#@Description: float64 approximation of a ( n, 4 ) u256 limb column.
+def u256_to_float( _limbs ):
+    import numpy
+    return _limbs.astype(numpy.float64) @ numpy.array([2.0**192,2.0**128,2.0**64,1.0])
+
+
+class _TxColumns(object):
+    #@Description: Gathers the hex strings of the transaction fields and converts them to
+    #              arrays every _COLUMN_CHUNK transactions.
+    def __init__( self, _fields=None ):
+        import numpy
+        self._np     = numpy
+        self._fields = list(_fields or _TX_COLUMNS)
+        for _key in self._fields:
+            if _key not in _TX_COLUMNS:
+                raise InfuraError("No column kind for transaction field [ {} ]".format(_key))
+        self._hexes  = { _key:[] for _key in self._fields }
+        self._parts  = { _key:[] for _key in self._fields }
+        self._nulls  = { _key:[] for _key in self._fields }
+
+    def add( self, _txs ):
+        if not _txs:
+            return
+        _get = dict.get if type(_txs[0]) is dict else type(_txs[0]).get
+        for _key, _hexes in self._hexes.items():
+            _hexes.extend(map(_get,_txs,itertools.repeat(_key)))
+        if len(_hexes) >= _COLUMN_CHUNK:
+            self._convert()
+
+    def _convert( self ):
+        for _key in self._fields:
+            _column, _null = _hex_column(self._np,self._hexes[_key],_TX_COLUMNS[_key])
+            self._parts[_key].append(_column)
+            self._nulls[_key].append(_null)
+            self._hexes[_key] = []
+
+    def columns( self ):
+        self._convert()
+        _columns = collections.OrderedDict()
+        for _key in self._fields:
+            _columns[_key] = self._np.concatenate(self._parts[_key])
+            _null = self._np.concatenate(self._nulls[_key])
+            if _null.any():
+                _columns[_key + "_null"] = _null
+        return _columns
+
+
+#@Description: Reads one JSON RPC request per line, i.e {"method":"eth_getBalance","params":[...]},
+#              and yields ( id, method, params ). The id is the request's own id, or its
+#              line number. Lines that do not parse yield their error response instead.
+def _read_requests( _lines ):
+    for _no, _line in enumerate(_lines,1):
+        if not _line.strip():
+            continue
+        try:
+            _request = _loads(_line)
+            yield (_request.get("id",_no),_request["method"],_request.get("params",[]))
+        except Exception as _e:
+            yield (_no,None,{"code":-32700,"message":"Parse error: {}".format(_e)})
+
+
+#@Description: Runs one batch of parsed requests, see _read_requests.
+#@Return     :
+# _lines       [ list] One JSON line ( bytes ) per request, in request order.
+def _run_batch( _node, _batch ):
+    _calls = [ (_method,_params) for _id, _method, _params in _batch if _method is not None ]
+    _responses = iter(_node.api_batch(_calls) if _calls else [])
+    _lines = []
+    for _id, _method, _params in _batch:
+        if _method is None:
+            _out = {"jsonrpc":"2.0","id":_id,"error":_params}
+        else:
+            _out = dict(next(_responses) or {"error":{"code":-32603,"message":"No response"}},id=_id)
+            _out.setdefault("jsonrpc","2.0")
+        _lines.append(_dumps(_out) + b"\n")
+    return _lines
+
+
+#@Description: Command line JSONL client, python -m infura --help. Requests are read lazily,
+#              grouped into batches and run by a bounded pool of workers. At most two
+#              batches per worker are held at once, so memory stays flat on endless input.
+#@Parameters :
+# _argv        [ list] Arguments, defaults to sys.argv.
+# _stdin       [ file] Binary input used for "-", defaults to sys.stdin.
+# _stdout      [ file] Binary output, defaults to sys.stdout.
+#@Return     :
+# _status      [ int ] Exit status.
+def main( _argv=None, _stdin=None, _stdout=None ):
+    import argparse
+    _parser = argparse.ArgumentParser(prog="python -m infura",
+                                      description="Runs JSON RPC requests read as JSONL and writes the responses as JSONL.")
+    _parser.add_argument("input",nargs="?",default="-",help="JSONL file of {method, params} requests, - reads stdin")
+    _parser.add_argument("--network",default="mainnet",help="infura network name")
+    _parser.add_argument("--url",help="explicit node url, overrides --network")
+    _parser.add_argument("--project-id",default=os.environ.get("INFURA_PROJECT_ID",""),
+                         help="defaults to $INFURA_PROJECT_ID")
+    _parser.add_argument("--project-secret",default=os.environ.get("INFURA_PROJECT_SECRET",""),
+                         help="defaults to $INFURA_PROJECT_SECRET")
+    _parser.add_argument("--workers",type=int,default=4,help="batches in flight at once")
+    _parser.add_argument("--batch-size",type=int,default=_BATCH_SIZE,help="requests per batch POST")
+    _parser.add_argument("--rate",type=float,help="client side rate limit in calls/sec")
+    _parser.add_argument("--unordered",action="store_true",help="write responses as batches complete, not in input order")
+    _args = _parser.parse_args(_argv)
+    if not _args.url and not _args.project_id:
+        _parser.error("--url or --project-id ( or $INFURA_PROJECT_ID ) is required")
+    _workers = max(1,_args.workers)
+    _size    = max(1,_args.batch_size)
+    _limiter = RateLimiter(_args.rate) if _args.rate else None
+    _stdout  = _stdout or sys.stdout.buffer
+    _input   = (_stdin or sys.stdin.buffer) if _args.input == "-" else open(_args.input,"rb")
+    _pending = collections.deque()
+    try:
+        with INFURA(_args.project_id,_args.project_secret,_args.network,_url=_args.url,_pool_maxsize=_workers,
+                    _batch_size=_size,_limiter=_limiter) as _node, \
+             concurrent.futures.ThreadPoolExecutor(_workers) as _pool:
+            _requests = _read_requests(_input)
+            while True:
+                _batch = list(itertools.islice(_requests,_size))
+                if _batch:
+                    _pending.append(_pool.submit(_run_batch,_node,_batch))
+                while _pending and (len(_pending) >= 2 * _workers or not _batch):
+                    if _args.unordered:
+                        concurrent.futures.wait(_pending,return_when=concurrent.futures.FIRST_COMPLETED)
+                        _done = [ _f for _f in _pending if _f.done() ]
+                    else:
+                        _done = [ _pending[0] ]
+                    for _future in _done:
+                        _pending.remove(_future)
+                        _stdout.writelines(_future.result())
+                    _stdout.flush()
+                    if _batch:
+                        break
+                if not _batch:
+                    return 0
+    except BrokenPipeError:
+        return 0
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if _args.input != "-":
+            _input.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,495 @@
+"""
+@Description : Local JSON-RPC stub standing in for an infura node. Serves a deterministic
+               synthetic chain over HTTP/1.1 keep-alive so the client can be tested and
+               benchmarked offline. Run directly to serve on a fixed port.
+@Author      : k.z
+"""
+import http.server
+import threading
+import hashlib
+import json
+import time
+import random
+import argparse
+from infura import logs_bloom, keccak256
+
+_HOST = "127.0.0.1"
+
+
+#@Description: Deterministic 32 byte hex digest of the provided labels.
+#@Parameters :
+# *args        [ any ] Labels hashed together, i.e ("block", 12).
+#@Return     :
+# _hash        [ str ] 0x prefixed 32 bytes hex string.
+def _hash32( *args ):
+    return "0x" + hashlib.sha256(":".join(str(_a) for _a in args).encode()).hexdigest()
+
+#@Description: Deterministic 20 byte hex address of the provided labels.
+def _addr20( *args ):
+    return _hash32(*args)[:42]
+
+#@Description: eth_getLogs topic matching, None matches anything and a list matches any of.
+def _topics_match( _topics, _filter ):
+    for _i, _want in enumerate(_filter):
+        _have = _topics[_i] if _i < len(_topics) else None
+        if _want is None:
+            continue
+        if _have not in (_want if isinstance(_want,list) else [ _want ]):
+            return False
+    return True
+
+
+class StubError(Exception):
+    #@Description: Raised by StubChain.call to answer with a JSON RPC error object.
+    def __init__( self, _code, _message ):
+        Exception.__init__(self,_message)
+        self.code = _code
+
+
+class StubChain(object):
+    #@Description: Synthetic chain, block n always has the same hash, txs and receipts.
+    #@Parameters :
+    # _head        [ int ] The "latest" block number.
+    # _txs         [ int ] Number of transactions per block.
+    # _logs        [ int ] Number of logs emitted per transaction.
+    # _log_cap     [ int ] eth_getLogs answers "query returned more than" past this many logs.
+    # _input       [ int ] Calldata bytes of each transaction, grows blocks to mainnet sizes.
+    # _block_receipts[bool] Serve eth_getBlockReceipts, False answers it like a node predating it.
+    # _rare        [ int ] Every _rare-th block the last tx also emits a log of a rare contract.
+    def __init__( self, _head=1000, _txs=2, _logs=1, _log_cap=10000, _input=0, _block_receipts=True, _rare=0 ):
+        self._head = _head
+        self._txs  = _txs
+        self._logs = _logs
+        self._log_cap = _log_cap
+        self._input   = "0x" + ("a9059cbb" + "00" * max(0,_input - 4))[:2 * _input]
+        self._block_receipts = _block_receipts
+        self._rare    = _rare
+        self._blooms  = {}
+        self._sent    = {}
+        self._lock    = threading.Lock()
+        self._blocks  = None
+        self._txs_at  = None
+        self._epochs  = {}
+
+    #@Description: Hash of block _num, changed by every reorg reaching it.
+    def block_hash( self, _num ):
+        _epoch = self._epochs.get(_num)
+        return _hash32("block",_num) if _epoch is None else _hash32("block",_num,_epoch)
+
+    #@Description: Extends the chain by _n blocks.
+    def mine( self, _n=1 ):
+        self._head += _n
+        self._blocks = None
+        self._txs_at = None
+
+    #@Description: Replaces the last _depth blocks with new ones, then mines _extra more.
+    def reorg( self, _depth, _extra=0 ):
+        for _num in range(self._head - _depth + 1,self._head + 1):
+            self._epochs[_num] = self._epochs.get(_num,0) + 1
+        self._blocks = None
+        self.mine(_extra)
+
+    def tx_hash( self, _num, _idx ):
+        return _hash32("tx",_num,_idx)
+
+    #@Description: Maps a block hash back to its number, None when unknown. The hash index
+    #              is built on first use.
+    def block_number_of( self, _hash ):
+        if self._blocks is None:
+            self._blocks = { self.block_hash(_num):_num for _num in range(self._head + 1) }
+        return self._blocks.get(_hash)
+
+    #@Description: Maps a tx hash back to ( block number, index ), None when unknown.
+    def tx_position_of( self, _hash ):
+        if self._txs_at is None:
+            self._txs_at = { self.tx_hash(_num,_idx):(_num,_idx) for _num in range(self._head + 1) for _idx in range(self._txs) }
+        return self._txs_at.get(_hash)
+
+    def transaction( self, _num, _idx ):
+        return {
+            "hash"            : self.tx_hash(_num,_idx),
+            "nonce"           : hex(_num),
+            "blockHash"       : self.block_hash(_num),
+            "blockNumber"     : hex(_num),
+            "transactionIndex": hex(_idx),
+            "from"            : _addr20("from",_num,_idx),
+            "to"              : _addr20("to",_num,_idx),
+            "value"           : hex(_num * 10**18 + _idx),
+            "gasPrice"        : hex(10**9 + _num),
+            "gas"             : hex(21000 + _idx),
+            "input"           : self._input,
+            }
+
+    #@Description: Logs of one transaction, emitted by one of three synthetic contracts.
+    def logs( self, _num, _idx ):
+        _out = []
+        for _k in range(self._logs):
+            _out.append({
+                "removed"         : False,
+                "logIndex"        : hex(_idx * self._logs + _k),
+                "transactionIndex": hex(_idx),
+                "transactionHash" : self.tx_hash(_num,_idx),
+                "blockHash"       : self.block_hash(_num),
+                "blockNumber"     : hex(_num),
+                "address"         : _addr20("contract",(_num + _idx + _k) % 3),
+                "data"            : "0x" + "%064x" % _num,
+                "topics"          : [ _hash32("topic",_k) ],
+                })
+        if self._rare and _num % self._rare == 0 and _idx == self._txs - 1:
+            _out.append({
+                "removed"         : False,
+                "logIndex"        : hex(self._txs * self._logs),
+                "transactionIndex": hex(_idx),
+                "transactionHash" : self.tx_hash(_num,_idx),
+                "blockHash"       : self.block_hash(_num),
+                "blockNumber"     : hex(_num),
+                "address"         : _addr20("rare"),
+                "data"            : "0x",
+                "topics"          : [ _hash32("rare"),_hash32("rare",_num) ],
+                })
+        return _out
+
+    #@Description: eth_getLogs over a block range, honouring address and topic filters.
+    def get_logs( self, _filter ):
+        if "blockHash" in _filter:
+            _first = _last = self.block_number_of(_filter["blockHash"])
+        else:
+            _first = self.resolve(_filter.get("fromBlock","latest"))
+            _last  = self.resolve(_filter.get("toBlock","latest"))
+        _address = _filter.get("address")
+        if isinstance(_address,str):
+            _address = [ _address ]
+        _topics = _filter.get("topics") or []
+        _out = []
+        for _num in range(max(0,_first),min(self._head,_last) + 1):
+            for _idx in range(self._txs):
+                for _log in self.logs(_num,_idx):
+                    if _address and _log["address"] not in _address:
+                        continue
+                    if not _topics_match(_log["topics"],_topics):
+                        continue
+                    _out.append(_log)
+                    if len(_out) > self._log_cap:
+                        raise StubError(-32005,"query returned more than {} results".format(self._log_cap))
+        return _out
+
+    def receipt( self, _num, _idx ):
+        _logs = self.logs(_num,_idx)
+        return {
+            "transactionHash"  : self.tx_hash(_num,_idx),
+            "transactionIndex" : hex(_idx),
+            "blockHash"        : self.block_hash(_num),
+            "blockNumber"      : hex(_num),
+            "from"             : _addr20("from",_num,_idx),
+            "to"               : _addr20("to",_num,_idx),
+            "cumulativeGasUsed": hex(21000 * (_idx + 1)),
+            "gasUsed"          : hex(21000),
+            "contractAddress"  : None,
+            "logs"             : _logs,
+            "logsBloom"        : logs_bloom(_logs),
+            "status"           : "0x1",
+            }
+
+    #@Description: logsBloom of every log of block _num, computed once.
+    def block_bloom( self, _num ):
+        _bloom = self._blooms.get(_num)
+        if _bloom is None:
+            _bloom = self._blooms[_num] = logs_bloom([ _log for _i in range(self._txs) for _log in self.logs(_num,_i) ])
+        return _bloom
+
+    def block( self, _num, _tx_flag=True ):
+        if _num < 0 or _num > self._head:
+            return None
+        _txs = [ self.transaction(_num,_i) if _tx_flag else self.tx_hash(_num,_i) for _i in range(self._txs) ]
+        return {
+            "number"      : hex(_num),
+            "hash"        : self.block_hash(_num),
+            "parentHash"  : self.block_hash(_num - 1) if _num else "0x" + "00" * 32,
+            "nonce"       : "0x" + "00" * 8,
+            "sha3Uncles"  : _hash32("uncles",_num),
+            "logsBloom"   : self.block_bloom(_num),
+            "transactionsRoot": _hash32("txroot",_num),
+            "stateRoot"   : _hash32("state",_num),
+            "receiptsRoot": _hash32("receipts",_num),
+            "miner"       : _addr20("miner",_num),
+            "difficulty"  : "0x0",
+            "totalDifficulty": "0x0",
+            "extraData"   : "0x",
+            "size"        : hex(1000),
+            "gasLimit"    : hex(30000000),
+            "gasUsed"     : hex(21000 * self._txs),
+            "timestamp"   : hex(1600000000 + 12 * _num),
+            "uncles"      : [],
+            "transactions": _txs,
+            }
+
+    #@Description: Resolves a block parameter ( hex number or tag ) to a block number, safe
+    #              and finalized trail the head by one and two epochs.
+    def resolve( self, _blk_param ):
+        if _blk_param in ("latest","pending"):
+            return self._head
+        if _blk_param in ("safe","finalized"):
+            return max(0,self._head - (32 if _blk_param == "safe" else 64))
+        if _blk_param == "earliest":
+            return 0
+        return int(_blk_param,16)
+
+    #@Description: Accepts a stub signed tx: the hex of its JSON, with from and nonce set.
+    #              Only the next pending nonce of the sender is accepted, a tx with "fail"
+    #              set is rejected for lack of funds.
+    def send_raw( self, _raw ):
+        try:
+            _tx = json.loads(bytes.fromhex(_raw[2:]))
+            _from = _tx["from"].lower()
+        except Exception:
+            raise StubError(-32602,"invalid transaction")
+        _hash = "0x" + keccak256(bytes.fromhex(_raw[2:])).hex()
+        with self._lock:
+            _sent = self._sent.setdefault(_from,[])
+            if _hash in _sent:
+                raise StubError(-32000,"already known")
+            _next = int(_from,16) % 1000 + len(_sent)
+            if _tx["nonce"] != _next:
+                raise StubError(-32000,"nonce too {}".format("low" if _tx["nonce"] < _next else "high"))
+            if _tx.get("fail"):
+                raise StubError(-32000,"insufficient funds for gas * price + value")
+            _sent.append(_hash)
+        return _hash
+
+    #@Description: Dispatches one JSON RPC method to its synthetic result.
+    #@Parameters :
+    # _method      [ str ] The name of the JSON RPC method.
+    # _params      [ list] The methods parameters.
+    #@Return     :
+    # result       [ any ] The JSON RPC result.
+    def call( self, _method, _params ):
+        if _method == "eth_blockNumber":
+            return hex(self._head)
+        if _method == "eth_getBlockByNumber":
+            _block = self.block(self.resolve(_params[0]),_params[1])
+            if _params[0] == "pending":
+                # the pending block has no number, hash or nonce yet
+                _block.update(number=None,hash=None,nonce=None)
+            return _block
+        if _method == "eth_getBlockByHash":
+            _num = self.block_number_of(_params[0])
+            return None if _num is None else self.block(_num,_params[1])
+        if _method in ("eth_getBlockTransactionCountByNumber","eth_getBlockTransactionCountByHash"):
+            _num = self.resolve(_params[0]) if _method.endswith("Number") else self.block_number_of(_params[0])
+            return None if _num is None or _num > self._head else hex(self._txs)
+        if _method in ("eth_getUncleCountByBlockNumber","eth_getUncleCountByBlockHash"):
+            _num = self.resolve(_params[0]) if _method.endswith("Number") else self.block_number_of(_params[0])
+            return None if _num is None or _num > self._head else "0x0"
+        if _method in ("eth_getUncleByBlockNumberAndIndex","eth_getUncleByBlockHashAndIndex"):
+            return None
+        if _method in ("eth_getTransactionByBlockNumberAndIndex","eth_getTransactionByBlockHashAndIndex"):
+            _num = self.resolve(_params[0]) if _method.endswith("NumberAndIndex") else self.block_number_of(_params[0])
+            _idx = int(_params[1],16)
+            return None if _num is None or _num > self._head or _idx >= self._txs else self.transaction(_num,_idx)
+        if _method == "eth_getTransactionByHash":
+            _pos = self.tx_position_of(_params[0])
+            return None if _pos is None else self.transaction(*_pos)
+        if _method == "eth_getTransactionReceipt":
+            _pos = self.tx_position_of(_params[0])
+            return None if _pos is None else self.receipt(*_pos)
+        if _method == "eth_getBlockReceipts" and self._block_receipts:
+            _blk = _params[0]
+            _num = self.block_number_of(_blk) if len(_blk) == 66 else self.resolve(_blk)
+            return None if _num is None or _num > self._head else [ self.receipt(_num,_i) for _i in range(self._txs) ]
+        if _method == "eth_getLogs":
+            return self.get_logs(_params[0])
+        if _method == "eth_getBalance":
+            return hex(int(_params[0],16) % 10**21)
+        if _method == "eth_getTransactionCount":
+            _count = int(_params[0],16) % 1000
+            return hex(_count + len(self._sent.get(_params[0].lower(),())) if _params[1] == "pending" else _count)
+        if _method == "eth_sendRawTransaction":
+            return self.send_raw(_params[0])
+        if _method == "eth_getStorageAt":
+            return _hash32("storage",_params[0],_params[1])
+        if _method == "eth_call":
+            return _hash32("call",_params[0].get("to"),_params[0].get("data"))
+        if _method == "eth_estimateGas":
+            return hex(21000 + 16 * (len(_params[0].get("data") or "0x") // 2 - 1))
+        if _method == "eth_gasPrice":
+            return hex(10**9)
+        if _method == "eth_accounts":
+            return []
+        if _method == "eth_getWork":
+            return [ self.block_hash(self._head + 1), _hash32("seed"), "0x" + "0f" * 32 ]
+        if _method in ("eth_hashrate","eth_mining","eth_syncing","net_listening","net_peerCount","eth_protocolVersion"):
+            return {"eth_hashrate":"0x0","eth_mining":False,"eth_syncing":False,"net_listening":True,
+                    "net_peerCount":"0x19","eth_protocolVersion":"0x41"}[_method]
+        if _method == "net_version":
+            return "1"
+        if _method == "web3_clientVersion":
+            return "stub/v0"
+        raise StubError(-32601,"the method {} does not exist/is not available".format(_method))
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup( self ):
+        http.server.BaseHTTPRequestHandler.setup(self)
+        self.server.stub._count("connections")
+
+    def log_message( self, *args ):
+        pass
+
+    def do_POST( self ):
+        _stub = self.server.stub
+        _body = json.loads(self.rfile.read(int(self.headers.get("Content-Length",0))))
+        _seq = _stub._count("requests")
+        if _stub._latency or _stub._jitter:
+            time.sleep(_stub._latency + _stub._jitter * _stub._rng.random())
+        if _stub._slow_every and _seq % _stub._slow_every == 0:
+            time.sleep(_stub._slow_latency)
+        if _stub._fail_every and _seq % _stub._fail_every == 0:
+            _stub._count("failed")
+            if _stub._html:
+                return self._write_html(502,"Bad Gateway")
+            return self._write(503,{"jsonrpc":"2.0","id":None,"error":{"code":-32603,"message":"service unavailable"}})
+        if not _stub._admit(len(_body) if isinstance(_body,list) else 1):
+            _stub._count("throttled")
+            if _stub._html:
+                return self._write_html(429,"Too Many Requests",_stub._retry_after)
+            _error = {"jsonrpc":"2.0","id":None,"error":{"code":-32005,"message":"project ID request rate exceeded"}}
+            return self._write(429,_error,_stub._retry_after)
+        if isinstance(_body,list):
+            _out = [ self._reply(_stub,_item) for _item in _body ]
+        else:
+            _out = self._reply(_stub,_body)
+        self._write(200,_out)
+
+    def _write( self, _status, _out, _retry_after=None ):
+        _data = json.dumps(_out).encode()
+        self.send_response(_status)
+        self.send_header("Content-Type","application/json")
+        self.send_header("Content-Length",str(len(_data)))
+        if _retry_after is not None:
+            self.send_header("Retry-After",str(_retry_after))
+        self.end_headers()
+        self.wfile.write(_data)
+
+    #@Description: The HTML error page a gateway in front of the node answers with.
+    def _write_html( self, _status, _reason, _retry_after=None ):
+        _data = "<html><head><title>{0} {1}</title></head><body><h1>{0} {1}</h1></body></html>".format(_status,_reason).encode()
+        self.send_response(_status)
+        self.send_header("Content-Type","text/html")
+        self.send_header("Content-Length",str(len(_data)))
+        if _retry_after is not None:
+            self.send_header("Retry-After",str(_retry_after))
+        self.end_headers()
+        self.wfile.write(_data)
+
+    do_GET = do_POST
+
+    def _reply( self, _stub, _item ):
+        _stub._count("calls")
+        if _stub._errors and _stub._rng.random() < _stub._errors:
+            _stub._count("errors")
+            return {"jsonrpc":"2.0","id":_item.get("id"),"error":{"code":-32603,"message":"internal error"}}
+        try:
+            _result = _stub._chain.call(_item["method"],_item.get("params",[]))
+        except StubError as e:
+            return {"jsonrpc":"2.0","id":_item.get("id"),"error":{"code":e.code,"message":str(e)}}
+        return {"jsonrpc":"2.0","id":_item.get("id"),"result":_result}
+
+
+class StubServer(object):
+    #@Description: Threaded local JSON-RPC server, one handler thread per connection.
+    #@Parameters :
+    # _latency     [float] Seconds slept before answering each HTTP request.
+    # _chain       [StubChain] The synthetic chain served.
+    # _port        [ int ] Port to bind, 0 picks a free one.
+    # _quota       [float] Calls/sec allowed before answering HTTP 429, None for no quota.
+    # _retry_after [float] Retry-After seconds sent with a 429, None sends no header.
+    # _fail_every  [ int ] Every n-th HTTP request is answered with a 503.
+    # _slow_every  [ int ] Every n-th HTTP request is delayed by _slow_latency more.
+    # _slow_latency[float] Extra seconds of the slow requests.
+    # _jitter      [float] Up to this many seconds, uniformly drawn, added to _latency.
+    # _errors      [float] Fraction of calls answered with a JSON RPC internal error.
+    # _seed        [ int ] Seed of the jitter and error draws, runs repeat exactly.
+    # _html        [ bool] Failed requests get a gateway's HTML 502 page, throttled ones an
+    #                      HTML 429, instead of JSON RPC errors.
+    def __init__( self, _latency=0.0, _chain=None, _port=0, _quota=None, _retry_after=None, _fail_every=0,
+                  _slow_every=0, _slow_latency=0.5, _jitter=0.0, _errors=0.0, _seed=0, _html=False ):
+        self._latency = _latency
+        self._jitter  = _jitter
+        self._errors  = _errors
+        self._html    = _html
+        self._rng     = random.Random(_seed)
+        self._fail_every   = _fail_every
+        self._slow_every   = _slow_every
+        self._slow_latency = _slow_latency
+        self._chain   = _chain or StubChain()
+        self._quota   = _quota
+        self._retry_after = _retry_after
+        self._tokens  = _quota or 0.0
+        self._stamp   = time.monotonic()
+        self._lock    = threading.Lock()
+        self.stats    = {"connections":0,"requests":0,"calls":0,"throttled":0,"failed":0,"errors":0}
+        self._server  = http.server.ThreadingHTTPServer((_HOST,_port),StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread  = None
+
+    def _count( self, _key, _n=1 ):
+        with self._lock:
+            self.stats[_key] += _n
+            return self.stats[_key]
+
+    #@Description: Server side token bucket of the quota, True when _n calls may go through.
+    def _admit( self, _n ):
+        if self._quota is None:
+            return True
+        with self._lock:
+            _now = time.monotonic()
+            self._tokens = min(self._quota,self._tokens + (_now - self._stamp) * self._quota)
+            self._stamp  = _now
+            if self._tokens < _n:
+                return False
+            self._tokens -= _n
+            return True
+
+    @property
+    def url( self ):
+        return "http://{}:{}/".format(*self._server.server_address)
+
+    def start( self ):
+        self._thread = threading.Thread(target=self._server.serve_forever,daemon=True)
+        self._thread.start()
+        return self
+
+    def stop( self ):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__( self ):
+        return self.start()
+
+    def __exit__( self, *exc ):
+        self.stop()
+
+
+if __name__ == "__main__":
+    _parser = argparse.ArgumentParser(description="Local JSON-RPC stub node.")
+    _parser.add_argument("--port",type=int,default=8545)
+    _parser.add_argument("--head",type=int,default=1000,help="latest block number")
+    _parser.add_argument("--txs",type=int,default=2,help="transactions per block")
+    _parser.add_argument("--logs",type=int,default=1,help="logs per transaction")
+    _parser.add_argument("--input",type=int,default=0,help="calldata bytes per transaction")
+    _parser.add_argument("--no-block-receipts",action="store_true",help="answer eth_getBlockReceipts as unknown")
+    _parser.add_argument("--latency",type=float,default=0.0,help="seconds per request")
+    _parser.add_argument("--jitter",type=float,default=0.0,help="random extra seconds per request")
+    _parser.add_argument("--errors",type=float,default=0.0,help="fraction of calls answered with an error")
+    _parser.add_argument("--quota",type=float,default=None,help="calls/sec before HTTP 429")
+    _args = _parser.parse_args()
+    _chain = StubChain(_head=_args.head,_txs=_args.txs,_logs=_args.logs,_input=_args.input,
+                       _block_receipts=not _args.no_block_receipts)
+    _stub = StubServer(_latency=_args.latency,_chain=_chain,_port=_args.port,_quota=_args.quota,
+                       _jitter=_args.jitter,_errors=_args.errors)
+    print("Serving stub node on {} ".format(_stub.url))
+    _stub._server.serve_forever()
@@ -1,12 +1,640 @@
 #!/usr/bin/python3
 import sys, os, time
+import asyncio
+import threading
+import concurrent.futures
 import infura as inf
+import stub_infura as stub
 import json
 
 _PROJECT_ID   = ""
 _PROJECT_SCRT = ""
 
+
+# Description : Offline, a pooled node keeps reusing one keep-alive connection.
+def test_pooled_transport():
+    with stub.StubServer() as _stub:
+        with inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url) as _node:
+            for _ in range(10):
+                assert _node.get_block_number() == 1000
+        assert _stub.stats["connections"] == 1
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_pooled=False)
+        for _ in range(3):
+            _node.get_block_number()
+        assert _stub.stats["connections"] == 4
+
+
+# Description : Offline, batched wrapper calls share size capped POSTs and keep order.
+def test_batch():
+    with stub.StubServer() as _stub:
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_batch_size=100)
+        with _node.batch() as _batch:
+            _head = _batch.get_block_number()
+            _blocks = [ _batch.get_block_by_number(_n,False) for _n in range(249) ]
+        assert _stub.stats["requests"] == 3
+        assert _head.result() == 1000
+        assert [ int(_b.result()["result"]["number"],16) for _b in _blocks ] == list(range(249))
+        assert _batch.results[0] == 1000
+        _rtn = _node.api_batch([("eth_gasPrice",[]),("eth_nope",[]),("net_version",[])])
+        assert _rtn[0]["result"] == hex(10**9) and "error" in _rtn[1] and _rtn[2]["result"] == "1"
+
+
+# Description : Offline, the asyncio node answers the same wrappers with coroutines, and
+#               offers none of the sync bulk helpers.
+def test_async_node():
+    async def _run( _url ):
+        async with inf.AsyncINFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_url,_concurrency=4,_metrics=_metrics) as _node:
+            _head = await _node.get_block_number()
+            _blocks = await asyncio.gather(*[ _node.get_block_by_number(_n,False) for _n in range(20) ])
+            async with _node.batch() as _batch:
+                _price = _batch.get_gas_price()
+                _batch.get_gas_price()
+            return _head, _blocks, _price.result()
+    _metrics = inf.Metrics()
+    with stub.StubServer() as _stub:
+        _head, _blocks, _price = asyncio.run(_run(_stub.url))
+        assert _head == 1000
+        assert _metrics.methods["eth_getBlockByNumber"]["calls"] == 20 and _metrics.methods["eth_gasPrice"]["calls"] == 2
+        assert [ int(_b["result"]["number"],16) for _b in _blocks ] == list(range(20))
+        assert _price["result"] == hex(10**9)
+        assert _stub.stats["connections"] <= 4
+    for _name in ("iter_blocks","scan_logs","get_block_receipts","get_balances","eth_calls","bloom_scan",
+                  "export_chain","follow_head","warm_store","iter_block_transactions"):
+        assert not hasattr(inf.AsyncINFURA,_name)
+        assert not hasattr(inf.AsyncINFURABatch,_name)
+
+
+# Description : Offline, block ranges stream in order and resume from a checkpoint.
+def test_iter_blocks( tmp_path ):
+    _checkpoint = str(tmp_path / "blocks.ckpt")
+    with stub.StubServer() as _stub:
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url)
+        _seen = []
+        for _block in _node.iter_blocks(0,99,False,_workers=4,_prefetch=8,_checkpoint=_checkpoint):
+            _seen.append(int(_block["number"],16))
+            if len(_seen) == 30:
+                break
+        assert _seen == list(range(30))
+        # block 29 was never released back to the generator, so it is handed out again.
+        _rest = [ int(_b["number"],16) for _b in _node.iter_blocks(0,99,False,_checkpoint=_checkpoint) ]
+        assert _rest == list(range(29,100))
+        assert len(list(_node.iter_blocks(995))) == 6
+
+
+# Description : Offline, log scans split chunks on the result cap, keep log order and resolve block tags.
+def test_scan_logs():
+    with stub.StubServer(_chain=stub.StubChain(_txs=4,_logs=2,_log_cap=300)) as _stub:
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url)
+        _scan = _node.scan_logs({"fromBlock":0,"toBlock":"latest"},_chunk=400,_grow_below=100)
+        _logs = [ (int(_l["blockNumber"],16),int(_l["logIndex"],16)) for _l in _scan ]
+        assert _logs == [ (_n,_i) for _n in range(1001) for _i in range(8) ]
+        assert _scan.splits > 0 and _scan.chunk_size * 8 <= 300
+        assert [ _c[0] for _c in _scan.chunks ] == sorted(_c[0] for _c in _scan.chunks)
+        _address = stub._addr20("contract",0)
+        _only = list(_node.scan_logs({"address":_address,"fromBlock":"0x0","toBlock":"0x63"}))
+        assert _only and all(_l["address"] == _address for _l in _only)
+        _final = list(_node.scan_logs({"fromBlock":"finalized","toBlock":"safe"}))
+        assert sorted({ int(_l["blockNumber"],16) for _l in _final }) == list(range(936,969))
+        try:
+            _node._block_number_of("final")
+            assert False
+        except inf.InfuraError:
+            pass
+
+
+# Description : Offline, only deep enough block/tx results are cached, within a byte budget.
+def test_response_cache():
+    with stub.StubServer() as _stub:
+        _cache = inf.ResponseCache(_max_bytes=20000,_confirmations=12)
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_cache=_cache)
+        _block = _node.get_block_by_number(500)
+        _calls = _stub.stats["calls"]
+        assert _node.get_block_by_number(500) is _block
+        assert _node.get_block_by_hash(_block["result"]["hash"])["result"]["number"] == hex(500)
+        assert _node.get_block_by_hash(_block["result"]["hash"])["result"]["number"] == hex(500)
+        assert _stub.stats["calls"] == _calls + 1
+        _node.get_block_by_number(995)
+        _node.get_block_by_number(995)
+        _node.api_call("eth_getBlockByNumber",["latest",True])
+        _node.api_call("eth_getBlockByNumber",["latest",True])
+        assert _stub.stats["calls"] == _calls + 5
+        _node.api_batch([ ("eth_getBlockByNumber",[hex(_n),True]) for _n in range(100,130) ])
+        assert _cache.bytes <= 20000 and _cache.evictions > 0
+        assert _cache.hits == 2 and _cache.misses > 0
+
+
+# Description : Offline, a second run over a warmed chain store makes no network calls.
+def test_chain_store( tmp_path ):
+    _path = str(tmp_path / "chain.db")
+    with stub.StubServer() as _stub:
+        with inf.ChainStore(_path) as _store:
+            _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_store=_store)
+            assert _node.warm_store(0,30) == 31
+            assert len(_store) == 31 * 3
+        _calls = _stub.stats["calls"]
+        with inf.ChainStore(_path) as _store:
+            _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_store=_store)
+            for _block in _node.iter_blocks(0,30):
+                for _tx in _block["transactions"]:
+                    assert _node.get_transaction_receipt(_tx["hash"])["result"]["transactionHash"] == _tx["hash"]
+            assert _store.hits == 31 * 3 and _store.misses == 0
+        assert _stub.stats["calls"] == _calls
+
+
+# Description : Offline, identical concurrent calls share one request, threads and batches.
+def test_coalescing():
+    with stub.StubServer(_latency=0.2) as _stub:
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_coalesce=True)
+        _out = []
+        _threads = [ threading.Thread(target=lambda: _out.append(_node.get_gas_price())) for _ in range(8) ]
+        _batch = threading.Thread(target=lambda: _out.extend(_node.api_batch([("eth_gasPrice",[])] * 4)))
+        for _t in _threads + [ _batch ]:
+            _t.start()
+        for _t in _threads + [ _batch ]:
+            _t.join()
+        assert len(_out) == 12 and all(_r["result"] == hex(10**9) for _r in _out)
+        assert _stub.stats["calls"] == 1 and _node.coalesced == 11
+        _rtn = _node.api_batch([("eth_getBalance",["0x1","latest"]),("net_version",[]),("eth_getBalance",["0x1","latest"])])
+        assert _rtn[0] == _rtn[2] and _rtn[1]["result"] == "1"
+        assert _stub.stats["calls"] == 3
+
+
+# Description : Offline, a shared limiter adapts to a throttling node and loses no call, a node
+#               that keeps throttling gets -32005 errors back.
+def test_rate_limiter():
+    with stub.StubServer(_quota=100,_retry_after=0.05) as _stub:
+        _limiter = inf.RateLimiter(_rate=400)
+        _nodes = [ inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_limiter=_limiter) for _ in range(2) ]
+        _out = []
+        def _work( _node ):
+            for _ in range(40):
+                _out.append(_node.get_block_number())
+        _threads = [ threading.Thread(target=_work,args=(_nodes[_i % 2],)) for _i in range(4) ]
+        for _t in _threads:
+            _t.start()
+        for _t in _threads:
+            _t.join()
+        assert _out == [ 1000 ] * 160
+        assert _stub.stats["throttled"] > 0 and _limiter.throttles == _stub.stats["throttled"]
+        assert _limiter.rate < 400
+    with stub.StubServer(_quota=0.001,_retry_after=0.001,_html=True) as _stub:
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_limiter=inf.RateLimiter(_rate=1000,_min_rate=500),
+                           _retry=inf.RetryPolicy(_base=0.001))
+        assert _node.api_call("eth_gasPrice",[])["error"]["code"] == -32005
+        assert _node.api_batch([ ("eth_gasPrice",[]) ] * 2)[1]["error"]["code"] == -32005
+        assert _stub.stats["throttled"] == 2 * inf._THROTTLE_RETRIES
+
+
+# Description : Offline, reads are retried past failures and hedged past slow answers, a gateway's
+#               HTML 502 left after the retries comes back as an error response.
+def test_retry_and_hedge():
+    with stub.StubServer(_fail_every=3) as _stub:
+        _retry = inf.RetryPolicy(_retries=2,_base=0.001)
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_retry=_retry)
+        assert [ _node.get_block_number() for _ in range(12) ] == [ 1000 ] * 12
+        assert _retry.retries == _stub.stats["failed"] > 0
+        _requests = _stub.stats["requests"]
+        _status = [ _node._send("POST",'{"id":1,"method":"eth_gasPrice","params":[]}',1,True).status_code for _ in range(3) ]
+        assert sorted(_status) == [ 200, 200, 503 ] and _stub.stats["requests"] == _requests + 3
+    with stub.StubServer(_slow_every=4,_slow_latency=1.0) as _stub:
+        _retry = inf.RetryPolicy(_hedge=True,_min_delay=0.05)
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_retry=_retry)
+        _t0 = time.time()
+        assert [ _node.get_block_number() for _ in range(12) ] == [ 1000 ] * 12
+        assert time.time() - _t0 < 1.0
+        assert _retry.hedges >= 3 and _retry.hedge_wins >= 3
+    with stub.StubServer(_fail_every=1,_html=True) as _stub:
+        for _retry in (None,inf.RetryPolicy(_retries=1,_base=0.001)):
+            _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_retry=_retry)
+            _rtn  = _node.api_call("eth_gasPrice",[])
+            assert _rtn["error"]["code"] == -32603 and "HTTP 502" in _rtn["error"]["message"]
+            assert _node.api_batch([ ("eth_gasPrice",[]) ])[0]["error"]["code"] == -32603
+        assert _stub.stats["requests"] == 1 + 1 + 2 + 2
+
+
+# Description : Offline, an endpoint pool prefers the fast node, ejects the failing one and
+#               spreads concurrent load.
+def test_endpoint_pool():
+    with stub.StubServer(_latency=0.001) as _fast, stub.StubServer(_latency=0.03) as _slow, \
+         stub.StubServer(_fail_every=1) as _dead:
+        _pool = inf.EndpointPool([ _dead.url, _slow.url, _fast.url ],_eject_after=2)
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_endpoints=_pool,_retry=inf.RetryPolicy(_retries=3,_base=0.001))
+        assert [ _node.get_block_number() for _ in range(40) ] == [ 1000 ] * 40
+        _stats = { _e["url"]:_e for _e in _pool.stats() }
+        assert _stats[_dead.url]["ejected"] and _dead.stats["requests"] == 2
+        assert _fast.stats["requests"] > 30
+        _before = _slow.stats["requests"]
+        _blocks = list(_node.iter_blocks(0,99,False,_workers=8))
+        assert len(_blocks) == 100 and _slow.stats["requests"] > _before
+        _rtn = _node.api_batch([ ("eth_getBalance",[hex(_i),"latest"]) for _i in range(50) ],_batch_size=10)
+        assert [ int(_r["result"],16) for _r in _rtn ] == list(range(50))
+
+
+# Description : Offline, typed nodes return compact models that decode lazily and round trip.
+def test_typed_models():
+    with stub.StubServer() as _stub:
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_typed=True)
+        _block = _node.get_block_by_number(7)["result"]
+        assert isinstance(_block,inf.Block) and isinstance(_block.transactions[0],inf.Transaction)
+        assert _block.number == 7 and _block.transactions[0].block_number is _block.number
+        assert _block.transactions[0]._block_hash is _block._hash and _block._hash == _block["hash"]
+        assert _block.hash == bytes.fromhex(_block["hash"][2:]) and _block._hash is None
+        assert _block.transactions[1].from_ == bytes.fromhex(stub._addr20("from",7,1)[2:])
+        assert _block["number"] == "0x7" and _block.to_json() == _stub._chain.block(7)
+        _receipt = _node.get_transaction_receipt(_stub._chain.tx_hash(7,0))["result"]
+        assert _receipt.status == 1 and _receipt.logs[0].block_number == 7
+        assert [ _b.number for _b in _node.iter_blocks(0,9) ] == list(range(10))
+
        
+# Description : Offline, every JSON backend decodes alike and block txs stream one by one.
+def test_decoding():
+    with stub.StubServer(_chain=stub.StubChain(_txs=20)) as _stub:
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url)
+        _block = _node.get_block_by_number(7)
+        try:
+            assert inf.set_json_backend("json") == "json"
+            assert _node.get_block_by_number(7)["result"] == _block["result"]
+            assert _node.api_batch([("eth_getBlockByNumber",["0x7",True])])[0]["result"] == _block["result"]
+        finally:
+            inf.set_json_backend()
+        _txs = _block["result"]["transactions"]
+        for _chunk in (1,7,1 << 16):
+            assert list(_node.iter_block_transactions(7,_chunk=_chunk)) == _txs
+        assert list(_node.iter_block_transactions(_block["result"]["hash"],False)) == [ _t["hash"] for _t in _txs ]
+        try:
+            list(_node.iter_block_transactions(5000))
+            assert False
+        except inf.InfuraError:
+            pass
+        _metrics = inf.Metrics()
+        _seen = []
+        _metrics.add_hook(_post=lambda _m, _p, _r, _s: _seen.append(_r))
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_metrics=_metrics)
+        assert len(list(_node.iter_block_transactions(7,_chunk=7))) == len(_txs)
+        try:
+            list(_node.iter_block_transactions(5000))
+            assert False
+        except inf.InfuraError:
+            pass
+        _stats = _metrics.methods["eth_getBlockByNumber"]
+        assert _stats["calls"] == 2 and _stats["errors"] == 1 and _stats["response_bytes"] > 20 * 100
+        assert _seen[0]["result"] == len(_txs) and _seen[1] is None
+
+
+# Description : Offline, a block range comes back as typed NumPy columns.
+def test_tx_columns():
+    import pytest
+    numpy = pytest.importorskip("numpy")
+    with stub.StubServer(_chain=stub.StubChain(_txs=5)) as _stub:
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url)
+        _cols = _node.get_tx_columns(10,29,["blockNumber","hash","to","value","gasPrice"])
+        _txs  = [ _tx for _n in range(10,30) for _tx in _node.get_block_by_number(_n)["result"]["transactions"] ]
+        assert _cols["blockNumber"].dtype == numpy.uint64 and _cols["hash"].dtype == numpy.dtype("S32")
+        assert _cols["blockNumber"].tolist() == [ int(_t["blockNumber"],16) for _t in _txs ]
+        assert _cols["gasPrice"].tolist() == [ int(_t["gasPrice"],16) for _t in _txs ]
+        assert inf.u256_to_int(_cols["value"]) == [ int(_t["value"],16) for _t in _txs ]
+        assert _cols["to"].view(numpy.uint8).reshape(-1,20)[3].tobytes() == bytes.fromhex(_txs[3]["to"][2:])
+        _blocks = [ {"transactions":[ {"to":None,"value":hex(2**255),"nonce":"0x1f"} ]} ]
+        _cols = inf.tx_columns(_blocks,["to","value","nonce"])
+        assert _cols["to_null"].tolist() == [ True ] and _cols["nonce"].tolist() == [ 31 ]
+        assert inf.u256_to_int(_cols["value"]) == [ 2**255 ] and "value_null" not in _cols
+
+
+# Description : Offline, the stub answers every method the client posts, and injects
+#               errors at the configured rate.
+def test_stub_node():
+    _chain = stub.StubChain()
+    _block = _chain.block_hash(7)
+    _tx    = {"to":stub._addr20("to",7,0),"data":"0xa9059cbb"}
+    _params = {
+        "eth_getTransactionByHash":[_chain.tx_hash(7,1)], "eth_getTransactionReceipt":[_chain.tx_hash(7,1)],
+        "eth_getTransactionByBlockNumberAndIndex":["0x7","0x1"], "eth_getTransactionByBlockHashAndIndex":[_block,"0x1"],
+        "eth_getStorageAt":[_tx["to"],"0x0","latest"], "eth_getLogs":[{"fromBlock":"0x7","toBlock":"0x7"}],
+        "eth_getBlockTransactionCountByNumber":["0x7"], "eth_getBlockTransactionCountByHash":[_block],
+        "eth_getBlockByHash":[_block,False], "eth_getBlockByNumber":["0x7",False], "eth_getBlockReceipts":["0x7"],
+        "eth_getBalance":[_tx["to"],"latest"],
+        "eth_estimateGas":[_tx], "eth_call":[_tx,"latest"], "eth_getTransactionCount":[_tx["to"],"latest"],
+        "eth_getUncleCountByBlockHash":[_block], "eth_getUncleCountByBlockNumber":["0x7"],
+        "eth_getUncleByBlockHashAndIndex":[_block,"0x0"], "eth_getUncleByBlockNumberAndIndex":["0x7","0x0"],
+        "eth_sendRawTransaction":[ "0x" + json.dumps({"from":_tx["to"],"nonce":int(_tx["to"],16) % 1000}).encode().hex() ],
+        }
+    with stub.StubServer(_chain=_chain) as _stub:
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url)
+        _rtn = _node.api_batch([ (_m,_params.get(_m,[])) for _m in set(inf._POST_METHOD) ])
+        assert all("result" in _r for _r in _rtn)
+        assert _node.get_tx_by_block_number_and_index("0x7","0x1")["result"]["hash"] == _chain.tx_hash(7,1)
+    with stub.StubServer(_errors=0.25,_jitter=0.001) as _stub:
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url)
+        _rtn = _node.api_batch([ ("eth_gasPrice",[]) ] * 400)
+        assert sum("error" in _r for _r in _rtn) == _stub.stats["errors"] and 50 < _stub.stats["errors"] < 150
+
+
+# Description : Offline, metrics count calls, errors and bytes per method and run the hooks.
+def test_metrics():
+    with stub.StubServer(_errors=0.2) as _stub:
+        _metrics = inf.Metrics()
+        _seen = []
+        _metrics.add_hook(_post=lambda _m, _p, _r, _s: _seen.append(_m))
+        _cache = inf.ResponseCache()
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_metrics=_metrics,_cache=_cache)
+        for _ in range(50):
+            _node.get_gas_price()
+        _node.api_batch([ ("eth_getBalance",[hex(_i),"latest"]) for _i in range(50) ])
+        _snap = _metrics.snapshot()
+        _gas, _balance = _snap["methods"]["eth_gasPrice"], _snap["methods"]["eth_getBalance"]
+        assert _gas["calls"] == 50 and _balance["calls"] == 50 and len(_seen) == 100
+        assert _gas["errors"] + _balance["errors"] == _stub.stats["errors"]
+        assert _gas["buckets"]["+Inf"] == 50 and _gas["response_bytes"] > 0 and _balance["request_bytes"] > 0
+        assert _snap["sources"]["cache"]["misses"] == 0
+        _text = _metrics.prometheus()
+        assert 'infura_requests_total{method="eth_gasPrice"} 50' in _text
+        assert 'infura_latency_seconds_bucket{method="eth_getBalance",le="+Inf"} 50' in _text
+        assert "infura_cache_hits 0.0" in _text
+
+
+# Description : Offline, the head follower emits new blocks in order, rolls back reorged ones and
+#               rides out failing calls.
+def test_head_follower():
+    _chain = stub.StubChain(_head=100)
+    with stub.StubServer(_chain=_chain) as _stub:
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url)
+        _follower = _node.follow_head(_window=8)
+        _indexed = []
+        _follower.add_processor(_indexed.append,_indexed.remove)
+        assert [ int(_b["number"],16) for _k, _b in _follower.poll() ] == [100]
+        assert _follower.poll() == [] and _follower.delay() > 0
+        _chain.mine(3)
+        assert [ int(_b["number"],16) for _k, _b in _follower.poll() ] == [101,102,103]
+        _chain.reorg(2,_extra=1)
+        _events = _follower.poll()
+        assert [ (_k,int(_b["number"],16)) for _k, _b in _events ] == [
+            ("rollback",103),("rollback",102),("block",102),("block",103),("block",104) ]
+        assert [ _b["hash"] for _b in _indexed ] == [ _chain.block_hash(_n) for _n in range(100,105) ]
+        assert _events[-1][1] is _indexed[-1] and _follower.rollbacks == 2
+        _chain.reorg(20,_extra=1)
+        try:
+            _follower.poll()
+            assert False, "reorg deeper than the window"
+        except inf.InfuraError:
+            pass
+    _chain = stub.StubChain(_head=100)
+    with stub.StubServer(_chain=_chain,_errors=0.3) as _stub:
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url)
+        _follower = _node.follow_head(100,_window=8)
+        _seen = []
+        for _i in range(60):
+            if _i % 3 == 0:
+                _chain.mine(1)
+            _seen += [ int(_b["number"],16) for _k, _b in _follower.poll() ]
+        _stub._errors = 0.0
+        _seen += [ int(_b["number"],16) for _k, _b in _follower.poll() ]
+        assert _seen == list(range(100,_chain._head + 1)) and _follower.failures > 0 and _follower.rollbacks == 0
+        # a node failing every call is polled less and less often
+        _stub._errors = 1.0
+        _stalled = _node.follow_head(_min_poll=0.01,_max_poll=1.0)
+        assert all(_stalled.poll() == [] for _i in range(12))
+        assert _stalled.failures == 12 and _stalled.delay() == 1.0
+    # calls raising for one poll are a miss too, the follower carries on after it
+    with stub.StubServer(_chain=_chain) as _stub:
+        _metrics = inf.Metrics()
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_metrics=_metrics)
+        _follower = _node.follow_head(_chain._head,_min_poll=0.01,_max_poll=1.0)
+        assert len(_follower.poll()) == 1
+        _broken = [ True ]
+        def _raise( _method, _params ):
+            if _broken[0]:
+                raise ValueError("node went away")
+        _metrics.add_hook(_pre=_raise)
+        _chain.mine(2)
+        assert _follower.poll() == [] and _follower.failures == 1 and _follower._misses == 1
+        _broken[0] = False
+        assert [ int(_b["number"],16) for _k, _b in _follower.poll() ] == [ _chain._head - 1, _chain._head ]
+
+
+# Description : Offline, python -m infura answers a JSONL stream in input order, or as batches complete.
+def test_cli():
+    import io
+    _lines = [ json.dumps({"method":"eth_getBalance","params":[hex(_i),"latest"]}) for _i in range(100) ]
+    _lines += [ "not json", json.dumps({"id":"head","method":"eth_blockNumber"}) ]
+    with stub.StubServer() as _stub:
+        for _order in ([],["--unordered"]):
+            _out = io.BytesIO()
+            _argv = ["--url",_stub.url,"--batch-size","8","--workers","3"] + _order
+            assert inf.main(_argv,io.BytesIO("\n".join(_lines).encode()),_out) == 0
+            _responses = [ json.loads(_line) for _line in _out.getvalue().splitlines() ]
+            _ids = [ _rtn["id"] for _rtn in _responses ]
+            if not _order:
+                assert _ids == list(range(1,102)) + ["head"]
+            assert sorted(map(str,_ids)) == sorted(map(str,list(range(1,102)) + ["head"]))
+            _by_id = { _rtn["id"]:_rtn for _rtn in _responses }
+            assert _by_id[101]["error"]["code"] == -32700 and _by_id["head"]["result"] == "0x3e8"
+            assert all("result" in _by_id[_i] for _i in range(1,101))
+
+
+# Description : Offline, bulk balance and nonce snapshots dedupe addresses, pin the block and keep partial results.
+def test_snapshots():
+    with stub.StubServer(_errors=0.1) as _stub:
+        _metrics = inf.Metrics()
+        _blocks  = set()
+        _metrics.add_hook(_pre=lambda _m, _p: _m in ("eth_blockNumber","eth_getBlockByNumber") or _blocks.add(_p[1]))
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_batch_size=40,_metrics=_metrics)
+        _addresses = [ stub._addr20("holder",_i) for _i in range(300) ]
+        _snap = _node.get_balances(_addresses + [ _a.upper().replace("0X","0x") for _a in _addresses[:50] ])
+        assert _snap.block == _stub._chain._head and _blocks == { hex(_snap.block) }
+        assert _metrics.methods["eth_getBalance"]["calls"] == 300
+        assert 0 < len(_snap.errors) < 300 and len(_snap) + len(_snap.errors) == 300
+        assert all(_snap[_a] == int(_a,16) % 10**21 for _a in _snap)
+        _counts = _node.get_tx_counts(_addresses,7,_workers=2)
+        assert _counts.block == 7 and _blocks == { hex(_snap.block), "0x7" }
+        assert all(_counts[_a] == int(_a,16) % 1000 for _a in _counts)
+
+
+# Description : Offline, block receipts come from eth_getBlockReceipts, or per tx receipts on nodes without it,
+#               learned per client and per endpoint of a pool, and asked again after a while.
+def test_block_receipts():
+    for _native in (True,False):
+        _chain = stub.StubChain(_txs=250,_block_receipts=_native)
+        with stub.StubServer(_chain=_chain) as _stub:
+            _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url)
+            _receipts = _node.get_block_receipts(7)["result"]
+            assert _receipts == [ _chain.receipt(7,_i) for _i in range(250) ]
+            assert _node._supported(_stub.url,"eth_getBlockReceipts") is _native
+            assert _node.get_block_receipts(_chain.block_hash(8))["result"][0] == _chain.receipt(8,0)
+            assert _node.get_block_receipts(5000)["result"] is None
+            _calls = _stub.stats["calls"]
+            _range = list(_node.iter_block_receipts(10,14,_workers=3))
+            assert [ _num for _num, _r in _range ] == [ 10, 11, 12, 13, 14 ]
+            assert _range[-1][1][-1] == _chain.receipt(14,249)
+            assert _stub.stats["calls"] - _calls == (5 if _native else 5 * 251)
+            if not _native:
+                # an upgraded node is asked again once its refusal is _SUPPORT_TTL old
+                _chain._block_receipts = True
+                _node._supports[(_stub.url,"eth_getBlockReceipts")] = (False,time.monotonic() - inf._SUPPORT_TTL - 1)
+                _calls = _stub.stats["calls"]
+                assert _node.get_block_receipts(9)["result"][0] == _chain.receipt(9,0)
+                assert _stub.stats["calls"] - _calls == 1 and _node._supported(_stub.url,"eth_getBlockReceipts")
+    _chain = stub.StubChain(_txs=20)
+    with stub.StubServer(_latency=0.02,_chain=stub.StubChain(_txs=20,_block_receipts=False)) as _old, \
+         stub.StubServer(_chain=_chain) as _new:
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_endpoints=inf.EndpointPool([ _old.url, _new.url ]))
+        for _n in range(10):
+            assert _node.get_block_receipts(_n)["result"] == [ _chain.receipt(_n,_i) for _i in range(20) ]
+        # the refusal of the old node is not taken for the whole pool
+        assert _node._supported(_old.url,"eth_getBlockReceipts") is False
+        assert _node._supported(_new.url,"eth_getBlockReceipts") is True
+        # another client of the same urls learns on its own
+        assert inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_old.url)._supported(_old.url,"eth_getBlockReceipts")
+        assert _old.stats["calls"] + _new.stats["calls"] < 4 * 21
+
+
+# Description : Offline, the TTL cache serves volatile responses fresh, then stale while one refresh runs,
+#               and sends a cold miss once for all its concurrent callers.
+def test_ttl_cache():
+    with stub.StubServer(_latency=0.2) as _stub:
+        _ttl  = inf.TTLCache({"eth_gasPrice":0.5},_max_stale=1.0)
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_ttl_cache=_ttl)
+        _price = _node.get_gas_price()
+        assert _node.get_gas_price() is _price and _stub.stats["calls"] == 1
+        time.sleep(0.6)
+        _t0 = time.perf_counter()
+        assert [ _node.get_gas_price() for _ in range(5) ] == [ _price ] * 5
+        assert time.perf_counter() - _t0 < 0.1
+        while _ttl.refreshes < 1:
+            time.sleep(0.01)
+        assert _stub.stats["calls"] == 2 and _node.get_gas_price() is not _price
+        time.sleep(1.6)
+        _node.get_gas_price()
+        assert _ttl.stats() == {"entries":1,"hits":2,"stale":5,"misses":2,"shared":0,"refreshes":1}
+        assert _node.get_peer_count() and _node.get_peer_count() and _stub.stats["calls"] == 5
+        # a cold miss hit by many threads at once goes out once
+        _calls = _stub.stats["calls"]
+        with concurrent.futures.ThreadPoolExecutor(8) as _pool:
+            _versions = list(_pool.map(lambda _i: _node.get_net_version()["result"],range(8)))
+        assert _versions == [ "1" ] * 8 and _stub.stats["calls"] == _calls + 1 and _ttl.shared == 7
+
+
+# Description : Offline, bloom scans fetch receipts only for blocks whose logsBloom may match.
+def test_bloom_scan():
+    assert inf.keccak256(b"").hex() == "c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470"
+    assert inf.keccak256(b"Transfer(address,address,uint256)").hex() == "ddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+    _chain = stub.StubChain(_txs=3,_rare=100)
+    _rare  = stub._addr20("rare")
+    _bloom = inf.LogBloom(_rare,[ None,[ stub._hash32("rare",300),stub._hash32("rare",700) ] ])
+    _blooms = [ _chain.block_bloom(_n) for _n in range(1001) ]
+    assert list(_bloom.match_many(_blooms)) == [ _bloom.matches(_b) for _b in _blooms ]
+    assert _bloom.matches(_blooms[300]) and _bloom.matches(_blooms[700]) and not _bloom.matches(_blooms[301])
+    with stub.StubServer(_chain=_chain) as _stub:
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url)
+        _filter = {"address":_rare,"fromBlock":"0x0","toBlock":"latest"}
+        _scan = _node.bloom_scan(_filter,_chunk=128)
+        assert list(_scan) == _node.get_logs(_filter)["result"]
+        assert _scan.blocks == 1001 and _scan.matched == 11 and _scan.candidates < 50
+        _filter["topics"] = [ None,stub._hash32("rare",700) ]
+        _scan = _node.bloom_scan(_filter)
+        assert [ _l["blockNumber"] for _l in _scan ] == [ hex(700) ] and _scan.matched == 1
+
+
+# Description : Offline, chain exports resume where they stopped and read back by block number.
+def test_chain_archive( tmp_path ):
+    _path = str(tmp_path / "archive")
+    _chain = stub.StubChain(_txs=3)
+    with stub.StubServer(_chain=_chain,_errors=0.01) as _stub:
+        _node = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url)
+        _runs, _count = 0, 0
+        while _count < 250:
+            with inf.ChainArchive(_path,_segment_blocks=100) as _archive:
+                _runs += 1
+                try:
+                    _count += _node.export_chain(_archive,0,249,_workers=4,_prefetch=8)
+                except inf.InfuraError:
+                    _count = len(_archive)
+        assert _runs > 1 and _count == 250
+    with open(str(tmp_path / "archive" / "000000000200.seg"),"ab") as _f:
+        _f.write(b"cut short")
+    with open(str(tmp_path / "archive" / "000000000200.idx"),"ab") as _f:
+        _f.write(b"\x01\x02")
+    with inf.ChainArchive(_path,_segment_blocks=100) as _archive:
+        assert len(_archive) == 250 and _archive.stats()["segments"] == 3
+        assert 249 in _archive and 250 not in _archive and _archive.get(250) is None
+        for _num in (0,99,100,173,249):
+            _record = _archive.get(_num)
+            assert _record["block"] == _chain.block(_num) and _record["receipts"][2] == _chain.receipt(_num,2)
+        assert [ _r["block"]["number"] for _r in _archive.iter_range(245,260) ] == [ hex(_n) for _n in range(245,250) ]
+        _archive.append(250,{"block":_chain.block(250)})
+        assert _archive.get(250)["block"]["number"] == hex(250)
+
+
+# Description : Offline, bulk eth_calls dedupe, pin the block, cache per block and keep per call errors,
+#               pending reads go out unpinned and uncached.
+def test_eth_calls():
+    with stub.StubServer(_errors=0.1) as _stub:
+        _cache = inf.CallCache(_blocks=2)
+        _node  = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_call_cache=_cache,_batch_size=25)
+        _calls = [ {"to":stub._addr20("pool",_i % 60),"data":"0x0902f1ac"} for _i in range(300) ]
+        _first = _node.eth_calls(_calls,900)
+        assert len(_first) == 300 and _first.block == 900 and _first.sent == 60
+        _errors = sum("error" in _r for _r in _first[:60])
+        assert 0 < _errors < 60 and _stub.stats["calls"] == 60
+        assert all(_r["result"] == stub._hash32("call",_c["to"],_c["data"]) for _c, _r in zip(_calls,_first) if "error" not in _r)
+        assert all(_first[_i] is _first[_i % 60] for _i in range(300))
+        _again = _node.eth_calls(_calls,hex(900))
+        assert _again.sent == _errors and _stub.stats["calls"] == 60 + _errors
+        _node.eth_calls(_calls[:1],"latest")
+        _node.eth_calls(_calls[:1],901)
+        assert _node.eth_calls(_calls[:1],900).sent == 1 and _cache.stats()["blocks"] == 2
+        _pending = _node.eth_calls(_calls[:3],"pending")
+        assert _pending.block == "pending" and _pending.sent == 3 and _cache.stats()["blocks"] == 2
+        assert _node.eth_calls(_calls[:3],"pending").sent == 3
+        try:
+            _node._block_number_of("pending")
+            assert False
+        except inf.InfuraError:
+            pass
+
+
+# Description : Offline, the nonce manager counts nonces locally, sends in batches and never resends,
+#               resyncs after a signer error, and pending tx count snapshots see the sent txs.
+def test_nonce_manager():
+    _sign = lambda _tx: "0x" + json.dumps(_tx,sort_keys=True).encode().hex()
+    with stub.StubServer() as _stub:
+        _node   = inf.INFURA(_PROJECT_ID,_PROJECT_SCRT,_url=_stub.url,_batch_size=10,_retry=inf.RetryPolicy())
+        _nonces = inf.NonceManager(_node)
+        _sender = stub._addr20("sender")
+        _base   = int(_sender,16) % 1000
+        _txs    = [ {"from":_sender,"to":stub._addr20("to",_i),"value":_i} for _i in range(25) ]
+        _sent   = _nonces.send(_sender,_txs,_sign)
+        assert [ _r["nonce"] for _r in _sent ] == list(range(_base,_base + 25))
+        assert all(_r["status"] == "sent" for _r in _sent) and _stub.stats["requests"] == 4
+        assert _node.send_raw_transaction(_sign(dict(_txs[0],nonce=_base)))["error"]["message"] == "already known"
+        _txs[3]["fail"] = True
+        _sent = _nonces.send(_sender,_txs[:15],_sign)
+        assert [ _r["status"] for _r in _sent ] == [ "sent" ] * 3 + [ "rejected" ] + [ "nonce" ] * 6 + [ "skipped" ] * 5
+        assert _stub.stats["calls"] == 1 + 25 + 1 + 10 and _nonces.stats() == {"addresses":0,"fetches":1,"resyncs":1}
+        assert _nonces.next(_sender) == _base + 28 and _nonces.fetches == 2
+        _pending = _node.get_tx_counts([ _sender ],"pending")
+        assert _pending.block == "pending" and _pending[_sender] == int(_node.get_tx_count(_sender,"pending")["result"],16) == _base + 28
+        assert _node.get_tx_counts([ _sender ])[_sender] == _base
+        _nonces.resync(_sender)
+        def _broken( _tx ):
+            if _tx["value"] == 20:
+                raise ValueError("locked key")
+            return _sign(_tx)
+        try:
+            _nonces.send(_sender,_txs[4:],_broken)
+            assert False
+        except inf.InfuraError as e:
+            _partial = e.sent
+        # the first batch went out, its hashes are still reported
+        assert [ _r["status"] for _r in _partial ] == [ "sent" ] * 10 + [ "skipped" ] * 11
+        assert [ _r["response"]["result"] for _r in _partial[:10] ] == [ "0x" + inf.keccak256(bytes.fromhex(_sign(dict(_tx,nonce=_n))[2:])).hex()
+                                                                         for _tx, _n in zip(_txs[4:14],range(_base + 28,_base + 38)) ]
+        # the first POST of 10 went out, the nonces reserved past it are handed out again
+        _sent = _nonces.send(_sender,_txs[:1],_sign)
+        assert _sent[0]["nonce"] == _base + 38 and _sent[0]["status"] == "sent"
+        _lost = inf._send_result(_sign({"nonce":1}),1,{"error":{"code":-32603,"message":"read timed out"}})
+        assert _lost["status"] == "unknown" and _lost["hash"] == "0x" + inf.keccak256(bytes.fromhex(_sign({"nonce":1})[2:])).hex()
+
+
 # Description : Unit testing infura.py
 def main():
     